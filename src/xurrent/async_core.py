@@ -0,0 +1,508 @@
+from __future__ import annotations  # Needed for forward references
+import asyncio
+from contextlib import contextmanager
+import os
+import tempfile
+import time
+from typing import List
+
+from .core import XurrentApiHelper, parse_link_header, page_number, set_query_param
+from .rate_limit import RateLimiter
+from .retry import RetryPolicy, RetryStats
+from .cache import ResponseCache
+from .identity import IdentityMap
+from .serialize import get_json_decoder
+from .instrumentation import RequestEvent, as_hooks, emit, templated_path
+from .bulk import BulkExportError
+
+try:
+    import httpx
+except ImportError:  # pragma: no cover - optional dependency
+    httpx = None
+
+
+class AsyncXurrentApiHelper:
+    """
+    Asyncio twin of XurrentApiHelper, based on an httpx.AsyncClient.
+    All network calls are awaitable and rate-limit waits do not block the event loop,
+    so many concurrent calls can share one event loop and one connection pool.
+
+    Requires the optional 'httpx' dependency (pip install xurrent[async]).
+    """
+    api_user: Person # Forward declaration with a string
+    api_user_teams: List[Team] # Forward declaration with a string
+
+    def __init__(self, base_url, api_key, api_account, logger: Logger=None, prefetch_workers: int = 0, max_connections: int = 100,
+                 rate_limiter: RateLimiter = None, retry_policy: RetryPolicy = None, response_cache: ResponseCache = None,
+                 keep_alive: bool = True, timeout=(10, 120), identity_map=False,
+                 lazy_references: bool = False, json_decoder='auto', hooks=None):
+        """
+        Initialize the asynchronous Xurrent API helper.
+        The API user is not resolved on creation, await resolve_user() to populate api_user and api_user_teams.
+
+        :param base_url: Base URL of the Xurrent API
+        :param api_key: API key to authenticate with
+        :param api_account: Account name to use
+        :param logger: Logger to use (optional), otherwise a new logger is created
+        :param prefetch_workers: Default number of pages of a paginated GET to fetch concurrently,
+                                 0 fetches the pages one after another (default: 0)
+        :param max_connections: Maximum number of concurrent connections of the client (default: 100)
+        :param rate_limiter: Client-side rate limiter shared by all tasks using this helper (optional),
+                             by default the limiter follows the rate limit headers of the server
+        :param retry_policy: Policy for retrying rate limited calls, server errors and connection failures (optional),
+                             retries and waiting times are counted in retry_stats
+        :param response_cache: Cache for conditional GET requests (ETag / If-None-Match), disabled if not provided
+        :param keep_alive: Keep connections open for reuse (default: True)
+        :param timeout: Timeout in seconds of a request, either a single value or a (connect, read) tuple;
+                        None waits forever (default: 10 seconds to connect, 120 seconds to read)
+        :param identity_map: Resolve every record to one shared instance per (model, id), merging the fields of
+                             fuller records into it (default: False). Pass True or an IdentityMap instance.
+        :param lazy_references: Keep the references of requests, tasks and workflows (member, team, workflow, ...)
+                                as lazy Reference objects that are only built when read (default: False)
+        :param json_decoder: Decoder of JSON responses: 'orjson', 'ujson', 'json' (standard library), 'auto' for the
+                             fastest one installed, or a callable taking the raw bytes of a body (default: auto)
+        :param hooks: Hooks receiving an event when a request starts and when it finished (optional), e.g. a
+                      MetricsAggregator (module instrumentation); a RequestHook, a callable called with every finished
+                      event or a list of them
+        """
+        if httpx is None:
+            raise ImportError("AsyncXurrentApiHelper requires the 'httpx' package: pip install xurrent[async]")
+        self.base_url = base_url
+        self.api_key = api_key
+        self.api_account = api_account
+        self.prefetch_workers = prefetch_workers
+        self.rate_limiter = rate_limiter or RateLimiter()
+        self.retry_policy = retry_policy or RetryPolicy()
+        self.retry_stats = RetryStats()
+        self.response_cache = response_cache
+        self.identity_map = identity_map if isinstance(identity_map, IdentityMap) else IdentityMap() if identity_map else None
+        self.lazy_references = lazy_references
+        self.json_decoder = get_json_decoder(json_decoder)
+        self.hooks = as_hooks(hooks)
+        if logger:
+            self.logger = logger
+        else:
+            self.logger = self.create_logger(False)
+        self.timeout = timeout
+        if isinstance(timeout, tuple):
+            connect_timeout, read_timeout = timeout
+            timeout = httpx.Timeout(read_timeout, connect=connect_timeout)
+        #Create an async client to maintain persistent connections, with preset headers
+        self.__client = httpx.AsyncClient(
+            headers={
+                'Authorization': f'Bearer {self.api_key}',
+                'x-xurrent-account': self.api_account
+            },
+            limits=httpx.Limits(max_connections=max_connections, max_keepalive_connections=max_connections if keep_alive else 0),
+            timeout=timeout,
+            follow_redirects=True)
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.aclose()
+
+    async def aclose(self):
+        """
+        Close the underlying HTTP client and its connections.
+        """
+        await self.__client.aclose()
+
+    @contextmanager
+    def profile(self, threshold: int = 3):
+        """
+        Profile the API calls made in a block, e.g. to find N+1 patterns in a script:
+
+            with helper.profile() as profiler:
+                ...
+            print(profiler.report())
+
+        :param threshold: Number of calls of the same shape from which they are reported as finding (default: 3)
+        :return: Context manager yielding the Profiler (module profiling) recording the calls
+        """
+        # Import lazily, the profiler resolves the model classes
+        from .profiling import Profiler
+        profiler = Profiler(threshold)
+        # The hooks are replaced instead of changed, as other threads may be iterating over them
+        self.hooks = self.hooks + [profiler]
+        try:
+            yield profiler
+        finally:
+            self.hooks = [hook for hook in self.hooks if hook is not profiler]
+
+    async def resolve_user(self):
+        """
+        Resolve the API user and their teams.
+        :return: Person object of the API user
+        """
+        # Import Person lazily
+        from .people import Person
+        self.api_user = await Person.async_get_me(self)
+        self.api_user_teams = await self.api_user.async_get_teams()
+        return self.api_user
+
+    # Transport-independent helpers are shared with the synchronous helper
+    create_logger = XurrentApiHelper.create_logger
+    set_log_level = XurrentApiHelper.set_log_level
+    custom_fields_to_object = XurrentApiHelper.custom_fields_to_object
+    object_to_custom_fields = XurrentApiHelper.object_to_custom_fields
+    create_filter_string = XurrentApiHelper.create_filter_string
+    decode_api_id = XurrentApiHelper.decode_api_id
+    encode_api_id = XurrentApiHelper.encode_api_id
+    __append_per_page = XurrentApiHelper._XurrentApiHelper__append_per_page
+    __full_uri = XurrentApiHelper._XurrentApiHelper__full_uri
+    __last_page = staticmethod(XurrentApiHelper._XurrentApiHelper__last_page)
+
+    async def __send(self, method: str, url: str, data=None, headers: dict = None, stream: bool = False,
+                     page: int = None) -> httpx.Response:
+        """
+        Send a single HTTP request, waiting (without blocking the event loop) and retrying according to the
+        rate limiter and retry policy. The hooks of the helper are notified when the request starts and when it finished.
+        :param method: HTTP method to use
+        :param url: Fully-formed URL to call
+        :param data: Data to send with the request (optional)
+        :param headers: Additional request headers (optional)
+        :param stream: Do not download the response body before returning, to read it in chunks (default: False)
+        :param page: Page number of a paginated GET, reported to the hooks (optional)
+        :return: Response object of the successful request
+        """
+        if not self.hooks:
+            return await self.__attempt(method, url, data, headers, stream)
+        event = RequestEvent(method, url, templated_path(url, self.base_url), page)
+        emit(self.hooks, 'request_started', event, self.logger)
+        try:
+            response = await self.__attempt(method, url, data, headers, stream, event)
+        except BaseException as e:
+            event.finish(error=e)
+            emit(self.hooks, 'request_finished', event, self.logger)
+            raise
+        event.finish(response)
+        emit(self.hooks, 'request_finished', event, self.logger)
+        return response
+
+    async def __attempt(self, method: str, url: str, data, headers: dict, stream: bool, event: RequestEvent = None) -> httpx.Response:
+        """
+        Send the attempts of a request until one succeeds, see __send.
+        :param event: Event of the request, updated with its retries, rate limit waits and last status (optional)
+        """
+        started = time.monotonic()
+        attempt = 0
+        self.retry_stats.record_call()
+        while True:
+            attempt += 1
+            # Wait for a slot of the client-side rate limiter
+            wait = self.rate_limiter.reserve()
+            if wait > 0:
+                await asyncio.sleep(wait)
+            if event is not None:
+                event.retries = attempt - 1
+                event.rate_limit_sleep += max(wait, 0.0)
+
+            # Log the request
+            self.logger.debug(f'{method} {url} {data if method != "GET" else ""}')
+
+            # Make the HTTP request
+            try:
+                request = self.__client.build_request(method, url, json=data, headers=headers)
+                response = await self.__client.send(request, stream=stream)
+            except httpx.HTTPError as e:
+                delay = self.retry_policy.next_delay(method, attempt, started, exception=e)
+                if delay is None:
+                    self.retry_stats.record_failure()
+                    self.logger.error(f'HTTP request failed: {e}')
+                    raise
+                self.logger.warning(f'HTTP request failed: {e}. Retrying after {delay:.2f} seconds (attempt {attempt}/{self.retry_policy.max_attempts})...')
+                self.retry_stats.record_retry(type(e).__name__, delay)
+                await asyncio.sleep(delay)
+                continue
+            self.rate_limiter.update(response.headers)
+            if event is not None:
+                event.status = response.status_code
+
+            # A 304 answers a conditional request of the response cache
+            if response.is_success or (response.status_code == 304 and headers
+                                       and ('If-None-Match' in headers or 'If-Modified-Since' in headers)):
+                return response
+            if stream:
+                await response.aread()
+
+            delay = self.retry_policy.next_delay(method, attempt, started, response.status_code, response.headers)
+            if delay is None:
+                # Non-retryable status code, or retries exhausted
+                self.retry_stats.record_failure()
+                self.logger.error(f'Error in request: {response.status_code} - {response.text}')
+                try:
+                    response.raise_for_status()
+                except httpx.HTTPError as e:
+                    self.logger.error(f'HTTP request failed: {e}')
+                    raise
+                return response
+
+            self.retry_stats.record_retry(response.status_code, delay)
+            if response.status_code == 429:
+                # Handle rate limiting, holding back all tasks sharing the limiter
+                self.logger.warning(f'Rate limit reached. Retrying after {delay:.2f} seconds...')
+                self.rate_limiter.pause(delay)
+            else:
+                self.logger.warning(f'Error in request: {response.status_code}. Retrying after {delay:.2f} seconds (attempt {attempt}/{self.retry_policy.max_attempts})...')
+                await asyncio.sleep(delay)
+
+    async def __fetch(self, method: str, url: str, data=None, page: int = None):
+        """
+        Send a single HTTP request and decode its JSON body.
+        GET responses are served from the response cache (if enabled) when the server reports them unchanged.
+        :param method: HTTP method to use
+        :param url: Fully-formed URL to call
+        :param data: Data to send with the request (optional)
+        :param page: Page number of a paginated GET (optional)
+        :return: Tuple of the decoded body (None for 204 responses) and the response headers
+        """
+        cache = self.response_cache if method == 'GET' else None
+        entry = cache.get(url) if cache is not None else None
+
+        response = await self.__send(method, url, data, headers=entry.validators() if entry else None, page=page)
+        if entry is not None and response.status_code == 304:
+            cache.touch(url)
+            cache.record(hit=True)
+            return entry.data, entry.headers
+        if response.status_code == 204:
+            return None, response.headers
+
+        response_data = self.json_decoder(response.content)
+        if cache is not None:
+            cache.record(hit=False)
+            cache.put(url, response.headers, response_data, len(response.content))
+        return response_data, response.headers
+
+    async def __iter_pages(self, uri: str, method='GET', data=None, per_page=100, prefetch_workers=0):
+        """
+        Yield the decoded response of every page of a call, following the 'Link' header for paginated GET requests.
+        :param uri: URI to call
+        :param method: HTTP method to use (default: GET)
+        :param data: Data to send with the request (optional)
+        :param per_page: Number of records per page for GET requests, setting to 0/None disables pagination (default: 100)
+        :param prefetch_workers: Number of pages to fetch concurrently once the page count is known (default: 0)
+        :return: Async generator of decoded responses, one per page (None for 204 responses)
+        """
+        next_page_url = self.__full_uri(uri)
+        first_page = True
+
+        while next_page_url:
+            # Append pagination parameters for GET requests
+            page = None
+            if per_page and method == 'GET':
+                next_page_url = self.__append_per_page(next_page_url, per_page)
+                page = page_number(next_page_url) or 1
+
+            response_data, headers = await self.__fetch(method, next_page_url, data, page)
+            yield response_data
+            if response_data is None:
+                return
+
+            # Only paginated GET requests return a list with a 'Link' header to the next page
+            if method != 'GET' or not isinstance(response_data, list):
+                return
+            links = parse_link_header(headers.get('Link'))
+            next_page_url = links.get('next')
+
+            # Once the page count is known, the remaining pages can be requested concurrently
+            if first_page and next_page_url and prefetch_workers:
+                next_page = page_number(next_page_url)
+                last_page = self.__last_page(headers, links)
+                if next_page and last_page:
+                    async for page in self.__prefetch_pages(next_page_url, next_page, last_page, prefetch_workers):
+                        yield page
+                    return
+            first_page = False
+
+    async def __prefetch_pages(self, page_url: str, first_page: int, last_page: int, workers: int):
+        """
+        Fetch a range of pages as concurrent tasks and yield them in page order.
+        At most twice as many pages as there are workers are requested ahead of the consumer.
+        :param page_url: URL of any page of the listing, its 'page' parameter is replaced for each page
+        :param first_page: Number of the first page to fetch
+        :param last_page: Number of the last page to fetch
+        :param workers: Number of pages to fetch concurrently
+        :return: Async generator of decoded pages
+        """
+        async def fetch(page):
+            return (await self.__fetch('GET', set_query_param(page_url, 'page', page), page=page))[0]
+
+        pending = []
+        try:
+            next_page = first_page
+            while next_page <= last_page or pending:
+                while next_page <= last_page and len(pending) < workers * 2:
+                    pending.append(asyncio.ensure_future(fetch(next_page)))
+                    next_page += 1
+                yield await pending.pop(0)
+        finally:
+            for task in pending:
+                task.cancel()
+
+    async def api_call(self, uri: str, method='GET', data=None, per_page=100, raw=False, prefetch_workers: int = None):
+        """
+        Make a call to the Xurrent API with support for rate limiting and pagination.
+        :param uri: URI to call
+        :param method: HTTP method to use (default: GET)
+        :param data: Data to send with the request (optional)
+        :param per_page: Number of records per page for GET requests, setting to 0/None disables pagination (default: 100)
+        :param raw: Do not process the request result, e.g. in the case of non-JSON data (default: False)
+        :param prefetch_workers: Number of pages of a paginated GET to fetch concurrently (default: helper setting)
+        :return: JSON response from the API or aggregated data for paginated GET
+        """
+        #Stop after the first response if we shall not process or interperet the returned data
+        if raw:
+            url = self.__full_uri(uri)
+            if per_page and method == 'GET':
+                url = self.__append_per_page(url, per_page)
+            response = await self.__send(method, url, data)
+            return None if response.status_code == 204 else response.content
+
+        if prefetch_workers is None:
+            prefetch_workers = self.prefetch_workers
+        aggregated_data = []
+        async for page in self.__iter_pages(uri, method, data, per_page, prefetch_workers):
+            if method != 'GET' or not isinstance(page, list):
+                return page  # Return for non-GET requests and single records
+            aggregated_data.extend(page)
+
+        # Return aggregated results for paginated GET
+        return aggregated_data
+
+    async def iter_api_call(self, uri: str, method='GET', data=None, per_page=100, prefetch_workers: int = None):
+        """
+        Make a call to the Xurrent API and yield the returned records page by page.
+        :param uri: URI to call
+        :param method: HTTP method to use (default: GET)
+        :param data: Data to send with the request (optional)
+        :param per_page: Number of records per page for GET requests, setting to 0/None disables pagination (default: 100)
+        :param prefetch_workers: Number of pages of a paginated GET to fetch concurrently (default: helper setting)
+        :return: Async generator of records; a single (non-list) response is yielded as one item
+        """
+        if prefetch_workers is None:
+            prefetch_workers = self.prefetch_workers
+        async for page in self.__iter_pages(uri, method, data, per_page, prefetch_workers):
+            if isinstance(page, list):
+                for record in page:
+                    yield record
+            elif page is not None:
+                yield page
+
+    async def iter_api_pages(self, uri: str, method='GET', data=None, per_page=100, prefetch_workers: int = None):
+        """
+        Make a call to the Xurrent API and yield the returned records as one list per page.
+        :param uri: URI to call
+        :param method: HTTP method to use (default: GET)
+        :param data: Data to send with the request (optional)
+        :param per_page: Number of records per page for GET requests, setting to 0/None disables pagination (default: 100)
+        :param prefetch_workers: Number of pages of a paginated GET to fetch concurrently (default: helper setting)
+        :return: Async generator of lists of records; a single (non-list) response is yielded as a list of one item
+        """
+        if prefetch_workers is None:
+            prefetch_workers = self.prefetch_workers
+        async for page in self.__iter_pages(uri, method, data, per_page, prefetch_workers):
+            if isinstance(page, list):
+                yield page
+            elif page is not None:
+                yield [page]
+
+    async def bulk_export(self, type: str, export_format='csv', save_as=None, poll_timeout=5, max_poll_interval: float = 30,
+                          timeout: float = None, chunk_size: int = 1024 * 1024):
+        """
+        Make a call to the Xurrent API to perform a bulk export
+        :param type: Resource type(s) to download, comma-delimited
+        :param export_format: either 'csv' or 'xlsx' (Default: csv)
+        :param save_as: Save the results to a file instead of returning the raw result.
+                        The download is streamed to disk in chunks, which is recommended for large exports.
+        :param poll_timeout: Seconds to wait before the first export result poll, doubled after every poll (Default: 5 seconds)
+        :param max_poll_interval: Upper bound of the wait between polls in seconds (Default: 30 seconds)
+        :param timeout: Maximum seconds to wait for the export to finish, None to wait until it finishes (Default: None)
+        :param chunk_size: Size in bytes of the chunks written to save_as (Default: 1 MiB)
+        :return: CSV or XSLX data from the export, ZIP if multiple types supplied; True if saved to a file
+        :raises BulkExportError: If the export fails, does not finish in time or the download is incomplete
+        """
+
+        #Initiate an export and get the polling token
+        export = await self.api_call('/export', method = 'POST', data = dict(type = type, export_format = export_format))
+
+        #Poll the export results with backoff until the export finished
+        result = await self.__poll(f"/export/{export['token']}", poll_timeout, max_poll_interval, timeout)
+        if result is None:
+            raise BulkExportError(f"Export {export['token']} did not finish within {timeout} seconds")
+        if result['state'] != 'done':
+            self.logger.error(f'Export request failed: {result=}')
+            raise BulkExportError(f"Export request failed: {result.get('message') or result['state']}", result)
+
+        #Save or Return the exported data
+        if save_as:
+            await self.__download(result['url'], save_as, chunk_size)
+            return True
+        return await self.api_call(result["url"], per_page = None, raw = True)
+
+    async def __poll(self, uri: str, poll_interval: float, max_poll_interval: float, timeout: float = None) -> dict:
+        """
+        Poll the state of an export until it is no longer queued or processing, doubling the wait between polls.
+        :param uri: URI of the job state
+        :param poll_interval: Seconds to wait before the first poll
+        :param max_poll_interval: Upper bound of the wait between polls in seconds
+        :param timeout: Maximum seconds to wait for the job, None to wait until it finishes
+        :return: Last state of the job, None if it did not finish within the timeout
+        """
+        deadline = time.monotonic() + timeout if timeout is not None else None
+        delay = poll_interval
+        while True:
+            if deadline is not None:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return None
+                delay = min(delay, remaining)
+            self.logger.debug(f'Poll wait of {delay:.2f} seconds.')
+            await asyncio.sleep(delay)
+            result = await self.api_call(uri, per_page=None)
+            if result['state'] not in ('queued', 'processing'):
+                return result
+            delay = min(delay * 2, max_poll_interval)
+
+    async def __download(self, url: str, save_as, chunk_size: int) -> int:
+        """
+        Stream a download to a file in chunks, see XurrentApiHelper for details.
+        :param url: URL to download
+        :param save_as: Path of the file to save the download as
+        :param chunk_size: Size in bytes of the chunks to write
+        :return: Size of the download in bytes
+        """
+        started = time.monotonic()
+        attempt = 0
+        directory = os.path.dirname(os.path.abspath(save_as))
+        while True:
+            attempt += 1
+            response = await self.__send('GET', self.__full_uri(url), stream=True)
+            # The Content-Length of a compressed response is the size before decompression
+            expected = response.headers.get('Content-Length') if not response.headers.get('Content-Encoding') else None
+            descriptor, partial_path = tempfile.mkstemp(dir=directory, prefix='.xurrent-export-')
+            try:
+                with os.fdopen(descriptor, 'wb') as file:
+                    try:
+                        async for chunk in response.aiter_bytes(chunk_size):
+                            file.write(chunk)
+                    finally:
+                        await response.aclose()
+                    size = file.tell()
+                if expected is not None and size != int(expected):
+                    raise BulkExportError(f'Export download is incomplete: received {size} of {expected} bytes')
+                os.replace(partial_path, save_as)
+                return size
+            except httpx.HTTPError as e:
+                os.remove(partial_path)
+                delay = self.retry_policy.next_delay('GET', attempt, started, exception=e)
+                if delay is None:
+                    self.logger.error(f'Export download failed: {e}')
+                    raise BulkExportError(f'Export download failed: {e}') from e
+                self.logger.warning(f'Export download failed: {e}. Retrying after {delay:.2f} seconds...')
+                self.retry_stats.record_retry(type(e).__name__, delay)
+                await asyncio.sleep(delay)
+            except BaseException:
+                os.remove(partial_path)
+                raise
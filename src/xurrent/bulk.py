@@ -0,0 +1,214 @@
+from __future__ import annotations  # Needed for forward references
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Iterable, List, Tuple, Union
+import csv
+import io
+import os
+import shutil
+import tempfile
+import uuid
+
+
+class BulkResult:
+    """
+    Outcome of a single item of a bulk operation.
+    """
+    __slots__ = ('id', 'data', 'result', 'error', 'retries')
+
+    def __init__(self, id, data, result=None, error: Exception = None, retries: int = 0):
+        self.id = id
+        self.data = data
+        self.result = result
+        self.error = error
+        self.retries = retries
+
+    @property
+    def ok(self) -> bool:
+        """
+        :return: True if the item was processed successfully
+        """
+        return self.error is None
+
+    @property
+    def status_code(self) -> int:
+        """
+        :return: HTTP status code of a failed call, None if the call succeeded or failed without a response
+        """
+        response = getattr(self.error, 'response', None)
+        return response.status_code if response is not None else None
+
+    def __repr__(self) -> str:
+        if self.ok:
+            return f"BulkResult(id={self.id}, ok=True, retries={self.retries})"
+        return f"BulkResult(id={self.id}, ok=False, status_code={self.status_code}, error={self.error!r}, retries={self.retries})"
+
+
+def run_bulk(connection_object: XurrentApiHelper, items: Iterable[Tuple[object, dict]], operation: Callable,
+             workers: int = 4, progress: Callable[[int, int, BulkResult], None] = None) -> List[BulkResult]:
+    """
+    Apply an operation to (id, data) pairs through a bounded thread pool.
+    All calls go through the rate limiter and retry policy of the helper. A failing item does not stop the others:
+    its exception is recorded in its result.
+    :param connection_object: Instance of XurrentApiHelper
+    :param items: Iterable of (id, data) pairs
+    :param operation: Callable taking (connection_object, id, data) and returning the result of the item
+    :param workers: Number of threads to process items with (default: 4)
+    :param progress: Callable invoked with (done, total, result) after every item, total is None if unknown (optional)
+    :return: List of BulkResult, in the order of the items
+    """
+    total = len(items) if hasattr(items, '__len__') else None
+    retry_stats = connection_object.retry_stats
+
+    def process(id, data):
+        retries = retry_stats.thread_retries()
+        try:
+            result = BulkResult(id, data, result=operation(connection_object, id, data))
+        except Exception as e:
+            connection_object.logger.warning(f'Bulk operation failed for {id}: {e!r}')
+            result = BulkResult(id, data, error=e)
+        result.retries = retry_stats.thread_retries() - retries
+        return result
+
+    results = []
+    executor = ThreadPoolExecutor(max_workers=max(workers, 1), thread_name_prefix='xurrent-bulk')
+    try:
+        pending = []
+        iterator = iter(items)
+        exhausted = False
+        while not exhausted or pending:
+            # Keep a bounded window of submitted items, so that large iterables are not read up front
+            while not exhausted and len(pending) < workers * 2:
+                try:
+                    id, data = next(iterator)
+                except StopIteration:
+                    exhausted = True
+                    break
+                pending.append(executor.submit(process, id, data))
+            if pending:
+                result = pending.pop(0).result()
+                results.append(result)
+                if progress:
+                    progress(len(results), total, result)
+    finally:
+        executor.shutdown(wait=True, cancel_futures=True)
+    return results
+
+
+class BulkImportError(RuntimeError):
+    """
+    Raised when an import fails or does not finish in time.
+    """
+
+    def __init__(self, message: str, result: dict = None):
+        super().__init__(message)
+        self.result = result
+
+
+class BulkExportError(RuntimeError):
+    """
+    Raised when an export fails, does not finish in time or its download is incomplete.
+    """
+
+    def __init__(self, message: str, result: dict = None):
+        super().__init__(message)
+        self.result = result
+
+
+class ImportResult:
+    """
+    Outcome of a finished import, as reported by the /import endpoint.
+    """
+    __slots__ = ('token', 'state', 'results', 'message', 'logfile')
+
+    def __init__(self, token: str, state: str, results: dict = None, message: str = None, logfile: str = None, **kwargs):
+        self.token = token
+        self.state = state
+        self.results = results or {}
+        self.message = message
+        self.logfile = logfile
+
+    @classmethod
+    def from_data(cls, token: str, data: dict) -> ImportResult:
+        return cls(**{'token': token, **data})
+
+    @property
+    def created(self) -> int:
+        return self.results.get('created', 0)
+
+    @property
+    def updated(self) -> int:
+        return self.results.get('updated', 0)
+
+    @property
+    def deleted(self) -> int:
+        return self.results.get('deleted', 0)
+
+    @property
+    def unchanged(self) -> int:
+        return self.results.get('unchanged', 0)
+
+    @property
+    def failures(self) -> int:
+        return self.results.get('failures', 0)
+
+    @property
+    def errors(self) -> int:
+        return self.results.get('errors', 0)
+
+    @property
+    def ok(self) -> bool:
+        """
+        :return: True if the import finished without failed rows or errors (details are in the logfile)
+        """
+        return self.state == 'done' and not self.failures and not self.errors
+
+    def to_dict(self) -> dict:
+        return {name: getattr(self, name) for name in self.__slots__}
+
+    def __repr__(self) -> str:
+        return (f"ImportResult(state={self.state}, created={self.created}, updated={self.updated}, deleted={self.deleted}, "
+                f"unchanged={self.unchanged}, failures={self.failures}, errors={self.errors})")
+
+
+def write_import_body(file, boundary: str, type: str, data_or_path: Union[str, os.PathLike, Iterable[dict]], fieldnames: List[str] = None) -> None:
+    """
+    Write the multipart/form-data body of an import to a binary file, without holding the CSV data in memory.
+    :param file: Binary file object to write to
+    :param boundary: Multipart boundary
+    :param type: Resource type to import
+    :param data_or_path: Path of a CSV file, or an iterable of dicts that is written as CSV
+    :param fieldnames: CSV columns of the dicts (default: the keys of the first dict)
+    """
+    file.write(f'--{boundary}\r\nContent-Disposition: form-data; name="type"\r\n\r\n{type}\r\n'.encode())
+    file.write(f'--{boundary}\r\nContent-Disposition: form-data; name="file"; filename="{type}.csv"\r\n'
+               f'Content-Type: text/csv\r\n\r\n'.encode())
+    if isinstance(data_or_path, (str, os.PathLike)):
+        with open(data_or_path, 'rb') as source:
+            shutil.copyfileobj(source, file)
+    else:
+        text = io.TextIOWrapper(file, encoding='utf-8', newline='')
+        writer = None
+        for row in data_or_path:
+            if writer is None:
+                writer = csv.DictWriter(text, fieldnames=fieldnames or list(row.keys()))
+                writer.writeheader()
+            writer.writerow(row)
+        text.flush()
+        text.detach()
+    file.write(f'\r\n--{boundary}--\r\n'.encode())
+
+
+def import_body(type: str, data_or_path, fieldnames: List[str] = None) -> Tuple[object, str]:
+    """
+    Spool the multipart/form-data body of an import to a temporary file.
+    :return: Tuple of the temporary file (positioned at its start) and the Content-Type header of the body
+    """
+    boundary = uuid.uuid4().hex
+    file = tempfile.TemporaryFile()
+    try:
+        write_import_body(file, boundary, type, data_or_path, fieldnames)
+    except BaseException:
+        file.close()
+        raise
+    file.seek(0)
+    return file, f'multipart/form-data; boundary={boundary}'
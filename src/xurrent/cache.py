@@ -0,0 +1,149 @@
+from __future__ import annotations  # Needed for forward references
+from collections import OrderedDict
+import threading
+import time
+
+
+class CacheEntry:
+    """
+    Decoded body and validators of a cached GET response.
+    """
+    __slots__ = ('etag', 'last_modified', 'data', 'headers', 'size', 'stored_at')
+
+    # Response headers that are kept with the cached body, as needed for pagination
+    KEPT_HEADERS = ('Link', 'X-Pagination-Total-Pages', 'X-Pagination-Current-Page', 'X-Pagination-Per-Page', 'X-Pagination-Total-Entries')
+
+    def __init__(self, etag: str, last_modified: str, data, headers: dict, size: int):
+        self.etag = etag
+        self.last_modified = last_modified
+        self.data = data
+        self.headers = headers
+        self.size = size
+        self.stored_at = time.monotonic()
+
+    def validators(self) -> dict:
+        """
+        :return: Request headers to make a conditional request for this entry
+        """
+        headers = {}
+        if self.etag:
+            headers['If-None-Match'] = self.etag
+        if self.last_modified:
+            headers['If-Modified-Since'] = self.last_modified
+        return headers
+
+
+class ResponseCache:
+    """
+    Thread-safe LRU cache of GET responses for conditional requests.
+
+    Responses carrying an ETag or Last-Modified header are stored per URL. Further GETs of the same URL
+    send If-None-Match / If-Modified-Since, and on a '304 Not Modified' the stored body is served without
+    downloading or decoding it again.
+
+    Entries are evicted when they are older than `ttl` seconds, and least recently used entries are evicted
+    when `max_entries` or `max_bytes` (measured as the size of the response bodies) is exceeded.
+    Cached bodies are shared between callers and must not be modified.
+    """
+
+    def __init__(self, max_entries: int = 1024, ttl: float = 300, max_bytes: int = 64 * 1024 * 1024):
+        """
+        :param max_entries: Maximum number of cached responses (default: 1024)
+        :param ttl: Seconds after which an entry is evicted, None to keep entries until they are displaced (default: 300)
+        :param max_bytes: Maximum total size of the cached response bodies in bytes (default: 64 MiB)
+        """
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._entries)
+
+    @property
+    def size(self) -> int:
+        """
+        :return: Total size of the cached response bodies in bytes
+        """
+        return self._bytes
+
+    def get(self, url: str) -> CacheEntry:
+        """
+        Look up the entry of a URL, evicting it if it has expired.
+        :param url: Fully-formed URL
+        :return: Cache entry, None if the URL is not cached
+        """
+        with self._lock:
+            entry = self._entries.get(url)
+            if entry is None:
+                return None
+            if self.ttl is not None and time.monotonic() - entry.stored_at > self.ttl:
+                self.__remove(url)
+                return None
+            self._entries.move_to_end(url)
+            return entry
+
+    def put(self, url: str, headers, data, size: int) -> CacheEntry:
+        """
+        Store a decoded response if it carries a validator (ETag or Last-Modified).
+        :param url: Fully-formed URL
+        :param headers: Response headers
+        :param data: Decoded response body
+        :param size: Size of the response body in bytes
+        :return: The new cache entry, None if the response cannot be cached
+        """
+        etag = headers.get('ETag')
+        last_modified = headers.get('Last-Modified')
+        if not etag and not last_modified:
+            return None
+        if 'no-store' in (headers.get('Cache-Control') or ''):
+            return None
+        if self.max_bytes is not None and size > self.max_bytes:
+            return None
+        kept_headers = {name: headers[name] for name in CacheEntry.KEPT_HEADERS if name in headers}
+        entry = CacheEntry(etag, last_modified, data, kept_headers, size)
+        with self._lock:
+            if url in self._entries:
+                self.__remove(url)
+            self._entries[url] = entry
+            self._bytes += size
+            while self._entries and (len(self._entries) > self.max_entries or (self.max_bytes is not None and self._bytes > self.max_bytes)):
+                self.__remove(next(iter(self._entries)))
+        return entry
+
+    def touch(self, url: str) -> None:
+        """
+        Restart the time to live of an entry, after the server confirmed it is unchanged.
+        :param url: Fully-formed URL
+        """
+        with self._lock:
+            entry = self._entries.get(url)
+            if entry is not None:
+                entry.stored_at = time.monotonic()
+
+    def record(self, hit: bool) -> None:
+        with self._lock:
+            if hit:
+                self.hits += 1
+            else:
+                self.misses += 1
+
+    def invalidate(self, url: str = None) -> None:
+        """
+        Remove one URL, or all entries if no URL is given.
+        :param url: Fully-formed URL (optional)
+        """
+        with self._lock:
+            if url is None:
+                self._entries.clear()
+                self._bytes = 0
+            elif url in self._entries:
+                self.__remove(url)
+
+    def __remove(self, url: str) -> None:
+        entry = self._entries.pop(url)
+        self._bytes -= entry.size
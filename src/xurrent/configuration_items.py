@@ -1,6 +1,9 @@
 from __future__ import annotations  # Needed for forward references
-from .core import XurrentApiHelper, JsonSerializableDict
-from typing import Optional, List, Dict, Type, TypeVar
+from .core import XurrentApiHelper, JsonSerializableDict, with_fields
+from .identity import resolve_instance, resolve_instances
+from .sync import WatermarkStore, sync_records
+from .async_core import AsyncXurrentApiHelper
+from typing import Optional, List, Dict, AsyncIterator, Iterator, Type, TypeVar
 from enum import Enum
 
 T = TypeVar('T', bound='ConfigurationItem')
@@ -13,6 +16,8 @@ class ConfigurationItemPredefinedFilter(str, Enum):
 class ConfigurationItem(JsonSerializableDict):
     # https://developer.xurrent.com/v1/configuration_items/
     __resourceUrl__ = 'cis'
+    __timestamps__ = ('created_at', 'updated_at')
+    __slots__ = ('id', 'label', 'name', 'status', 'attributes', 'created_at', 'updated_at', 'nodeID')
 
     def __init__(self, 
                  connection_object: XurrentApiHelper,
@@ -47,18 +52,26 @@ class ConfigurationItem(JsonSerializableDict):
             raise TypeError(f"Expected 'data' to be a dictionary, got {type(data).__name__}")
         if 'id' not in data:
             raise ValueError("Data dictionary must contain an 'id' field.")
-        return cls(connection_object, **data)
+        return resolve_instance(cls, connection_object, data)
 
     @classmethod
-    def get_by_id(cls, connection_object: XurrentApiHelper, id: int) -> T:
+    def from_data_many(cls, connection_object: XurrentApiHelper, data: List[dict]) -> List[T]:
+        """
+        Create the ConfigurationItem objects of a page or list of records, building every referenced record only once.
+        """
+        return resolve_instances(cls, connection_object, data)
+
+    @classmethod
+    def get_by_id(cls, connection_object: XurrentApiHelper, id: int, fields: List[str] = None) -> T:
         """
         Retrieve a configuration item by its ID.
         """
         uri = f'{connection_object.base_url}/{cls.__resourceUrl__}/{id}'
+        uri = with_fields(uri, fields)
         return cls.from_data(connection_object, connection_object.api_call(uri, 'GET'))
 
     @classmethod
-    def get_configuration_items(cls, connection_object: XurrentApiHelper, predefinedFilter: ConfigurationItemPredefinedFilter = None, queryfilter: dict = None) -> List[T]:
+    def get_configuration_items(cls, connection_object: XurrentApiHelper, predefinedFilter: ConfigurationItemPredefinedFilter = None, queryfilter: dict = None, fields: List[str] = None) -> List[T]:
         """
         Retrieve all configuration items.
         """
@@ -67,8 +80,32 @@ class ConfigurationItem(JsonSerializableDict):
             uri = f'{uri}/{predefinedFilter}'
         if queryfilter:
             uri += '?' + connection_object.create_filter_string(queryfilter)
+        uri = with_fields(uri, fields)
         response = connection_object.api_call(uri, 'GET')
-        return [cls.from_data(connection_object, ci) for ci in response]
+        return cls.from_data_many(connection_object, response)
+
+    @classmethod
+    def iter_configuration_items(cls, connection_object: XurrentApiHelper, predefinedFilter: ConfigurationItemPredefinedFilter = None, queryfilter: dict = None, fields: List[str] = None) -> Iterator[T]:
+        """
+        Iterate over configuration items page by page, without loading all of them into memory.
+        """
+        uri = f'{connection_object.base_url}/{cls.__resourceUrl__}'
+        if predefinedFilter:
+            uri = f'{uri}/{predefinedFilter}'
+        if queryfilter:
+            uri += '?' + connection_object.create_filter_string(queryfilter)
+        uri = with_fields(uri, fields)
+        for page in connection_object.iter_api_pages(uri, 'GET'):
+            yield from cls.from_data_many(connection_object, page)
+
+    @classmethod
+    def sync(cls, connection_object: XurrentApiHelper, store: WatermarkStore, key: str = None, overlap: float = 300,
+             queryfilter: dict = None, fields: List[str] = None) -> Iterator[T]:
+        """
+        Iterate over the configuration items updated since the last sync, advancing the watermark in the store once all have been read.
+        See xurrent.sync.sync_records for the overlap window and the watermark.
+        """
+        return sync_records(connection_object, cls, store, key, overlap, queryfilter, fields)
 
     def update(self, data: dict) -> T:
         """
@@ -132,3 +169,60 @@ class ConfigurationItem(JsonSerializableDict):
         uri = f'{self._connection_object.base_url}/{self.__resourceUrl__}/{self.id}/trash'
         response = self._connection_object.api_call(uri, 'POST')
         return ConfigurationItem.from_data(self._connection_object, response)
+
+    # the following methods are the asyncio counterparts of the methods above, for use with AsyncXurrentApiHelper
+
+    @classmethod
+    async def async_get_by_id(cls, connection_object: AsyncXurrentApiHelper, id: int, fields: List[str] = None) -> T:
+        """
+        Retrieve a configuration item by its ID.
+        """
+        uri = f'{connection_object.base_url}/{cls.__resourceUrl__}/{id}'
+        uri = with_fields(uri, fields)
+        return cls.from_data(connection_object, await connection_object.api_call(uri, 'GET'))
+
+    @classmethod
+    async def async_get_configuration_items(cls, connection_object: AsyncXurrentApiHelper, predefinedFilter: ConfigurationItemPredefinedFilter = None, queryfilter: dict = None, fields: List[str] = None) -> List[T]:
+        """
+        Retrieve all configuration items.
+        """
+        uri = f'{connection_object.base_url}/{cls.__resourceUrl__}'
+        if predefinedFilter:
+            uri = f'{uri}/{predefinedFilter}'
+        if queryfilter:
+            uri += '?' + connection_object.create_filter_string(queryfilter)
+        uri = with_fields(uri, fields)
+        response = await connection_object.api_call(uri, 'GET')
+        return cls.from_data_many(connection_object, response)
+
+    @classmethod
+    async def async_iter_configuration_items(cls, connection_object: AsyncXurrentApiHelper, predefinedFilter: ConfigurationItemPredefinedFilter = None, queryfilter: dict = None, fields: List[str] = None) -> AsyncIterator[T]:
+        """
+        Iterate over configuration items page by page, without loading all of them into memory.
+        """
+        uri = f'{connection_object.base_url}/{cls.__resourceUrl__}'
+        if predefinedFilter:
+            uri = f'{uri}/{predefinedFilter}'
+        if queryfilter:
+            uri += '?' + connection_object.create_filter_string(queryfilter)
+        uri = with_fields(uri, fields)
+        async for page in connection_object.iter_api_pages(uri, 'GET'):
+            for ci in cls.from_data_many(connection_object, page):
+                yield ci
+
+    async def async_update(self, data: dict) -> T:
+        """
+        Update the current configuration item instance with new data.
+        """
+        uri = f'{self._connection_object.base_url}/{self.__resourceUrl__}/{self.id}'
+        response = await self._connection_object.api_call(uri, 'PATCH', data)
+        return ConfigurationItem.from_data(self._connection_object, response)
+
+    @classmethod
+    async def async_create(cls, connection_object: AsyncXurrentApiHelper, data: dict) -> T:
+        """
+        Create a new configuration item.
+        """
+        uri = f'{connection_object.base_url}/{cls.__resourceUrl__}'
+        response = await connection_object.api_call(uri, 'POST', data)
+        return cls.from_data(connection_object, response)
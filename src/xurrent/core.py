@@ -3,10 +3,24 @@ from datetime import datetime
 from enum import Enum
 import time
 import requests
+from requests.adapters import HTTPAdapter
 import logging
 import json
 import re
 import base64
+import os
+import tempfile
+import threading
+from contextlib import contextmanager
+from concurrent.futures import ThreadPoolExecutor
+from .rate_limit import RateLimiter
+from .retry import RetryPolicy, RetryStats
+from .cache import ResponseCache
+from .identity import IdentityMap
+from .timestamps import install_timestamp_fields, raw_attribute
+from .instrumentation import RequestEvent, as_hooks, emit, templated_path
+from .serialize import _UNSET, dumps, get_json_decoder, serializer_of, to_json_lines
+from .bulk import BulkExportError, BulkImportError, ImportResult, import_body
 
 class LogLevel(Enum):
     DEBUG = logging.DEBUG
@@ -16,37 +30,144 @@ class LogLevel(Enum):
     CRITICAL = logging.CRITICAL
 
 class JsonSerializableDict(dict):
+    # Fields declared by a model in __slots__ are stored in the slots, any other field of a record in the
+    # instance __dict__, which serves as overflow mapping and is only created when such a field is set.
+    __slots__ = ('_connection_object', '__dict__', '__weakref__')
+    _fields = ()
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        fields = []
+        for klass in reversed(cls.__mro__):
+            slots = klass.__dict__.get('__slots__', ())
+            for name in (slots,) if isinstance(slots, str) else slots:
+                if not name.startswith('_') and name not in fields:
+                    fields.append(name)
+        cls._fields = tuple(fields)
+        install_timestamp_fields(cls)
+
     def __init__(self, **kwargs):
         # Initialize with keyword arguments as dictionary items
         super().__init__(**kwargs)
 
+    def _attributes(self) -> dict:
+        """
+        :return: Dictionary of the fields set on the instance, declared fields first
+        """
+        attributes = {}
+        for name in self._fields:
+            value = raw_attribute(self, name, _UNSET)
+            if value is not _UNSET:
+                attributes[name] = value
+        attributes.update(self.__dict__)
+        return attributes
+
     def to_dict(self) -> dict:
-        """Ensure nested objects are converted to dictionaries."""
-        result = {}
-        for key, value in self.__dict__.items():
-            if not key.startswith('_'):  # Exclude private attributes
-                # Recursively call to_dict on nested JsonSerializableDict objects
-                if isinstance(value, JsonSerializableDict):
-                    result[key] = value.to_dict()
-                elif isinstance(value, list):
-                    #call to_dict on each item in the list
-                    result[key] = [item.to_dict() for item in value]
-                elif isinstance(value, datetime):
-                    result[key] = value.isoformat()
-                else:
-                    result[key] = value
-        return result
-    def to_json(self):
-        """Convert the dictionary to a JSON string."""
-        return json.dumps(self.to_dict())
+        """Convert the record to a dictionary of plain JSON types, including nested models."""
+        return serializer_of(type(self)).to_dict(self)
 
+    def to_json(self) -> str:
+        """Convert the dictionary to a JSON string, through orjson if it is installed."""
+        return dumps(self)
+
+    @staticmethod
+    def to_json_lines(records, file=None):
+        """
+        Encode records as JSON Lines, see xurrent.serialize.to_json_lines.
+        """
+        return to_json_lines(records, file)
+
+
+
+def parse_link_header(link_header: str) -> dict:
+    """
+    Parse an HTTP 'Link' header into a dictionary of relation name to URL.
+    :param link_header: Value of the 'Link' header (may be None)
+    :return: Dictionary mapping the relation (e.g. 'next', 'last') to its URL
+    >>> parse_link_header('<https://api.example.com/tasks?page=2>; rel="next", <https://api.example.com/tasks?page=5>; rel="last"')
+    {'next': 'https://api.example.com/tasks?page=2', 'last': 'https://api.example.com/tasks?page=5'}
+    >>> parse_link_header(None)
+    {}
+    """
+    links = {}
+    if not link_header:
+        return links
+    for link in link_header.split(','):
+        if ';' not in link:
+            continue
+        url, rel = link.split(';', 1)
+        rel = rel.strip()
+        if rel.startswith('rel='):
+            rel = rel[4:].strip('"')
+        links[rel] = url.strip().strip('<>')
+    return links
+
+
+def page_number(url: str) -> int:
+    """
+    Extract the 'page' query parameter of a pagination URL.
+    :param url: URL to inspect
+    :return: Page number, None if the URL has no 'page' parameter
+    >>> page_number('https://api.example.com/tasks?page=12&per_page=100')
+    12
+    >>> page_number('https://api.example.com/tasks?per_page=100') is None
+    True
+    """
+    match = re.search(r'[?&]page=(\d+)', url)
+    return int(match.group(1)) if match else None
+
+
+def set_query_param(url: str, name: str, value) -> str:
+    """
+    Set a query parameter of a URL, replacing its current value if present.
+    :param url: URL to modify
+    :param name: Name of the query parameter
+    :param value: Value to set
+    :return: URL with the query parameter set
+    >>> set_query_param('https://api.example.com/tasks?page=2&per_page=100', 'page', 7)
+    'https://api.example.com/tasks?page=7&per_page=100'
+    >>> set_query_param('https://api.example.com/tasks?per_page=100', 'page', 3)
+    'https://api.example.com/tasks?per_page=100&page=3'
+    >>> set_query_param('https://api.example.com/tasks', 'page', 3)
+    'https://api.example.com/tasks?page=3'
+    """
+    pattern = re.compile(rf'([?&]){re.escape(name)}=[^&#]*')
+    if pattern.search(url):
+        return pattern.sub(rf'\g<1>{name}={value}', url, count=1)
+    separator = '&' if '?' in url else '?'
+    return f'{url}{separator}{name}={value}'
+
+
+def with_fields(uri: str, fields) -> str:
+    """
+    Restrict the fields returned by the API (sparse fieldset). The 'id' field is always requested.
+    :param uri: URI to add the 'fields' parameter to
+    :param fields: List or comma-separated string of field names, None to return all fields
+    :return: URI with the 'fields' parameter
+    >>> with_fields('https://api.example.com/requests', ['subject', 'status'])
+    'https://api.example.com/requests?fields=id,subject,status'
+    >>> with_fields('https://api.example.com/requests?status=open', 'id, subject')
+    'https://api.example.com/requests?status=open&fields=id,subject'
+    >>> with_fields('https://api.example.com/requests/1', None)
+    'https://api.example.com/requests/1'
+    """
+    if not fields:
+        return uri
+    if isinstance(fields, str):
+        fields = fields.split(',')
+    names = ['id'] + [name.strip() for name in fields if name.strip() and name.strip() != 'id']
+    return set_query_param(uri, 'fields', ','.join(names))
 
 
 class XurrentApiHelper:
     api_user: Person # Forward declaration with a string
     api_user_teams: List[Team] # Forward declaration with a string
 
-    def __init__(self, base_url, api_key, api_account,resolve_user=True, logger: Logger=None):
+    def __init__(self, base_url, api_key, api_account,resolve_user=True, logger: Logger=None, prefetch_workers: int = 0,
+                 rate_limiter: RateLimiter = None, retry_policy: RetryPolicy = None, response_cache: ResponseCache = None,
+                 pool_connections: int = 10, pool_maxsize: int = None, keep_alive: bool = True,
+                 timeout=(10, 120), thread_local_sessions: bool = False, identity_map=False,
+                 lazy_references: bool = False, json_decoder='auto', hooks=None):
         """
         Initialize the Xurrent API helper.
 
@@ -55,26 +176,129 @@ class XurrentApiHelper:
         :param api_account: Account name to use
         :param resolve_user: Resolve the API user and their teams (default: True)
         :param logger: Logger to use (optional), otherwise a new logger is created
+        :param prefetch_workers: Default number of threads used to fetch the pages of a paginated GET concurrently,
+                                 0 fetches the pages one after another (default: 0)
+        :param rate_limiter: Client-side rate limiter shared by all threads using this helper (optional),
+                             pass the same instance to several helpers to share it between them as well.
+                             By default the limiter follows the rate limit headers of the server.
+        :param retry_policy: Policy for retrying rate limited calls, server errors and connection failures (optional),
+                             retries and waiting times are counted in retry_stats
+        :param response_cache: Cache for conditional GET requests (ETag / If-None-Match), disabled if not provided
+        :param pool_connections: Number of hosts to keep connection pools for (default: 10)
+        :param pool_maxsize: Maximum number of pooled connections per host (default: 10, or prefetch_workers if larger)
+        :param keep_alive: Keep connections open for reuse (default: True)
+        :param timeout: Timeout in seconds of a request, either a single value or a (connect, read) tuple;
+                        None waits forever (default: 10 seconds to connect, 120 seconds to read)
+        :param thread_local_sessions: Give every thread its own session (and connection pool) instead of sharing one
+                                      session between all threads (default: False)
+        :param identity_map: Resolve every record to one shared instance per (model, id), merging the fields of
+                             fuller records into it (default: False). Pass True or an IdentityMap instance.
+        :param lazy_references: Keep the references of requests, tasks and workflows (member, team, workflow, ...)
+                                as lazy Reference objects that are only built when read (default: False)
+        :param json_decoder: Decoder of JSON responses: 'orjson', 'ujson', 'json' (standard library), 'auto' for the
+                             fastest one installed, or a callable taking the raw bytes of a body (default: auto)
+        :param hooks: Hooks receiving an event when a request starts and when it finished (optional), e.g. a
+                      MetricsAggregator (module instrumentation); a RequestHook, a callable called with every finished
+                      event or a list of them
         """
         self.base_url = base_url
         self.api_key = api_key
         self.api_account = api_account
+        self.prefetch_workers = prefetch_workers
+        self.rate_limiter = rate_limiter or RateLimiter()
+        self.retry_policy = retry_policy or RetryPolicy()
+        self.retry_stats = RetryStats()
+        self.response_cache = response_cache
+        self.identity_map = identity_map if isinstance(identity_map, IdentityMap) else IdentityMap() if identity_map else None
+        self.lazy_references = lazy_references
+        self.json_decoder = get_json_decoder(json_decoder)
+        self.hooks = as_hooks(hooks)
         if logger:
             self.logger = logger
         else:
             self.logger = self.create_logger(False)
+        self.timeout = timeout
+        self.pool_connections = pool_connections
+        self.pool_maxsize = pool_maxsize or max(10, prefetch_workers or 0)
+        self.keep_alive = keep_alive
         #Create a requests session to maintain persistent connections, with preset headers
-        self.__session = requests.Session()
-        self.__session.headers.update({
-            'Authorization': f'Bearer {self.api_key}',
-            'x-xurrent-account': self.api_account
-        })
+        self.__session = self.__create_session()
+        self.__sessions = [self.__session]
+        self.__sessions_lock = threading.Lock()
+        self.__thread_local = threading.local() if thread_local_sessions else None
         if resolve_user:
             # Import Person lazily
             from .people import Person
             self.api_user = Person.get_me(self)
             self.api_user_teams = self.api_user.get_teams()
 
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def __create_session(self) -> requests.Session:
+        """
+        Create a requests session with preset headers and a connection pool sized for this helper.
+        Retries are handled by the retry policy, so the adapter itself does not retry.
+        """
+        session = requests.Session()
+        session.headers.update({
+            'Authorization': f'Bearer {self.api_key}',
+            'x-xurrent-account': self.api_account
+        })
+        if not self.keep_alive:
+            session.headers['Connection'] = 'close'
+        adapter = HTTPAdapter(pool_connections=self.pool_connections, pool_maxsize=self.pool_maxsize, max_retries=0)
+        session.mount('https://', adapter)
+        session.mount('http://', adapter)
+        return session
+
+    def __get_session(self) -> requests.Session:
+        """
+        Return the session to use in the current thread.
+        """
+        if self.__thread_local is None:
+            return self.__session
+        session = getattr(self.__thread_local, 'session', None)
+        if session is None:
+            session = self.__create_session()
+            self.__thread_local.session = session
+            with self.__sessions_lock:
+                self.__sessions.append(session)
+        return session
+
+    def close(self):
+        """
+        Close all sessions of the helper and their pooled connections.
+        """
+        with self.__sessions_lock:
+            for session in self.__sessions:
+                session.close()
+
+    @contextmanager
+    def profile(self, threshold: int = 3):
+        """
+        Profile the API calls made in a block, e.g. to find N+1 patterns in a script:
+
+            with helper.profile() as profiler:
+                ...
+            print(profiler.report())
+
+        :param threshold: Number of calls of the same shape from which they are reported as finding (default: 3)
+        :return: Context manager yielding the Profiler (module profiling) recording the calls
+        """
+        # Import lazily, the profiler resolves the model classes
+        from .profiling import Profiler
+        profiler = Profiler(threshold)
+        # The hooks are replaced instead of changed, as other threads may be iterating over them
+        self.hooks = self.hooks + [profiler]
+        try:
+            yield profiler
+        finally:
+            self.hooks = [hook for hook in self.hooks if hook is not profiler]
+
     def __append_per_page(self, uri, per_page=100):
         """
         Append the 'per_page' parameter to the URI if not already present.
@@ -136,114 +360,417 @@ class XurrentApiHelper:
             handler.setLevel(level)
 
 
-    def api_call(self, uri: str, method='GET', data=None, per_page=100, raw=False):
+    def __send(self, method: str, url: str, data=None, headers: dict = None, body=None, stream: bool = False,
+               page: int = None) -> requests.Response:
         """
-        Make a call to the Xurrent API with support for rate limiting and pagination.
+        Send a single HTTP request, waiting and retrying according to the rate limiter and retry policy.
+        The hooks of the helper are notified when the request starts and when it finished.
+        :param method: HTTP method to use
+        :param url: Fully-formed URL to call
+        :param data: Data to send with the request as JSON (optional)
+        :param headers: Additional request headers (optional)
+        :param body: Seekable binary file to stream as the request body instead of JSON data (optional)
+        :param stream: Do not download the response body before returning, to read it in chunks (default: False)
+        :param page: Page number of a paginated GET, reported to the hooks (optional)
+        :return: Response object of the successful request
+        """
+        if not self.hooks:
+            return self.__attempt(method, url, data, headers, body, stream)
+        event = RequestEvent(method, url, templated_path(url, self.base_url), page)
+        emit(self.hooks, 'request_started', event, self.logger)
+        try:
+            response = self.__attempt(method, url, data, headers, body, stream, event)
+        except BaseException as e:
+            event.finish(error=e)
+            emit(self.hooks, 'request_finished', event, self.logger)
+            raise
+        event.finish(response)
+        emit(self.hooks, 'request_finished', event, self.logger)
+        return response
+
+    def __attempt(self, method: str, url: str, data, headers: dict, body, stream: bool, event: RequestEvent = None) -> requests.Response:
+        """
+        Send the attempts of a request until one succeeds, see __send.
+        :param event: Event of the request, updated with its retries, rate limit waits and last status (optional)
+        """
+        started = time.monotonic()
+        attempt = 0
+        self.retry_stats.record_call()
+        while True:
+            attempt += 1
+            # Wait for a slot of the client-side rate limiter
+            waited = self.rate_limiter.acquire()
+            if event is not None:
+                event.retries = attempt - 1
+                event.rate_limit_sleep += waited
+
+            # Log the request
+            self.logger.debug(f'{method} {url} {data if method != "GET" else ""}')
+
+            # Make the HTTP request
+            try:
+                if body is not None:
+                    body.seek(0)
+                    kwargs = {'data': body}
+                else:
+                    kwargs = {'json': data}
+                if stream:
+                    kwargs['stream'] = True
+                response = self.__get_session().request(method, url, headers=headers, timeout=self.timeout, **kwargs)
+            except requests.exceptions.RequestException as e:
+                delay = self.retry_policy.next_delay(method, attempt, started, exception=e)
+                if delay is None:
+                    self.retry_stats.record_failure()
+                    self.logger.error(f'HTTP request failed: {e}')
+                    raise
+                self.logger.warning(f'HTTP request failed: {e}. Retrying after {delay:.2f} seconds (attempt {attempt}/{self.retry_policy.max_attempts})...')
+                self.retry_stats.record_retry(type(e).__name__, delay)
+                time.sleep(delay)
+                continue
+            self.rate_limiter.update(response.headers)
+            if event is not None:
+                event.status = response.status_code
+
+            if response.ok:
+                return response
+
+            delay = self.retry_policy.next_delay(method, attempt, started, response.status_code, response.headers)
+            if delay is None:
+                # Non-retryable status code, or retries exhausted
+                self.retry_stats.record_failure()
+                self.logger.error(f'Error in request: {response.status_code} - {response.text}')
+                try:
+                    response.raise_for_status()
+                except requests.exceptions.RequestException as e:
+                    self.logger.error(f'HTTP request failed: {e}')
+                    raise
+
+            self.retry_stats.record_retry(response.status_code, delay)
+            if response.status_code == 429:
+                # Handle rate limiting, holding back all threads sharing the limiter
+                self.logger.warning(f'Rate limit reached. Retrying after {delay:.2f} seconds...')
+                self.rate_limiter.pause(delay)
+            else:
+                self.logger.warning(f'Error in request: {response.status_code}. Retrying after {delay:.2f} seconds (attempt {attempt}/{self.retry_policy.max_attempts})...')
+                time.sleep(delay)
+
+    def __fetch(self, method: str, url: str, data=None, page: int = None):
+        """
+        Send a single HTTP request and decode its JSON body.
+        GET responses are served from the response cache (if enabled) when the server reports them unchanged.
+        :param method: HTTP method to use
+        :param url: Fully-formed URL to call
+        :param data: Data to send with the request (optional)
+        :param page: Page number of a paginated GET (optional)
+        :return: Tuple of the decoded body (None for 204 responses) and the response headers
+        """
+        cache = self.response_cache if method == 'GET' else None
+        entry = cache.get(url) if cache is not None else None
+
+        response = self.__send(method, url, data, headers=entry.validators() if entry else None, page=page)
+        if entry is not None and response.status_code == 304:
+            cache.touch(url)
+            cache.record(hit=True)
+            return entry.data, entry.headers
+        if response.status_code == 204:
+            return None, response.headers
+
+        response_data = self.json_decoder(response.content)
+        if cache is not None:
+            cache.record(hit=False)
+            cache.put(url, response.headers, response_data, len(response.content))
+        return response_data, response.headers
+
+    def __iter_pages(self, uri: str, method='GET', data=None, per_page=100, prefetch_workers=0):
+        """
+        Yield the decoded response of every page of a call, following the 'Link' header for paginated GET requests.
         :param uri: URI to call
         :param method: HTTP method to use (default: GET)
         :param data: Data to send with the request (optional)
         :param per_page: Number of records per page for GET requests, setting to 0/None disables pagination (default: 100)
-        :param raw: Do not process the request result, e.g. in the case of non-JSON data (default: False)
-        :return: JSON response from the API or aggregated data for paginated GET
+        :param prefetch_workers: Number of threads to fetch the remaining pages with once the page count is known,
+                                 0 follows the 'next' links one after another (default: 0)
+        :return: Generator of decoded responses, one per page (None for 204 responses)
         """
-        # Ensure the base URL is included in the URI, if no protocol (https://) specified
-        if not uri.startswith(self.base_url) and "://" not in uri[:10]:
-            uri = f'{self.base_url}{uri}'
-
-        aggregated_data = []
-        next_page_url = uri
+        next_page_url = self.__full_uri(uri)
+        first_page = True
 
         while next_page_url:
-            try:
-                # Append pagination parameters for GET requests
-                if per_page and method == 'GET':
-                    # if contains ? or does not end with /, append per_page
-                    next_page_url = self.__append_per_page(next_page_url, per_page)
-
-                # Log the request
-                self.logger.debug(f'{method} {next_page_url} {data if method != "GET" else ""}')
-
-                # Make the HTTP request
-                response = self.__session.request(method, next_page_url, json=data)
-
-                if response.status_code == 204:
-                    return None
-
-                # Handle rate limiting (429 status code)
-                if response.status_code == 429:
-                    retry_after = int(response.headers.get('Retry-After', 1))  # Default to 1 second if not provided
-                    self.logger.warning(f'Rate limit reached. Retrying after {retry_after} seconds...')
-                    time.sleep(retry_after)
-                    continue
+            # Append pagination parameters for GET requests
+            page = None
+            if per_page and method == 'GET':
+                # if contains ? or does not end with /, append per_page
+                next_page_url = self.__append_per_page(next_page_url, per_page)
+                page = page_number(next_page_url) or 1
+
+            response_data, headers = self.__fetch(method, next_page_url, data, page)
+            yield response_data
+            if response_data is None:
+                return
+
+            # Only paginated GET requests return a list with a 'Link' header to the next page
+            if method != 'GET' or not isinstance(response_data, list):
+                return
+            links = parse_link_header(headers.get('Link'))
+            next_page_url = links.get('next')
+
+            # Once the page count is known, the remaining pages can be requested concurrently
+            if first_page and next_page_url and prefetch_workers:
+                next_page = page_number(next_page_url)
+                last_page = self.__last_page(headers, links)
+                if next_page and last_page:
+                    yield from self.__prefetch_pages(next_page_url, next_page, last_page, prefetch_workers)
+                    return
+            first_page = False
+
+    @staticmethod
+    def __last_page(headers, links: dict) -> int:
+        """
+        Determine the number of pages of a paginated GET from its first response.
+        :param headers: Response headers of the first page
+        :param links: Parsed 'Link' header of the response
+        :return: Number of the last page, None if it cannot be determined
+        """
+        total_pages = headers.get('X-Pagination-Total-Pages')
+        if total_pages and total_pages.isdigit():
+            return int(total_pages)
+        return page_number(links.get('last', ''))
 
-                # Check for other non-success status codes
-                if not response.ok:
-                    self.logger.error(f'Error in request: {response.status_code} - {response.text}')
-                    response.raise_for_status()
+    def __prefetch_pages(self, page_url: str, first_page: int, last_page: int, workers: int):
+        """
+        Fetch a range of pages through a bounded thread pool and yield them in page order.
+        At most twice as many pages as there are workers are requested ahead of the consumer.
+        :param page_url: URL of any page of the listing, its 'page' parameter is replaced for each page
+        :param first_page: Number of the first page to fetch
+        :param last_page: Number of the last page to fetch
+        :param workers: Number of threads to fetch pages with
+        :return: Generator of decoded pages
+        """
+        def fetch(page):
+            return self.__fetch('GET', set_query_param(page_url, 'page', page), page=page)[0]
+
+        executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='xurrent-page')
+        try:
+            pending = []
+            next_page = first_page
+            while next_page <= last_page or pending:
+                while next_page <= last_page and len(pending) < workers * 2:
+                    pending.append(executor.submit(fetch, next_page))
+                    next_page += 1
+                yield pending.pop(0).result()
+        finally:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    def __full_uri(self, uri: str) -> str:
+        """
+        Ensure the base URL is included in the URI, if no protocol (https://) specified.
+        :param uri: URI to complete
+        :return: Fully-formed URI
+        >>> helper = XurrentApiHelper('https://api.example.com', 'api_key', 'account', False)
+        >>> helper._XurrentApiHelper__full_uri('/requests')
+        'https://api.example.com/requests'
+        >>> helper._XurrentApiHelper__full_uri('https://download.example.com/export.csv')
+        'https://download.example.com/export.csv'
+        """
+        if not uri.startswith(self.base_url) and "://" not in uri[:10]:
+            uri = f'{self.base_url}{uri}'
+        return uri
 
-                #Stop here if we shall not process or interperet the returned data
-                if raw:
-                    return response.content
-
-                # Process response
-                response_data = response.json()
-
-                # For GET requests, handle pagination
-                if method == 'GET' and isinstance(response_data, list):
-                    aggregated_data.extend(response_data)
-
-                    # Parse the 'Link' header to find the 'next' page URL
-                    link_header = response.headers.get('Link')
-                    if link_header:
-                        links = {rel.strip(): url.strip('<>') for url, rel in
-                                (link.split(';') for link in link_header.split(','))}
-                        next_page_url = links.get('rel="next"')
-                        if next_page_url:
-                            next_page_url = next_page_url.replace('<', '').replace('>', '')
-                    else:
-                        next_page_url = None
-                else:
-                    return response_data  # Return for non-GET requests
+    def api_call(self, uri: str, method='GET', data=None, per_page=100, raw=False, prefetch_workers: int = None):
+        """
+        Make a call to the Xurrent API with support for rate limiting and pagination.
+        :param uri: URI to call
+        :param method: HTTP method to use (default: GET)
+        :param data: Data to send with the request (optional)
+        :param per_page: Number of records per page for GET requests, setting to 0/None disables pagination (default: 100)
+        :param raw: Do not process the request result, e.g. in the case of non-JSON data (default: False)
+        :param prefetch_workers: Number of threads to fetch the pages of a paginated GET concurrently (default: helper setting)
+        :return: JSON response from the API or aggregated data for paginated GET
+        """
+        #Stop after the first response if we shall not process or interperet the returned data
+        if raw:
+            url = self.__full_uri(uri)
+            if per_page and method == 'GET':
+                url = self.__append_per_page(url, per_page)
+            response = self.__send(method, url, data)
+            return None if response.status_code == 204 else response.content
 
-            except requests.exceptions.RequestException as e:
-                self.logger.error(f'HTTP request failed: {e}')
-                raise
+        aggregated_data = []
+        if prefetch_workers is None:
+            prefetch_workers = self.prefetch_workers
+        for page in self.__iter_pages(uri, method, data, per_page, prefetch_workers):
+            if method != 'GET' or not isinstance(page, list):
+                return page  # Return for non-GET requests and single records
+            aggregated_data.extend(page)
 
         # Return aggregated results for paginated GET
         return aggregated_data
 
-    def bulk_export(self, type: str, export_format='csv', save_as=None, poll_timeout=5):
+    def iter_api_call(self, uri: str, method='GET', data=None, per_page=100, prefetch_workers: int = None):
+        """
+        Make a call to the Xurrent API and yield the returned records page by page.
+        Unlike api_call, the records of a paginated GET are not aggregated: only the current page is held in memory
+        and the first records are available as soon as the first page arrived.
+        :param uri: URI to call
+        :param method: HTTP method to use (default: GET)
+        :param data: Data to send with the request (optional)
+        :param per_page: Number of records per page for GET requests, setting to 0/None disables pagination (default: 100)
+        :param prefetch_workers: Number of threads to fetch the pages of a paginated GET concurrently (default: helper setting)
+        :return: Generator of records; a single (non-list) response is yielded as one item
+        """
+        if prefetch_workers is None:
+            prefetch_workers = self.prefetch_workers
+        for page in self.__iter_pages(uri, method, data, per_page, prefetch_workers):
+            if isinstance(page, list):
+                yield from page
+            elif page is not None:
+                yield page
+
+    def iter_api_pages(self, uri: str, method='GET', data=None, per_page=100, prefetch_workers: int = None):
+        """
+        Make a call to the Xurrent API and yield the returned records as one list per page, e.g. to build the
+        model instances of a page at once with from_data_many.
+        :param uri: URI to call
+        :param method: HTTP method to use (default: GET)
+        :param data: Data to send with the request (optional)
+        :param per_page: Number of records per page for GET requests, setting to 0/None disables pagination (default: 100)
+        :param prefetch_workers: Number of threads to fetch the pages of a paginated GET concurrently (default: helper setting)
+        :return: Generator of lists of records; a single (non-list) response is yielded as a list of one item
+        """
+        if prefetch_workers is None:
+            prefetch_workers = self.prefetch_workers
+        for page in self.__iter_pages(uri, method, data, per_page, prefetch_workers):
+            if isinstance(page, list):
+                yield page
+            elif page is not None:
+                yield [page]
+
+    def bulk_export(self, type: str, export_format='csv', save_as=None, poll_timeout=5, max_poll_interval: float = 30,
+                    timeout: float = None, chunk_size: int = 1024 * 1024):
         """
         Make a call to the Xurrent API to perform a bulk export
         :param type: Resource type(s) to download, comma-delimited
         :param export_format: either 'csv' or 'xlsx' (Default: csv)
-        :param save_as: Save the results to a file instead of returning the raw result
-        :param poll_timeout: Seconds to wait between export result polls (Default: 5 seconds)
-        :return: CSV or XSLX data from the export, ZIP if multiple types supplied
+        :param save_as: Save the results to a file instead of returning the raw result.
+                        The download is streamed to disk in chunks, which is recommended for large exports.
+        :param poll_timeout: Seconds to wait before the first export result poll, doubled after every poll (Default: 5 seconds)
+        :param max_poll_interval: Upper bound of the wait between polls in seconds (Default: 30 seconds)
+        :param timeout: Maximum seconds to wait for the export to finish, None to wait until it finishes (Default: None)
+        :param chunk_size: Size in bytes of the chunks written to save_as (Default: 1 MiB)
+        :return: CSV or XSLX data from the export, ZIP if multiple types supplied; True if saved to a file
+        :raises BulkExportError: If the export fails, does not finish in time or the download is incomplete
         """
 
         #Initiate an export and get the polling token
         export = self.api_call('/export', method = 'POST', data = dict(type = type, export_format = export_format))
 
-        #Begin export results poll waiting loop
-        while True:
-            self.logger.debug('Export poll wait.')
-            time.sleep(poll_timeout)
-            result = self.api_call(f"/export/{export['token']}", per_page = None)
-            if result['state'] in ('queued','processing'):
-                continue
-            if result['state'] == 'done':
-                break
+        #Poll the export results with backoff until the export finished
+        result = self.__poll(f"/export/{export['token']}", poll_timeout, max_poll_interval, timeout)
+        if result is None:
+            raise BulkExportError(f"Export {export['token']} did not finish within {timeout} seconds")
+        if result['state'] != 'done':
             self.logger.error(f'Export request failed: {result=}')
-            raise
+            raise BulkExportError(f"Export request failed: {result.get('message') or result['state']}", result)
 
         #Save or Return the exported data
-        result = self.api_call(result["url"], per_page = None, raw = True)
         if save_as:
-            with open(save_as, 'wb') as file:
-                file.write(result)
+            self.__download(result['url'], save_as, chunk_size)
             return True
-        return result
+        return self.api_call(result["url"], per_page = None, raw = True)
+
+    def __download(self, url: str, save_as, chunk_size: int) -> int:
+        """
+        Stream a download to a file in chunks. The data is written to a temporary file next to the target, which
+        replaces the target once the download is complete and its size matches the Content-Length of the response.
+        Downloads interrupted by a connection failure are restarted according to the retry policy.
+        :param url: URL to download
+        :param save_as: Path of the file to save the download as
+        :param chunk_size: Size in bytes of the chunks to write
+        :return: Size of the download in bytes
+        """
+        started = time.monotonic()
+        attempt = 0
+        directory = os.path.dirname(os.path.abspath(save_as))
+        while True:
+            attempt += 1
+            response = self.__send('GET', self.__full_uri(url), stream=True)
+            # The Content-Length of a compressed response is the size before decompression
+            expected = response.headers.get('Content-Length') if not response.headers.get('Content-Encoding') else None
+            descriptor, partial_path = tempfile.mkstemp(dir=directory, prefix='.xurrent-export-')
+            try:
+                with response, os.fdopen(descriptor, 'wb') as file:
+                    for chunk in response.iter_content(chunk_size):
+                        file.write(chunk)
+                    size = file.tell()
+                if expected is not None and size != int(expected):
+                    raise BulkExportError(f'Export download is incomplete: received {size} of {expected} bytes')
+                os.replace(partial_path, save_as)
+                return size
+            except requests.exceptions.RequestException as e:
+                os.remove(partial_path)
+                delay = self.retry_policy.next_delay('GET', attempt, started, exception=e)
+                if delay is None:
+                    self.logger.error(f'Export download failed: {e}')
+                    raise BulkExportError(f'Export download failed: {e}') from e
+                self.logger.warning(f'Export download failed: {e}. Retrying after {delay:.2f} seconds...')
+                self.retry_stats.record_retry(type(e).__name__, delay)
+                time.sleep(delay)
+            except BaseException:
+                os.remove(partial_path)
+                raise
+
+    def bulk_import(self, type: str, data_or_path, fieldnames: list = None, poll_interval: float = 1,
+                    max_poll_interval: float = 30, timeout: float = None) -> ImportResult:
+        """
+        Make a call to the Xurrent API to perform a bulk import of CSV data, and wait until it has been processed.
+        The CSV data is spooled to a temporary file and streamed to the API, so large imports are not held in memory.
+        :param type: Resource type to import, e.g. 'people' or 'cis'
+        :param data_or_path: Path of a CSV file, or an iterable of dicts (e.g. a generator) to upload as CSV
+        :param fieldnames: CSV columns when importing dicts (default: the keys of the first dict)
+        :param poll_interval: Seconds to wait before the first poll of the import state, doubled after every poll (default: 1)
+        :param max_poll_interval: Upper bound of the wait between polls in seconds (default: 30)
+        :param timeout: Maximum seconds to wait for the import to finish, None to wait until it finishes (default: None)
+        :return: ImportResult with the numbers of created, updated, deleted, unchanged and failed rows
+        :raises BulkImportError: If the import fails or does not finish in time
+        """
+        body, content_type = import_body(type, data_or_path, fieldnames)
+        with body:
+            response = self.__send('POST', self.__full_uri('/import'), headers={'Content-Type': content_type}, body=body)
+        token = self.json_decoder(response.content)['token']
+
+        result = self.__poll(f'/import/{token}', poll_interval, max_poll_interval, timeout)
+        if result is None:
+            raise BulkImportError(f'Import {token} did not finish within {timeout} seconds')
+        if result['state'] != 'done':
+            self.logger.error(f'Import request failed: {result=}')
+            raise BulkImportError(f"Import request failed: {result.get('message') or result['state']}", result)
+        return ImportResult.from_data(token, result)
+
+    def __poll(self, uri: str, poll_interval: float, max_poll_interval: float, timeout: float = None) -> dict:
+        """
+        Poll the state of an import or export until it is no longer queued or processing.
+        The wait between polls starts at poll_interval and doubles up to max_poll_interval, so that short jobs finish
+        quickly and long jobs are not polled needlessly often.
+        :param uri: URI of the job state
+        :param poll_interval: Seconds to wait before the first poll
+        :param max_poll_interval: Upper bound of the wait between polls in seconds
+        :param timeout: Maximum seconds to wait for the job, None to wait until it finishes
+        :return: Last state of the job, None if it did not finish within the timeout
+        """
+        deadline = time.monotonic() + timeout if timeout is not None else None
+        delay = poll_interval
+        while True:
+            if deadline is not None:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return None
+                delay = min(delay, remaining)
+            self.logger.debug(f'Poll wait of {delay:.2f} seconds.')
+            time.sleep(delay)
+            result = self.api_call(uri, per_page=None)
+            if result['state'] not in ('queued', 'processing'):
+                return result
+            delay = min(delay * 2, max_poll_interval)
 
     def custom_fields_to_object(self, custom_fields):
         """
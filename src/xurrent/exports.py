@@ -0,0 +1,327 @@
+from __future__ import annotations  # Needed for forward references
+from typing import Iterator, Tuple, Type, Union
+import csv
+import io
+import os
+import re
+import zipfile
+
+from .timestamps import parse_timestamp
+
+try:
+    import openpyxl
+except ImportError:  # pragma: no cover - optional dependency
+    openpyxl = None
+
+
+# Resource types of an export, longest first so that prefixes match the most specific type
+EXPORT_TYPES = ('configuration_items', 'workflows', 'requests', 'people', 'teams', 'tasks', 'cis')
+
+# Codes of the enumeration columns by their display value, as exports may contain the labels shown in the UI
+# (see the enumerations of the models). The parts of a label before and after ' - ' are accepted as well.
+ENUM_LABELS = {
+    'category': {
+        'Incident - Request for Incident Resolution': 'incident',
+        'RFC - Request for Change': 'rfc',
+        'RFI - Request for Information': 'rfi',
+        'Reservation - Request for Reservation': 'reservation',
+        'Order - Request for Purchase': 'order',
+        'Fulfillment - Request for Order Fulfillment': 'fulfillment',
+        'Complaint - Request for Support Improvement': 'complaint',
+        'Compliment - Request for Bestowal of Praise': 'compliment',
+        'Other - Request is Out of Scope': 'other',
+        'Standard - Approved Workflow Template Was Used': 'standard',
+        'Non-Standard - Approved Workflow Template Not Available': 'non_standard',
+        'Emergency - Required for Incident Resolution': 'emergency',
+        'Order - Organization Order Workflow': 'order',
+    },
+    'status': {
+        'Declined': 'declined',
+        'On Backlog': 'on_backlog',
+        'Registered': 'registered',
+        'Assigned': 'assigned',
+        'Accepted': 'accepted',
+        'In Progress': 'in_progress',
+        'Waiting for…': 'waiting_for',
+        'Waiting for...': 'waiting_for',
+        'Waiting for': 'waiting_for',
+        'Waiting for Customer': 'waiting_for_customer',
+        'Reservation Pending': 'reservation_pending',
+        'Workflow Pending': 'workflow_pending',
+        'Project Pending': 'project_pending',
+        'Request Pending': 'request_pending',
+        'Being Created': 'being_created',
+        'Progress Halted': 'progress_halted',
+        'Failed': 'failed',
+        'Rejected': 'rejected',
+        'Approved': 'approved',
+        'Canceled': 'canceled',
+        'Completed': 'completed',
+    },
+    'impact': {
+        'Low - Service Degraded for One User': 'low',
+        'Medium - Service Degraded for Several Users': 'medium',
+        'High - Service Down for One User': 'high',
+        'Top - Service Down for Several Users': 'top',
+    },
+    'completion_reason': {
+        'Solved - Root Cause Analysis Not Required': 'solved',
+        'Workaround - Root Cause Not Removed': 'workaround',
+        'Gone - Unable to Reproduce': 'gone',
+        'Duplicate - Same as Another Request of Customer': 'duplicate',
+        'Withdrawn - Withdrawn by Requester': 'withdrawn',
+        'No Reply - No Reply Received from Customer': 'no_reply',
+        'Rejected - Rejected by Approver': 'rejected',
+        'Conflict - In Conflict with Internal Standard or Policy': 'conflict',
+        'Declined - Declined by Service Provider': 'declined',
+        'Unsolvable - Unable to Solve': 'unsolvable',
+        'Rolled Back - Original Environment Restored': 'rolled_back',
+        'Failed - No Requirements Met': 'failed',
+        'Partial - Not All Requirements Met': 'partial',
+        'Disruptive - Caused Service Disruption': 'disruptive',
+        'Complete - All Requirements Met': 'complete',
+    },
+}
+
+# Columns holding the code of an enumeration
+ENUM_COLUMNS = tuple(ENUM_LABELS)
+
+
+def _enum_lookup(labels: dict) -> dict:
+    lookup = {}
+    for label, code in labels.items():
+        lookup[code] = code
+        for key in (label, *label.split(' - ', 1)):
+            lookup.setdefault(key.strip().lower(), code)
+    return lookup
+
+
+_ENUM_LOOKUP = {column: _enum_lookup(labels) for column, labels in ENUM_LABELS.items()}
+_ENUM_CODES = {column: frozenset(labels.values()) for column, labels in ENUM_LABELS.items()}
+
+
+def column_name(header: str) -> str:
+    """
+    Convert the column header of an export to the name of the corresponding attribute.
+    :param header: Column header, e.g. 'Primary Email'
+    :return: Attribute name, e.g. 'primary_email'
+    >>> column_name('Primary Email')
+    'primary_email'
+    >>> column_name('ID')
+    'id'
+    >>> column_name('Created at')
+    'created_at'
+    >>> column_name(' Site / Location ')
+    'site_location'
+    """
+    return re.sub(r'[^0-9a-z]+', '_', str(header).strip().lower()).strip('_')
+
+
+def export_type(filename: str) -> str:
+    """
+    Derive the resource type from the name of a file of an export.
+    :param filename: Name of the file, e.g. a member of a ZIP export
+    :return: Resource type
+    >>> export_type('people.csv')
+    'people'
+    >>> export_type('exports/requests_2024-03-01.xlsx')
+    'requests'
+    >>> export_type('other.csv')
+    'other'
+    """
+    stem = os.path.splitext(os.path.basename(filename))[0].lower()
+    for type in EXPORT_TYPES:
+        if stem.startswith(type):
+            return type
+    return stem
+
+
+def _open_source(source) -> Tuple[object, bool]:
+    """
+    :return: Tuple of a binary file object and whether it has been opened here (and must be closed)
+    """
+    if isinstance(source, (str, os.PathLike)):
+        return open(source, 'rb'), True
+    if isinstance(source, (bytes, bytearray, memoryview)):
+        return io.BytesIO(source), True
+    return source, False
+
+
+def _detect_format(file) -> str:
+    """
+    Detect the format of an export from its first bytes: XLSX workbooks are ZIP files as well,
+    but contain a '[Content_Types].xml' member.
+    """
+    start = file.read(4)
+    file.seek(0)
+    if not start.startswith(b'PK'):
+        return 'csv'
+    with zipfile.ZipFile(file) as archive:
+        names = archive.namelist()
+    file.seek(0)
+    return 'xlsx' if '[Content_Types].xml' in names else 'zip'
+
+
+def _iter_csv(file) -> Iterator[dict]:
+    text = io.TextIOWrapper(file, encoding='utf-8-sig', newline='')
+    try:
+        yield from csv.DictReader(text)
+    finally:
+        text.detach()
+
+
+def _iter_xlsx(file) -> Iterator[dict]:
+    if openpyxl is None:
+        raise ImportError("Reading XLSX exports requires the 'openpyxl' package: pip install xurrent[xlsx]")
+    workbook = openpyxl.load_workbook(file, read_only=True, data_only=True)
+    try:
+        rows = workbook.worksheets[0].iter_rows(values_only=True)
+        headers = next(rows, None)
+        if headers is None:
+            return
+        for row in rows:
+            yield dict(zip(headers, row))
+    finally:
+        workbook.close()
+
+
+def _table(type: str, rows: Iterator[dict]) -> Iterator[Tuple[str, Iterator[dict]]]:
+    """
+    Yield a table, closing its rows before the file they are read from is closed.
+    """
+    try:
+        yield type, rows
+    finally:
+        rows.close()
+
+
+def _iter_tables(source, type: str = None, export_format: str = None) -> Iterator[Tuple[str, Iterator[dict]]]:
+    """
+    Yield the resource type and the rows of every table of an export, reading the rows lazily.
+    """
+    file, opened = _open_source(source)
+    try:
+        export_format = export_format or _detect_format(file)
+        if export_format == 'csv':
+            yield from _table(type, _iter_csv(file))
+        elif export_format == 'xlsx':
+            yield from _table(type, _iter_xlsx(file))
+        elif export_format == 'zip':
+            with zipfile.ZipFile(file) as archive:
+                for member in archive.infolist():
+                    member_type = export_type(member.filename)
+                    extension = os.path.splitext(member.filename)[1].lower()
+                    if member.is_dir() or extension not in ('.csv', '.xlsx') or (type and member_type != type):
+                        continue
+                    with archive.open(member) as member_file:
+                        yield from _table(member_type, _iter_csv(member_file) if extension == '.csv' else _iter_xlsx(member_file))
+        else:
+            raise ValueError(f"Unsupported export format: {export_format}")
+    finally:
+        if opened:
+            file.close()
+
+
+def enum_code(column: str, value: str) -> str:
+    """
+    Convert the display value of an enumeration column of an export to its code.
+    :param column: Attribute name of the column, e.g. 'category'
+    :param value: Code or display value, e.g. 'RFI - Request for Information'
+    :return: Code of the value, the value itself if it is not a known code or label
+    >>> enum_code('category', 'Request for Information')
+    'rfi'
+    >>> enum_code('status', 'Waiting for Customer')
+    'waiting_for_customer'
+    >>> enum_code('status', 'Escalated')
+    'Escalated'
+    """
+    lookup = _ENUM_LOOKUP.get(column, {})
+    code = lookup.get(value.strip().lower())
+    if code is None:
+        code = lookup.get(column_name(value))
+    return code if code is not None else value
+
+
+def _convert_row(row: dict) -> dict:
+    """
+    Rename the columns of a row to attribute names, decode timestamps, map enumeration labels to their codes
+    (unknown values are kept as they are) and map empty cells to None.
+    """
+    result = {}
+    for header, value in row.items():
+        if header is None:
+            continue
+        name = column_name(header)
+        if value == '':
+            value = None
+        elif isinstance(value, str):
+            if name.endswith('_at') or name.endswith('_date'):
+                value = parse_timestamp(value)
+            elif name in ENUM_COLUMNS:
+                value = enum_code(name, value)
+        result[name] = value
+    return result
+
+
+def iter_export_rows(source: Union[str, os.PathLike, bytes, object], type: str = None, export_format: str = None,
+                     raw_columns: bool = False) -> Iterator[dict]:
+    """
+    Read the rows of a bulk export lazily, without loading the whole export into memory.
+    Column headers are converted to attribute names ('Primary Email' -> 'primary_email'), timestamps are decoded
+    into datetime objects and empty cells are returned as None.
+    :param source: Path of the export file, its raw bytes or a binary file object (CSV, XLSX or ZIP of several types)
+    :param type: Only read the rows of this resource type from a ZIP export (optional)
+    :param export_format: 'csv', 'xlsx' or 'zip', detected from the content if not given (optional)
+    :param raw_columns: Return the rows as read, with the original column headers and values (default: False)
+    :return: Generator of rows as dictionaries
+    """
+    for _, rows in _iter_tables(source, type, export_format):
+        for row in rows:
+            yield row if raw_columns else _convert_row(row)
+
+
+def iter_export(connection_object: XurrentApiHelper, source, type: str = None, export_format: str = None, model: Type = None) -> Iterator:
+    """
+    Read a bulk export lazily as model instances, e.g. Request or Person objects.
+    The model of every table is derived from its resource type ('people.csv' in a ZIP export yields Person objects).
+    Reference columns hold names instead of records in an export, their values are kept as '<column>_name'.
+    Values of enumeration columns that are no known code or label are kept as '<column>_label'.
+    :param connection_object: Instance of XurrentApiHelper to bind the instances to
+    :param source: Path of the export file, its raw bytes or a binary file object (CSV, XLSX or ZIP of several types)
+    :param type: Resource type of a CSV/XLSX export, or the only type to read from a ZIP export
+    :param export_format: 'csv', 'xlsx' or 'zip', detected from the content if not given (optional)
+    :param model: Model class to create, overriding the one derived from the type (optional)
+    :return: Generator of model instances (rows of unknown types are yielded as dictionaries)
+    """
+    for table_type, rows in _iter_tables(source, type, export_format):
+        table_model = model or model_of_type(table_type)
+        references = set(getattr(table_model, '__references__', ()))
+        for row in rows:
+            data = _convert_row(row)
+            if table_model is None:
+                yield data
+                continue
+            for name in references.intersection(data):
+                if isinstance(data[name], str):
+                    data[f'{name}_name'] = data.pop(name)
+            for name in ENUM_COLUMNS:
+                if isinstance(data.get(name), str) and data[name] not in _ENUM_CODES[name]:
+                    data[f'{name}_label'] = data.pop(name)
+            data.setdefault('id', None)
+            yield table_model(connection_object, **data)
+
+
+def model_of_type(type: str):
+    """
+    :param type: Resource type of an export, e.g. 'people'
+    :return: Model class of the type, None if there is none
+    """
+    from .configuration_items import ConfigurationItem
+    from .people import Person
+    from .requests import Request
+    from .tasks import Task
+    from .teams import Team
+    from .workflows import Workflow
+    models = {model.__resourceUrl__: model for model in (ConfigurationItem, Person, Request, Task, Team, Workflow)}
+    models['configuration_items'] = ConfigurationItem
+    return models.get(type)
@@ -0,0 +1,596 @@
+from __future__ import annotations  # Needed for forward references
+from datetime import datetime, timedelta, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional, Tuple, Union
+from urllib.parse import parse_qsl, urlencode, urlsplit
+import argparse
+import csv
+import io
+import json
+import math
+import random
+import re
+import threading
+import time
+import uuid
+import zipfile
+
+
+# Collections served by the fake server, with their record generator (see FakeDataset)
+COLLECTIONS = ('requests', 'tasks', 'workflows', 'people', 'teams', 'cis')
+
+# Predefined filters of the listings, as predicate of a record
+PREDEFINED_FILTERS = {
+    'open': lambda record: record.get('status') not in ('completed', 'declined', 'rejected'),
+    'completed': lambda record: record.get('status') in ('completed', 'declined', 'rejected'),
+    'enabled': lambda record: not record.get('disabled'),
+    'disabled': lambda record: bool(record.get('disabled')),
+    'active': lambda record: record.get('status') != 'removed',
+    'inactive': lambda record: record.get('status') == 'removed',
+}
+
+# Query parameters that do not filter the records of a listing
+RESERVED_PARAMETERS = ('page', 'per_page', 'fields', 'sort')
+
+REQUEST_CATEGORIES = ('incident', 'rfc', 'rfi', 'reservation', 'order', 'fulfillment', 'complaint', 'other')
+REQUEST_STATUSES = ('assigned', 'accepted', 'in_progress', 'waiting_for', 'waiting_for_customer', 'completed')
+TASK_STATUSES = ('registered', 'declined', 'assigned', 'accepted', 'in_progress', 'waiting_for', 'completed')
+WORKFLOW_STATUSES = ('being_created', 'registered', 'in_progress', 'progress_halted', 'completed')
+
+
+def _timestamp(moment: datetime) -> str:
+    return moment.strftime('%Y-%m-%dT%H:%M:%SZ')
+
+
+def _stub(record: dict, *fields: str) -> dict:
+    return {name: record[name] for name in ('id',) + fields if name in record}
+
+
+class FakeDataset:
+    """
+    Generated records of a fake Xurrent account: people, teams, workflows with their tasks, requests with their
+    notes and configuration items (cis) linked to requests. The records are generated deterministically from a seed,
+    so that the same dataset can be generated again, e.g. to check the results of a load test.
+    """
+
+    def __init__(self, requests: int = 1000, people: int = 100, teams: int = 10, workflows: int = 50,
+                 tasks_per_workflow: int = 3, cis: int = 200, notes_per_request: int = 2, cis_per_request: int = 1,
+                 seed: int = 1):
+        """
+        :param requests: Number of requests (default: 1000)
+        :param people: Number of people (default: 100)
+        :param teams: Number of teams (default: 10)
+        :param workflows: Number of workflows (default: 50)
+        :param tasks_per_workflow: Number of tasks of every workflow (default: 3)
+        :param cis: Number of configuration items (default: 200)
+        :param notes_per_request: Number of notes of every request (default: 2)
+        :param cis_per_request: Number of configuration items linked to every request (default: 1)
+        :param seed: Seed of the generated values (default: 1)
+        """
+        generator = random.Random(seed)
+        start = datetime(2024, 1, 1, tzinfo=timezone.utc)
+
+        def moment() -> str:
+            return _timestamp(start + timedelta(seconds=generator.randint(0, 365 * 24 * 3600)))
+
+        account = {'id': 'fake', 'name': 'Fake Account'}
+        self.records: Dict[str, Dict[int, dict]] = {collection: {} for collection in COLLECTIONS}
+        for i in range(1, people + 1):
+            self.add('people', {'id': i, 'name': f'Person {i}', 'primary_email': f'person{i}@example.com',
+                                'disabled': i % 25 == 0, 'account': account, 'created_at': moment(), 'updated_at': moment()})
+        people_list = list(self.records['people'].values()) or [{'id': 0, 'name': 'Nobody'}]
+        for i in range(1, teams + 1):
+            self.add('teams', {'id': i, 'name': f'Team {i}', 'description': f'Support team {i}', 'disabled': False,
+                               'account': account, 'created_at': moment(), 'updated_at': moment()})
+        teams_list = list(self.records['teams'].values()) or [{'id': 0, 'name': 'Nobody'}]
+        self.team_members: Dict[int, List[int]] = {
+            team['id']: [person['id'] for person in people_list[index::max(len(teams_list), 1)]]
+            for index, team in enumerate(teams_list) if team['id']
+        }
+        for i in range(1, workflows + 1):
+            self.add('workflows', {'id': i, 'subject': f'Change {i}', 'status': generator.choice(WORKFLOW_STATUSES),
+                                   'category': 'standard', 'manager': _stub(generator.choice(people_list), 'name'),
+                                   'created_at': moment(), 'updated_at': moment()})
+            for j in range(tasks_per_workflow):
+                self.add('tasks', {'id': (i - 1) * tasks_per_workflow + j + 1, 'subject': f'Task {j + 1} of change {i}',
+                                   'status': generator.choice(TASK_STATUSES), 'workflow': _stub(self.records['workflows'][i], 'subject'),
+                                   'team': _stub(generator.choice(teams_list), 'name'), 'created_at': moment(), 'updated_at': moment()})
+        for i in range(1, cis + 1):
+            self.add('cis', {'id': i, 'label': f'CI-{i:05d}', 'name': f'Server {i}', 'status': generator.choice(('in_production', 'installed', 'removed')),
+                             'created_at': moment(), 'updated_at': moment()})
+        self.notes: Dict[int, List[dict]] = {}
+        self.request_cis: Dict[int, List[int]] = {}
+        for i in range(1, requests + 1):
+            requested_by = _stub(generator.choice(people_list), 'name')
+            status = generator.choice(REQUEST_STATUSES)
+            created_at = moment()
+            self.add('requests', {
+                'id': i, 'subject': f'Request {i}', 'category': generator.choice(REQUEST_CATEGORIES),
+                'impact': generator.choice(('low', 'medium', 'high', 'top')), 'status': status, 'source': 'fake',
+                'team': _stub(generator.choice(teams_list), 'name'), 'member': _stub(generator.choice(people_list), 'name'),
+                'requested_by': requested_by, 'requested_for': requested_by, 'created_by': requested_by,
+                'workflow': _stub(self.records['workflows'][i % workflows + 1], 'subject') if workflows and i % 4 == 0 else None,
+                'created_at': created_at, 'updated_at': max(created_at, moment()),
+                'completed_at': moment() if status == 'completed' else None,
+            })
+            self.notes[i] = [{'id': (i - 1) * notes_per_request + j + 1, 'text': f'Note {j + 1} of request {i}',
+                              'person': requested_by, 'internal': j % 2 == 1, 'created_at': created_at}
+                             for j in range(notes_per_request)]
+            self.request_cis[i] = [generator.randint(1, cis) for _ in range(cis_per_request)] if cis else []
+        self._next_ids = {collection: max(records, default=0) + 1 for collection, records in self.records.items()}
+        self._lock = threading.Lock()
+
+    def add(self, collection: str, record: dict) -> dict:
+        """
+        Add a record, its nodeID is derived from its ID.
+        """
+        record.setdefault('nodeID', f'fake-{collection}-{record["id"]}')
+        self.records[collection][record['id']] = record
+        return record
+
+    def create(self, collection: str, data: dict) -> dict:
+        """
+        Create a record with the next free ID of a collection.
+        """
+        with self._lock:
+            id = self._next_ids[collection]
+            self._next_ids[collection] = id + 1
+        now = _timestamp(datetime.now(timezone.utc))
+        return self.add(collection, dict(data, id=id, created_at=now, updated_at=now))
+
+    def list(self, collection: str) -> List[dict]:
+        return list(self.records[collection].values())
+
+    def get(self, collection: str, id) -> Optional[dict]:
+        try:
+            return self.records[collection].get(int(id))
+        except ValueError:
+            return None
+
+
+class FakeXurrentServer:
+    """
+    Local stand-in of the Xurrent API for load and scale testing, serving a FakeDataset over HTTP on the loopback
+    interface. It emulates the endpoints used by this library: the listings, records and updates of /requests,
+    /tasks, /workflows, /people, /teams and /cis, request notes, request CI links, /export with polling and
+    downloads and /import, with 'Link' header pagination.
+
+    Latency, rate limits (429 with Retry-After) and server errors (5xx) can be configured or injected:
+
+        with FakeXurrentServer(FakeDataset(requests=100000), latency=0.05, rate_limit=100, error_rate=0.01) as server:
+            helper = XurrentApiHelper(server.base_url, 'token', 'account', resolve_user=False)
+            requests = Request.get_requests(helper)
+
+    The server can also be started from the command line: python -m xurrent.fake_server --help
+    """
+
+    def __init__(self, dataset: FakeDataset = None, host: str = '127.0.0.1', port: int = 0,
+                 latency: Union[float, Tuple[float, float]] = 0.0, rate_limit: int = None, rate_limit_window: float = 1.0,
+                 error_rate: float = 0.0, error_status: int = 503, export_polls: int = 2, max_per_page: int = 100,
+                 seed: int = None):
+        """
+        :param dataset: Records to serve (default: a FakeDataset with the default sizes)
+        :param host: Interface to listen on (default: 127.0.0.1)
+        :param port: Port to listen on, 0 picks a free port (default: 0)
+        :param latency: Delay in seconds of every response, or a (minimum, maximum) range (default: 0)
+        :param rate_limit: Number of requests per rate limit window, further requests get a 429 (default: unlimited)
+        :param rate_limit_window: Length of a rate limit window in seconds (default: 1)
+        :param error_rate: Share of the requests answered with error_status, between 0 and 1 (default: 0)
+        :param error_status: Status code of the injected errors (default: 503)
+        :param export_polls: Number of polls an export or import stays queued/processing (default: 2)
+        :param max_per_page: Maximum number of records per page (default: 100)
+        :param seed: Seed of the latency and error injection (optional)
+        """
+        self.dataset = dataset if dataset is not None else FakeDataset()
+        self.latency = latency
+        self.rate_limit = rate_limit
+        self.rate_limit_window = rate_limit_window
+        self.error_rate = error_rate
+        self.error_status = error_status
+        self.export_polls = export_polls
+        self.max_per_page = max_per_page
+        self.stats: Dict[Tuple[str, int], int] = {}
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self._window_start = time.time()
+        self._window_count = 0
+        self._failures: List[Tuple[int, dict]] = []
+        self._jobs: Dict[str, dict] = {}
+        self._httpd = ThreadingHTTPServer((host, port), _Handler)
+        self._httpd.daemon_threads = True
+        self._httpd.fake_server = self
+        self._thread = None
+
+    @property
+    def base_url(self) -> str:
+        """
+        :return: Base URL to pass to XurrentApiHelper
+        """
+        host, port = self._httpd.server_address[:2]
+        return f'http://{host}:{port}/v1'
+
+    def start(self) -> FakeXurrentServer:
+        """
+        Serve requests in a background thread.
+        """
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._httpd.serve_forever, args=(0.05,), name='xurrent-fake-server', daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        """
+        Stop serving and close the socket.
+        """
+        if self._thread is not None:
+            self._httpd.shutdown()
+            self._thread.join()
+            self._thread = None
+        self._httpd.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc, tb):
+        self.stop()
+
+    def fail_next(self, count: int = 1, status: int = 503, retry_after: float = None) -> None:
+        """
+        Answer the next requests with an error, e.g. fail_next(3, 429, retry_after=1) to throttle the next 3 requests.
+        :param count: Number of requests to fail
+        :param status: Status code of the failures (default: 503)
+        :param retry_after: Value of the Retry-After header in seconds (optional)
+        """
+        headers = {'Retry-After': str(retry_after)} if retry_after is not None else {}
+        with self._lock:
+            self._failures.extend((status, headers) for _ in range(count))
+
+    @property
+    def requests_served(self) -> int:
+        with self._lock:
+            return sum(self.stats.values())
+
+    def _record(self, method: str, status: int) -> None:
+        with self._lock:
+            self.stats[(method, status)] = self.stats.get((method, status), 0) + 1
+
+    def _delay(self) -> float:
+        if isinstance(self.latency, (tuple, list)):
+            with self._lock:
+                return self._random.uniform(*self.latency)
+        return self.latency
+
+    def _admit(self) -> Tuple[Optional[int], dict]:
+        """
+        Apply the rate limit and the injected errors to a request.
+        :return: Tuple of the status code of the failure (None to serve the request) and the headers to add
+        """
+        now = time.time()
+        with self._lock:
+            headers = {}
+            if self.rate_limit is not None:
+                if now - self._window_start >= self.rate_limit_window:
+                    self._window_start = now
+                    self._window_count = 0
+                reset = self._window_start + self.rate_limit_window
+                self._window_count += 1
+                headers = {'X-RateLimit-Limit': str(self.rate_limit),
+                           'X-RateLimit-Remaining': str(max(self.rate_limit - self._window_count, 0)),
+                           'X-RateLimit-Reset': str(math.ceil(reset))}
+                if self._window_count > self.rate_limit:
+                    headers['Retry-After'] = str(max(math.ceil(reset - now), 1))
+                    return 429, headers
+            if self._failures:
+                status, failure_headers = self._failures.pop(0)
+                return status, dict(headers, **failure_headers)
+            if self.error_rate and self._random.random() < self.error_rate:
+                return self.error_status, headers
+        return None, headers
+
+    def handle(self, method: str, url: str, headers: dict, body: bytes) -> Tuple[int, dict, bytes]:
+        """
+        Answer a request, without the network layer.
+        :param method: HTTP method
+        :param url: Path and query of the request, or its full URL
+        :param headers: Request headers
+        :param body: Request body
+        :return: Tuple of the status code, the response headers and the response body
+        """
+        delay = self._delay()
+        if delay:
+            time.sleep(delay)
+        status, extra_headers = self._admit()
+        if status is not None:
+            result = (status, extra_headers, _json({'message': f'Injected error {status}'}))
+        elif not headers.get('Authorization') and not urlsplit(url).path.startswith('/downloads/'):
+            result = (401, extra_headers, _json({'message': 'Missing authorization'}))
+        else:
+            status, response_headers, payload = self._route(method, url, headers, body)
+            response_headers.update(extra_headers)
+            result = (status, response_headers, payload if isinstance(payload, bytes) else _json(payload) if payload is not None else b'')
+        self._record(method, result[0])
+        return result
+
+    def _route(self, method: str, url: str, headers: dict, body: bytes) -> Tuple[int, dict, object]:
+        parts = urlsplit(url)
+        query = dict(parse_qsl(parts.query, keep_blank_values=True))
+        path = parts.path[3:] if parts.path.startswith('/v1/') else parts.path
+        segments = [segment for segment in path.split('/') if segment]
+        data = None
+        if body and headers.get('Content-Type', '').startswith('application/json'):
+            data = json.loads(body)
+        base = f'http://{headers.get("Host", "localhost")}'
+        if not segments:
+            return 404, {}, {'message': 'Not found'}
+        if segments[0] == 'downloads' and len(segments) == 2:
+            return self._download(segments[1])
+        if segments[0] in ('export', 'import'):
+            return self._job(method, segments, data, headers, body, base)
+        collection = segments[0]
+        if collection not in COLLECTIONS:
+            return 404, {}, {'message': f'Unknown resource {collection}'}
+        dataset = self.dataset
+
+        if len(segments) == 1 or (len(segments) == 2 and segments[1] in PREDEFINED_FILTERS):
+            if method == 'GET':
+                records = dataset.list(collection)
+                if len(segments) == 2:
+                    records = [record for record in records if PREDEFINED_FILTERS[segments[1]](record)]
+                return self._listing(records, query, base + parts.path)
+            if method == 'POST':
+                return 201, {}, dataset.create(collection, data or {})
+            return 405, {}, {'message': 'Method not allowed'}
+
+        if collection == 'people' and segments[1] == 'me':
+            record = dataset.list('people')[0] if dataset.records['people'] else None
+        else:
+            record = dataset.get(collection, segments[1])
+        if record is None:
+            return 404, {}, {'message': f'{collection} {segments[1]} not found'}
+
+        if len(segments) == 2:
+            if method == 'GET':
+                return 200, {}, _select(record, query.get('fields'))
+            if method == 'PATCH':
+                record.update(data or {})
+                record['updated_at'] = _timestamp(datetime.now(timezone.utc))
+                return 200, {}, record
+            return 405, {}, {'message': 'Method not allowed'}
+
+        action = segments[2]
+        if action in ('archive', 'trash', 'restore') and method == 'POST':
+            record['archived'] = action == 'archive'
+            record['trashed'] = action == 'trash'
+            return 200, {}, record
+        if collection == 'requests' and action == 'notes':
+            notes = dataset.notes.setdefault(record['id'], [])
+            if method == 'POST':
+                note = dict(data or {}, id=sum(len(items) for items in dataset.notes.values()) + 1,
+                            created_at=_timestamp(datetime.now(timezone.utc)))
+                notes.append(note)
+                return 201, {}, note
+            return self._listing(notes, query, base + parts.path)
+        if collection == 'requests' and action == 'cis':
+            linked = dataset.request_cis.setdefault(record['id'], [])
+            if len(segments) == 4:
+                ci = dataset.get('cis', segments[3])
+                if ci is None:
+                    return 404, {}, {'message': f'cis {segments[3]} not found'}
+                if method == 'POST' and ci['id'] not in linked:
+                    linked.append(ci['id'])
+                elif method == 'DELETE' and ci['id'] in linked:
+                    linked.remove(ci['id'])
+                return 204, {}, None
+            return self._listing([dataset.records['cis'][id] for id in linked if id in dataset.records['cis']], query, base + parts.path)
+        if collection == 'people' and action == 'teams':
+            teams = [team for team_id, members in dataset.team_members.items() if record['id'] in members
+                     for team in (dataset.records['teams'].get(team_id),) if team is not None]
+            return self._listing(teams, query, base + parts.path)
+        if collection == 'teams' and action == 'members':
+            members = [dataset.records['people'][id] for id in dataset.team_members.get(record['id'], ()) if id in dataset.records['people']]
+            return self._listing(members, query, base + parts.path)
+        if collection == 'workflows' and action == 'tasks':
+            tasks = [task for task in dataset.list('tasks') if (task.get('workflow') or {}).get('id') == record['id']]
+            return self._listing(tasks, query, base + parts.path)
+        return 404, {}, {'message': 'Not found'}
+
+    def _listing(self, records: List[dict], query: dict, url: str) -> Tuple[int, dict, object]:
+        """
+        Filter and paginate a listing, with the 'Link' and X-Pagination headers of the API.
+        """
+        for name, value in query.items():
+            if name not in RESERVED_PARAMETERS:
+                records = [record for record in records if _matches(record.get(name), value)]
+        try:
+            per_page = min(max(int(query.get('per_page', 25)), 1), self.max_per_page)
+            page = max(int(query.get('page', 1)), 1)
+        except ValueError:
+            return 400, {}, {'message': 'Invalid pagination parameters'}
+        pages = max(math.ceil(len(records) / per_page), 1)
+        items = [_select(record, query.get('fields')) for record in records[(page - 1) * per_page:page * per_page]]
+
+        def link(number):
+            return f'<{url}?{urlencode(dict(query, page=number, per_page=per_page))}>'
+        links = [f'{link(1)}; rel="first"']
+        if page > 1:
+            links.append(f'{link(page - 1)}; rel="prev"')
+        if page < pages:
+            links.append(f'{link(page + 1)}; rel="next"')
+        links.append(f'{link(pages)}; rel="last"')
+        headers = {'Link': ', '.join(links), 'X-Pagination-Per-Page': str(per_page), 'X-Pagination-Current-Page': str(page),
+                   'X-Pagination-Total-Pages': str(pages), 'X-Pagination-Total-Entries': str(len(records))}
+        return 200, headers, items
+
+    def _job(self, method: str, segments: List[str], data: Optional[dict], headers: dict, body: bytes, base: str):
+        """
+        Start or poll an export or import. Jobs stay queued/processing for export_polls polls.
+        """
+        kind = segments[0]
+        if method == 'POST' and len(segments) == 1:
+            token = uuid.uuid4().hex
+            if kind == 'export':
+                types = [type.strip() for type in (data or {}).get('type', '').split(',') if type.strip()]
+                unknown = [type for type in types if type not in COLLECTIONS and type != 'configuration_items']
+                if not types or unknown or (data or {}).get('export_format', 'csv') != 'csv':
+                    return 422, {}, {'message': 'Only csv exports of known types are supported'}
+                job = {'kind': kind, 'types': types}
+            else:
+                job = {'kind': kind, 'rows': _import_rows(headers.get('Content-Type', ''), body)}
+            with self._lock:
+                self._jobs[token] = dict(job, polls=0)
+            return 200, {}, {'token': token}
+        if method == 'GET' and len(segments) == 2:
+            with self._lock:
+                job = self._jobs.get(segments[1])
+                if job is None or job['kind'] != kind:
+                    return 404, {}, {'message': f'Unknown {kind} {segments[1]}'}
+                job['polls'] += 1
+                polls = job['polls']
+            if polls <= self.export_polls:
+                return 200, {}, {'state': 'queued' if polls == 1 else 'processing'}
+            if kind == 'export':
+                return 200, {}, {'state': 'done', 'url': f'{base}/downloads/{segments[1]}'}
+            return 200, {}, {'state': 'done', 'results': {'created': job['rows'], 'updated': 0, 'deleted': 0,
+                                                          'unchanged': 0, 'failures': 0, 'errors': 0}}
+        return 405, {}, {'message': 'Method not allowed'}
+
+    def _download(self, token: str):
+        with self._lock:
+            job = self._jobs.get(token)
+        if job is None or job['kind'] != 'export':
+            return 404, {}, {'message': 'Unknown download'}
+        tables = {type: _csv(self.dataset.list('cis' if type == 'configuration_items' else type)) for type in job['types']}
+        if len(tables) == 1:
+            return 200, {'Content-Type': 'text/csv'}, next(iter(tables.values()))
+        buffer = io.BytesIO()
+        with zipfile.ZipFile(buffer, 'w', zipfile.ZIP_DEFLATED) as archive:
+            for type, content in tables.items():
+                archive.writestr(f'{type}.csv', content)
+        return 200, {'Content-Type': 'application/zip'}, buffer.getvalue()
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def _serve(self):
+        length = int(self.headers.get('Content-Length') or 0)
+        body = self.rfile.read(length) if length else b''
+        status, headers, payload = self.server.fake_server.handle(self.command, self.path, dict(self.headers.items()), body)
+        self.send_response(status)
+        headers.setdefault('Content-Type', 'application/json')
+        for name, value in headers.items():
+            self.send_header(name, value)
+        self.send_header('Content-Length', str(len(payload)))
+        self.end_headers()
+        if payload:
+            self.wfile.write(payload)
+
+    do_GET = do_POST = do_PATCH = do_PUT = do_DELETE = _serve
+
+    def log_message(self, format, *args):
+        pass
+
+
+def _json(payload) -> bytes:
+    return json.dumps(payload).encode()
+
+
+def _select(record: dict, fields: Optional[str]) -> dict:
+    """
+    Reduce a record to the requested fields (and its id and nodeID).
+    """
+    if not fields:
+        return record
+    names = {'id', 'nodeID'} | {name.strip() for name in fields.split(',')}
+    return {name: value for name, value in record.items() if name in names}
+
+
+def _matches(value, condition: str) -> bool:
+    """
+    Match a field of a record against a filter value: '>value' and '<value' compare, other values must be equal.
+    The ID of nested records is compared.
+    >>> _matches('2024-03-02T00:00:00Z', '>2024-03-01T00:00:00Z')
+    True
+    >>> _matches({'id': 7, 'name': 'Ann'}, '7')
+    True
+    """
+    if isinstance(value, dict):
+        value = value.get('id')
+    if value is None:
+        return condition in ('', 'null')
+    if condition[:1] in ('>', '<'):
+        text = str(value)
+        return text > condition[1:] if condition[0] == '>' else text < condition[1:]
+    if isinstance(value, bool):
+        return str(value).lower() == condition.lower()
+    return str(value) == condition
+
+
+def _csv(records: List[dict]) -> bytes:
+    """
+    Export records as CSV with the column headers of an export ('Primary Email'), nested records by name.
+    """
+    columns = []
+    for record in records:
+        for name, value in record.items():
+            if name not in columns and not isinstance(value, list):
+                columns.append(name)
+    text = io.StringIO()
+    writer = csv.writer(text)
+    writer.writerow(['ID' if name == 'id' else re.sub(r'_', ' ', name).title() for name in columns])
+    for record in records:
+        row = []
+        for name in columns:
+            value = record.get(name)
+            if isinstance(value, dict):
+                value = value.get('name', value.get('subject', value.get('id')))
+            row.append('' if value is None else value)
+        writer.writerow(row)
+    return text.getvalue().encode()
+
+
+def _import_rows(content_type: str, body: bytes) -> int:
+    """
+    :return: Number of CSV rows of the file of a multipart/form-data import body
+    """
+    match = re.search(r'boundary=([^;]+)', content_type)
+    if not match:
+        return 0
+    for part in body.split(b'--' + match.group(1).encode()):
+        head, _, content = part.partition(b'\r\n\r\n')
+        if b'name="file"' in head:
+            lines = [line for line in content.strip(b'\r\n').splitlines() if line.strip()]
+            return max(len(lines) - 1, 0)
+    return 0
+
+
+def main(argv: List[str] = None) -> None:
+    parser = argparse.ArgumentParser(description='Serve a fake Xurrent API with generated records for load testing.')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8080)
+    parser.add_argument('--requests', type=int, default=1000, help='Number of generated requests')
+    parser.add_argument('--people', type=int, default=100, help='Number of generated people')
+    parser.add_argument('--teams', type=int, default=10, help='Number of generated teams')
+    parser.add_argument('--workflows', type=int, default=50, help='Number of generated workflows')
+    parser.add_argument('--cis', type=int, default=200, help='Number of generated configuration items')
+    parser.add_argument('--latency', type=float, default=0.0, help='Delay of every response in seconds')
+    parser.add_argument('--rate-limit', type=int, default=None, help='Requests per rate limit window')
+    parser.add_argument('--rate-limit-window', type=float, default=1.0, help='Rate limit window in seconds')
+    parser.add_argument('--error-rate', type=float, default=0.0, help='Share of requests answered with a 503')
+    parser.add_argument('--seed', type=int, default=1)
+    args = parser.parse_args(argv)
+    dataset = FakeDataset(requests=args.requests, people=args.people, teams=args.teams, workflows=args.workflows,
+                          cis=args.cis, seed=args.seed)
+    server = FakeXurrentServer(dataset, args.host, args.port, latency=args.latency, rate_limit=args.rate_limit,
+                               rate_limit_window=args.rate_limit_window, error_rate=args.error_rate, seed=args.seed)
+    print(f'Serving the fake Xurrent API at {server.base_url} (Ctrl+C to stop)')
+    try:
+        server._httpd.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server._httpd.server_close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,165 @@
+from __future__ import annotations  # Needed for forward references
+from contextlib import contextmanager
+from typing import Iterator, List, Optional, Type
+import threading
+import weakref
+from datetime import datetime
+from .references import Reference
+from .timestamps import parse_timestamp, raw_attribute
+
+
+# Marker of a field that is not set
+_MISSING = object()
+
+
+def _covers(current, value) -> bool:
+    """
+    :return: True if an attribute value already holds everything of the value of a newer record
+    """
+    if isinstance(current, Reference) and not current.resolved:
+        return current.data == value
+    if isinstance(value, dict) and hasattr(current, '_attributes'):
+        # Nested reference, already resolved to a model instance
+        return all(_covers(raw_attribute(current, key, _MISSING), item) for key, item in value.items())
+    if isinstance(current, datetime) and isinstance(value, str):
+        # Timestamp field that has been parsed since
+        return current == parse_timestamp(value)
+    return current == value
+
+
+class IdentityMap:
+    """
+    Per-connection map of (model class, id) to the single instance representing that record.
+
+    Records referenced many times, e.g. the same person as member, requested_by and created_by of thousands of
+    requests, are resolved to one shared instance instead of a copy per reference, so identity checks are a
+    simple `is` and memory grows with the number of distinct records.
+    When a record arrives with fields the shared instance does not have yet (or with changed values), e.g. the
+    full person after a reference stub, the fields are merged into the existing instance; fields missing from
+    the newer record are kept.
+
+    Instances are held weakly: a record is dropped from the map once nothing else refers to it.
+    """
+
+    def __init__(self, weak: bool = True):
+        """
+        :param weak: Hold the instances weakly (default: True), otherwise until the map is cleared or dropped
+        """
+        self._instances = weakref.WeakValueDictionary() if weak else {}
+        # Last record resolved per key, to skip the merge of identical records. Only kept by strong maps,
+        # as it holds on to the records
+        self._records = None if weak else {}
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._instances)
+
+    def get(self, model: Type, id) -> Optional[object]:
+        """
+        :param model: Model class, e.g. Person
+        :param id: ID of the record
+        :return: Shared instance of the record, None if it is not in the map
+        """
+        return self._instances.get((model, id))
+
+    def resolve(self, model: Type, connection_object, data: dict):
+        """
+        Return the shared instance of a record, creating it or merging the fields of `data` into it.
+        :param model: Model class, e.g. Person
+        :param connection_object: Connection object to bind a new instance to
+        :param data: Record as returned by the API, with an 'id'
+        :return: Shared model instance
+        """
+        key = (model, data['id'])
+        records = self._records
+        instance = self._instances.get(key)
+        if instance is not None:
+            if records is not None:
+                if records.get(key) == data:
+                    return instance
+                records[key] = data
+            self.merge(instance, connection_object, data)
+            return instance
+        # Nested references resolve through the map as well, so the instance is created outside of the lock
+        created = model(connection_object, **data)
+        with self._lock:
+            instance = self._instances.get(key)
+            if instance is None:
+                self._instances[key] = created
+                if records is not None:
+                    records[key] = data
+                return created
+        self.merge(instance, connection_object, data)
+        return instance
+
+    def merge(self, instance, connection_object, data: dict) -> None:
+        """
+        Merge the fields of a newer record into an instance, converting them as the model constructor does.
+        """
+        if all(_covers(raw_attribute(instance, key, _MISSING), value) for key, value in data.items()):
+            return
+        update = type(instance)(connection_object, **data)._attributes()
+        for key, value in data.items():
+            if key in update and not _covers(raw_attribute(instance, key, _MISSING), value):
+                setattr(instance, key, update[key])
+
+    def clear(self) -> None:
+        """
+        Forget all instances. Instances still referenced elsewhere are no longer shared with new records.
+        """
+        with self._lock:
+            self._instances.clear()
+            if self._records is not None:
+                self._records.clear()
+
+
+# Identity map of the batch being built in the current thread, see shared_references
+_batch = threading.local()
+
+
+@contextmanager
+def shared_references() -> Iterator[None]:
+    """
+    Resolve every record built in the block (in the current thread) to one instance per (model, id), e.g. the
+    same person referenced by many requests of a page. Records of connection objects with an identity map
+    resolve through that map instead.
+    """
+    if getattr(_batch, 'identity_map', None) is not None:
+        yield
+        return
+    _batch.identity_map = IdentityMap(weak=False)
+    try:
+        yield
+    finally:
+        _batch.identity_map = None
+
+
+def resolve_instance(model: Type, connection_object, data: dict):
+    """
+    Create a model instance from a record, through the identity map of the connection object if it has one.
+    """
+    identity_map = getattr(connection_object, 'identity_map', None)
+    if identity_map is None:
+        identity_map = getattr(_batch, 'identity_map', None)
+        if identity_map is None:
+            return model(connection_object, **data)
+    return identity_map.resolve(model, connection_object, data)
+
+
+def resolve_instances(model: Type, connection_object, records: List[dict]) -> List:
+    """
+    Create the model instances of a page or list of records, building every referenced record only once.
+    :param model: Model class, e.g. Request
+    :param connection_object: Connection object to bind the instances to
+    :param records: List of records as returned by the API, each with an 'id'
+    :return: List of model instances, in the order of the records
+    """
+    if not isinstance(records, list):
+        raise TypeError(f"Expected 'records' to be a list, got {type(records).__name__}")
+    if not all(isinstance(data, dict) and 'id' in data for data in records):
+        for data in records:
+            if not isinstance(data, dict):
+                raise TypeError(f"Expected 'data' to be a dictionary, got {type(data).__name__}")
+        raise ValueError("Data dictionary must contain an 'id' field.")
+    with shared_references():
+        return [resolve_instance(model, connection_object, data) for data in records]
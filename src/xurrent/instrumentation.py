@@ -0,0 +1,363 @@
+from __future__ import annotations  # Needed for forward references
+from bisect import bisect_left
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+from urllib.parse import urlsplit
+import logging
+import re
+import threading
+import time
+
+try:
+    import opentelemetry.metrics as otel_metrics
+except ImportError:  # pragma: no cover - optional dependency
+    otel_metrics = None
+
+try:
+    import prometheus_client
+except ImportError:  # pragma: no cover - optional dependency
+    prometheus_client = None
+
+
+# Path segments that identify a record: numeric IDs, and long tokens such as export tokens or node IDs
+_ID_SEGMENT = re.compile(r'^(\d+|(?=[^/]*\d)[A-Za-z0-9_=-]{16,})$')
+
+# Upper bounds (seconds) of the latency histogram buckets
+DEFAULT_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+
+def templated_path(url: str, base_url: str = None) -> str:
+    """
+    Reduce the URL of a call to its endpoint, to group the calls to the same endpoint: the base URL and the query
+    are removed and the IDs in the path are replaced by {id}.
+    :param url: URL of the call
+    :param base_url: Base URL of the API, removed from the path (optional)
+    :return: Templated path, e.g. '/requests/{id}/notes'
+    >>> templated_path('https://api.example.com/v1/requests/123/notes?per_page=100&page=2', 'https://api.example.com/v1')
+    '/requests/{id}/notes'
+    >>> templated_path('https://api.example.com/v1/people/me')
+    '/v1/people/me'
+    """
+    path = urlsplit(url).path
+    if base_url:
+        base_path = urlsplit(base_url).path.rstrip('/')
+        if base_path and path.startswith(base_path):
+            path = path[len(base_path):]
+    return '/'.join('{id}' if _ID_SEGMENT.match(segment) else segment for segment in path.split('/')) or '/'
+
+
+class RequestEvent:
+    """
+    One API request, as passed to the hooks when it starts and again when it finished.
+    A request covers all attempts of a call, so its latency includes the retries and rate limit waits.
+    """
+    __slots__ = ('method', 'url', 'path', 'page', 'status', 'latency', 'response_bytes', 'retries',
+                 'rate_limit_sleep', 'error', 'started_at')
+
+    def __init__(self, method: str, url: str, path: str, page: int = None):
+        """
+        :param method: HTTP method
+        :param url: Full URL of the request
+        :param path: Templated path of the endpoint, see templated_path
+        :param page: Page number of a GET sent with pagination parameters, None for other requests
+        """
+        self.method = method
+        self.url = url
+        self.path = path
+        self.page = page
+        self.status = None  # status code of the last response
+        self.latency = None  # seconds from the start to the end of the request
+        self.response_bytes = None  # size of the response body
+        self.retries = 0
+        self.rate_limit_sleep = 0.0  # seconds waited for the client-side rate limiter
+        self.error = None  # exception that ended the request
+        self.started_at = time.monotonic()
+
+    @property
+    def endpoint(self) -> Tuple[str, str]:
+        return self.method, self.path
+
+    def finish(self, response=None, error: BaseException = None) -> None:
+        """
+        Complete the event with the response or the error that ended the request.
+        """
+        self.latency = time.monotonic() - self.started_at
+        self.error = error
+        if response is not None:
+            self.status = response.status_code
+            self.response_bytes = response_size(response)
+
+    def to_dict(self) -> dict:
+        return {name: getattr(self, name) for name in self.__slots__}
+
+    def __repr__(self) -> str:
+        return f"RequestEvent({self.method} {self.path}, page={self.page}, status={self.status}, latency={self.latency})"
+
+
+def response_size(response) -> Optional[int]:
+    """
+    :return: Size of a response body, read from the Content-Length header for streamed responses
+    """
+    content = getattr(response, '_content', None)
+    if isinstance(content, bytes):
+        return len(content)
+    length = response.headers.get('Content-Length')
+    return int(length) if length and length.isdigit() else None
+
+
+class RequestHook:
+    """
+    Base class of the hooks receiving the request events of an API helper (see the hooks argument of
+    XurrentApiHelper). Hooks are called in the thread sending the request and should return quickly.
+    """
+
+    def request_started(self, event: RequestEvent) -> None:
+        """
+        Called before the first attempt of a request.
+        """
+
+    def request_finished(self, event: RequestEvent) -> None:
+        """
+        Called once the request succeeded or failed, with its status, latency, size, retries and waits.
+        """
+
+
+class CallbackHook(RequestHook):
+    """
+    Hook calling plain functions with the events.
+    """
+
+    def __init__(self, on_finished: Callable[[RequestEvent], None] = None,
+                 on_started: Callable[[RequestEvent], None] = None):
+        self.on_finished = on_finished
+        self.on_started = on_started
+
+    def request_started(self, event: RequestEvent) -> None:
+        if self.on_started is not None:
+            self.on_started(event)
+
+    def request_finished(self, event: RequestEvent) -> None:
+        if self.on_finished is not None:
+            self.on_finished(event)
+
+
+def as_hooks(hooks) -> List[RequestHook]:
+    """
+    Normalize the hooks argument of an API helper: a hook, a callable (called with every finished event)
+    or a list of them.
+    """
+    if hooks is None:
+        return []
+    if isinstance(hooks, RequestHook) or callable(hooks):
+        hooks = [hooks]
+    return [hook if isinstance(hook, RequestHook) else CallbackHook(hook) for hook in hooks]
+
+
+def emit(hooks: Iterable[RequestHook], name: str, event: RequestEvent, logger: logging.Logger = None) -> None:
+    """
+    Pass an event to all hooks. A failing hook is logged and does not affect the request.
+    """
+    for hook in hooks:
+        try:
+            getattr(hook, name)(event)
+        except Exception as e:
+            if logger is not None:
+                logger.warning(f'Request hook {type(hook).__name__}.{name} failed: {e}')
+
+
+class EndpointStats:
+    """
+    Counters of the requests to one endpoint (method and templated path).
+    """
+    __slots__ = ('method', 'path', 'count', 'errors', 'statuses', 'total_latency', 'max_latency', 'buckets',
+                 'bucket_counts', 'response_bytes', 'pages', 'retries', 'rate_limit_sleep')
+
+    def __init__(self, method: str, path: str, buckets: Tuple[float, ...]):
+        self.method = method
+        self.path = path
+        self.count = 0
+        self.errors = 0
+        self.statuses: Dict[Optional[int], int] = {}
+        self.total_latency = 0.0
+        self.max_latency = 0.0
+        self.buckets = buckets
+        self.bucket_counts = [0] * (len(buckets) + 1)  # the last bucket counts the latencies above all bounds
+        self.response_bytes = 0
+        self.pages = 0
+        self.retries = 0
+        self.rate_limit_sleep = 0.0
+
+    def add(self, event: RequestEvent) -> None:
+        self.count += 1
+        if event.error is not None:
+            self.errors += 1
+        self.statuses[event.status] = self.statuses.get(event.status, 0) + 1
+        latency = event.latency or 0.0
+        self.total_latency += latency
+        self.max_latency = max(self.max_latency, latency)
+        self.bucket_counts[bisect_left(self.buckets, latency)] += 1
+        self.response_bytes += event.response_bytes or 0
+        if event.page is not None:
+            self.pages += 1
+        self.retries += event.retries
+        self.rate_limit_sleep += event.rate_limit_sleep
+
+    @property
+    def mean_latency(self) -> float:
+        return self.total_latency / self.count if self.count else 0.0
+
+    def percentile(self, q: float) -> float:
+        """
+        Estimate a latency percentile from the histogram, as the upper bound of the bucket holding it.
+        :param q: Percentile between 0 and 100
+        :return: Latency in seconds (the maximum latency for the last bucket)
+        """
+        if not self.count:
+            return 0.0
+        rank = q / 100 * self.count
+        seen = 0
+        for bound, count in zip(self.buckets, self.bucket_counts):
+            seen += count
+            if seen >= rank and count:
+                return min(bound, self.max_latency)
+        return self.max_latency
+
+    def to_dict(self) -> dict:
+        return {
+            'method': self.method,
+            'path': self.path,
+            'count': self.count,
+            'errors': self.errors,
+            'statuses': dict(self.statuses),
+            'mean_latency': self.mean_latency,
+            'p50_latency': self.percentile(50),
+            'p95_latency': self.percentile(95),
+            'max_latency': self.max_latency,
+            'histogram': dict(zip(self.buckets + (float('inf'),), self.bucket_counts)),
+            'response_bytes': self.response_bytes,
+            'pages': self.pages,
+            'retries': self.retries,
+            'rate_limit_sleep': self.rate_limit_sleep,
+        }
+
+
+class MetricsAggregator(RequestHook):
+    """
+    In-memory hook counting the requests per endpoint, with latency histograms, response sizes, retries and
+    rate limit waits, to find slow endpoints and throttling hot spots:
+
+        metrics = MetricsAggregator()
+        helper = XurrentApiHelper(base_url, api_key, account, hooks=[metrics])
+        ...
+        for stats in metrics.summary(sort_by='total_latency'):
+            print(stats['method'], stats['path'], stats['count'], stats['p95_latency'])
+    """
+
+    def __init__(self, buckets: Iterable[float] = DEFAULT_BUCKETS):
+        """
+        :param buckets: Upper bounds in seconds of the latency histogram buckets (default: DEFAULT_BUCKETS)
+        """
+        self.buckets = tuple(sorted(buckets))
+        self._lock = threading.Lock()
+        self._endpoints: Dict[Tuple[str, str], EndpointStats] = {}
+
+    def request_finished(self, event: RequestEvent) -> None:
+        with self._lock:
+            stats = self._endpoints.get(event.endpoint)
+            if stats is None:
+                stats = self._endpoints[event.endpoint] = EndpointStats(event.method, event.path, self.buckets)
+            stats.add(event)
+
+    def get(self, method: str, path: str) -> Optional[EndpointStats]:
+        """
+        :return: Counters of an endpoint, None if it has not been called
+        """
+        return self._endpoints.get((method, path))
+
+    def summary(self, sort_by: str = 'total_latency') -> List[dict]:
+        """
+        :param sort_by: Counter to sort the endpoints by, descending (default: total_latency);
+                        e.g. count, mean_latency, p95_latency, retries or rate_limit_sleep
+        :return: Counters of every endpoint as dictionaries
+        """
+        with self._lock:
+            endpoints = list(self._endpoints.values())
+        if sort_by == 'total_latency':
+            endpoints.sort(key=lambda stats: stats.total_latency, reverse=True)
+            return [stats.to_dict() for stats in endpoints]
+        return sorted((stats.to_dict() for stats in endpoints), key=lambda stats: stats[sort_by], reverse=True)
+
+    def reset(self) -> None:
+        with self._lock:
+            self._endpoints.clear()
+
+
+class OpenTelemetryHook(RequestHook):
+    """
+    Hook recording the requests as OpenTelemetry metrics (optional dependency: pip install xurrent[opentelemetry]):
+    the xurrent.client.requests counter, the xurrent.client.request.duration and xurrent.client.response.size
+    histograms and the xurrent.client.retries and xurrent.client.rate_limit.sleep counters, all with the
+    http.request.method, url.template and http.response.status_code attributes.
+    """
+
+    def __init__(self, meter=None):
+        """
+        :param meter: OpenTelemetry meter (default: the meter 'xurrent' of the global meter provider)
+        """
+        if otel_metrics is None:
+            raise ImportError("OpenTelemetryHook requires the 'opentelemetry-api' package: pip install xurrent[opentelemetry]")
+        meter = meter or otel_metrics.get_meter('xurrent')
+        self._requests = meter.create_counter('xurrent.client.requests', unit='{request}', description='API requests')
+        self._duration = meter.create_histogram('xurrent.client.request.duration', unit='s', description='Latency of API requests')
+        self._size = meter.create_histogram('xurrent.client.response.size', unit='By', description='Size of API responses')
+        self._retries = meter.create_counter('xurrent.client.retries', unit='{retry}', description='Retried attempts')
+        self._sleep = meter.create_counter('xurrent.client.rate_limit.sleep', unit='s', description='Time waited for the rate limiter')
+
+    def request_finished(self, event: RequestEvent) -> None:
+        attributes = {'http.request.method': event.method, 'url.template': event.path}
+        if event.status is not None:
+            attributes['http.response.status_code'] = event.status
+        self._requests.add(1, attributes)
+        self._duration.record(event.latency or 0.0, attributes)
+        if event.response_bytes is not None:
+            self._size.record(event.response_bytes, attributes)
+        if event.retries:
+            self._retries.add(event.retries, attributes)
+        if event.rate_limit_sleep:
+            self._sleep.add(event.rate_limit_sleep, attributes)
+
+
+class PrometheusHook(RequestHook):
+    """
+    Hook recording the requests as Prometheus metrics (optional dependency: pip install xurrent[prometheus]):
+    xurrent_requests_total, xurrent_request_duration_seconds, xurrent_response_bytes_total, xurrent_retries_total and
+    xurrent_rate_limit_sleep_seconds_total, labelled with method, path and status.
+    """
+
+    def __init__(self, registry=None, buckets: Iterable[float] = DEFAULT_BUCKETS):
+        """
+        :param registry: Prometheus registry (default: the global registry)
+        :param buckets: Upper bounds in seconds of the latency histogram buckets (default: DEFAULT_BUCKETS)
+        """
+        if prometheus_client is None:
+            raise ImportError("PrometheusHook requires the 'prometheus-client' package: pip install xurrent[prometheus]")
+        if registry is None:
+            registry = prometheus_client.REGISTRY
+        labels = ('method', 'path', 'status')
+        self._requests = prometheus_client.Counter('xurrent_requests', 'API requests', labels, registry=registry)
+        self._duration = prometheus_client.Histogram('xurrent_request_duration_seconds', 'Latency of API requests',
+                                                     ('method', 'path'), buckets=tuple(buckets), registry=registry)
+        self._bytes = prometheus_client.Counter('xurrent_response_bytes', 'Size of API responses', ('method', 'path'), registry=registry)
+        self._retries = prometheus_client.Counter('xurrent_retries', 'Retried attempts', ('method', 'path'), registry=registry)
+        self._sleep = prometheus_client.Counter('xurrent_rate_limit_sleep_seconds', 'Time waited for the rate limiter',
+                                                ('method', 'path'), registry=registry)
+
+    def request_finished(self, event: RequestEvent) -> None:
+        status = str(event.status) if event.status is not None else 'error'
+        self._requests.labels(event.method, event.path, status).inc()
+        self._duration.labels(event.method, event.path).observe(event.latency or 0.0)
+        if event.response_bytes:
+            self._bytes.labels(event.method, event.path).inc(event.response_bytes)
+        if event.retries:
+            self._retries.labels(event.method, event.path).inc(event.retries)
+        if event.rate_limit_sleep:
+            self._sleep.labels(event.method, event.path).inc(event.rate_limit_sleep)
@@ -0,0 +1,313 @@
+from __future__ import annotations  # Needed for forward references
+from datetime import datetime
+from typing import Iterable, Iterator, List, Optional, Type
+import json
+import os
+import re
+import sqlite3
+import tempfile
+import threading
+from .sync import MemoryWatermarkStore, SQLiteWatermarkStore, from_timestamp, sync_records, to_timestamp
+
+
+# Resources kept in the mirror, by their resource URL
+MIRRORED_RESOURCES = ('requests', 'people', 'teams', 'workflows', 'tasks', 'cis')
+
+# Columns of the mirrored tables that results can be ordered by
+ORDER_COLUMNS = ('id', 'status', 'team_id', 'member_id', 'name', 'updated_at')
+
+
+def _json_default(value):
+    return value.isoformat() if isinstance(value, datetime) else str(value)
+
+
+def _order_by(order_by: str) -> str:
+    """
+    Validate an ordering of query results, a comma-separated list of mirrored columns with an optional direction.
+    :raises ValueError: If the ordering refers to another column or is not a plain column list
+    >>> _order_by('status, updated_at desc')
+    'status, updated_at DESC'
+    """
+    terms = []
+    for term in order_by.split(','):
+        match = re.fullmatch(r'\s*(\w+)(?:\s+(asc|desc))?\s*', term, re.IGNORECASE)
+        if not match or match.group(1) not in ORDER_COLUMNS:
+            raise ValueError(f"Invalid order_by {order_by!r}, expected one or more of {', '.join(ORDER_COLUMNS)} with an optional ASC or DESC")
+        terms.append(f'{match.group(1)} {match.group(2).upper()}' if match.group(2) else match.group(1))
+    return ', '.join(terms)
+
+
+def _reference_id(value) -> Optional[int]:
+    """
+    :return: ID of a reference of a record, which is either a nested record or a model instance
+    """
+    if hasattr(value, 'id'):
+        return value.id
+    if isinstance(value, dict):
+        return value.get('id')
+    return None
+
+
+class Mirror:
+    """
+    Local SQLite copy of requests, people, teams, workflows, tasks and configuration items, for read-heavy analytics
+    that should not go through the rate-limited API.
+
+    Every resource is stored in its own table with the full record as JSON and indexed columns for the status,
+    team, member and updated_at, plus a table of the configuration items linked to requests.
+    Queries return instances of the model classes, bound to the connection object of the mirror.
+    """
+
+    def __init__(self, path, connection_object: XurrentApiHelper = None, batch_size: int = 500):
+        """
+        :param path: Path of the SQLite database (':memory:' for a temporary mirror)
+        :param connection_object: Instance of XurrentApiHelper to fill the mirror from and bind returned models to (optional)
+        :param batch_size: Number of records written per transaction (default: 500)
+        """
+        self.connection_object = connection_object
+        self.batch_size = batch_size
+        self._database = sqlite3.connect(path, check_same_thread=False)
+        self._lock = threading.RLock()
+        self.watermarks = SQLiteWatermarkStore(self._database, table='mirror_watermarks')
+        self.__create_schema()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def close(self) -> None:
+        """
+        Close the database connection.
+        """
+        self._database.close()
+
+    def __create_schema(self) -> None:
+        with self._lock, self._database:
+            for table in MIRRORED_RESOURCES:
+                self._database.execute(f'''CREATE TABLE IF NOT EXISTS {table} (
+                    id INTEGER PRIMARY KEY, status TEXT, team_id INTEGER, member_id INTEGER, name TEXT, updated_at TEXT, data TEXT NOT NULL)''')
+                for column in ('status', 'team_id', 'member_id', 'updated_at'):
+                    self._database.execute(f'CREATE INDEX IF NOT EXISTS {table}_{column} ON {table} ({column})')
+            self._database.execute('CREATE INDEX IF NOT EXISTS people_name ON people (name)')
+            self._database.execute('CREATE INDEX IF NOT EXISTS teams_name ON teams (name)')
+            self._database.execute('''CREATE TABLE IF NOT EXISTS request_cis (
+                request_id INTEGER NOT NULL, ci_id INTEGER NOT NULL, PRIMARY KEY (request_id, ci_id))''')
+            self._database.execute('CREATE INDEX IF NOT EXISTS request_cis_ci_id ON request_cis (ci_id)')
+
+    @staticmethod
+    def __table(model: Type) -> str:
+        table = model.__resourceUrl__
+        if table not in MIRRORED_RESOURCES:
+            raise ValueError(f"{model.__name__} is not mirrored")
+        return table
+
+    @staticmethod
+    def __row(record: dict) -> tuple:
+        updated_at = from_timestamp(record.get('updated_at'))
+        return (
+            record['id'],
+            str(record['status']) if record.get('status') is not None else None,
+            _reference_id(record.get('team')),
+            _reference_id(record.get('member')),
+            record.get('name'),
+            to_timestamp(updated_at) if updated_at else None,
+            json.dumps(record, default=_json_default),
+        )
+
+    def store(self, model: Type, records: Iterable[dict]) -> int:
+        """
+        Insert or replace records of a model, e.g. as returned by the API.
+        :param model: Model class of the records, e.g. Request
+        :param records: Iterable of record dictionaries with an 'id'
+        :return: Number of records stored
+        """
+        table = self.__table(model)
+        statement = f'INSERT OR REPLACE INTO {table} (id, status, team_id, member_id, name, updated_at, data) VALUES (?, ?, ?, ?, ?, ?, ?)'
+        count = 0
+        batch = []
+        for record in records:
+            batch.append(self.__row(record))
+            if len(batch) >= self.batch_size:
+                count += self.__write(statement, batch)
+                batch = []
+        return count + self.__write(statement, batch)
+
+    def __write(self, statement: str, rows: list) -> int:
+        if rows:
+            with self._lock, self._database:
+                self._database.executemany(statement, rows)
+        return len(rows)
+
+    def load(self, model: Type, queryfilter: dict = None) -> int:
+        """
+        Fill the mirror with all records of a model from the API.
+        :param model: Model class to load, e.g. Request
+        :param queryfilter: Dictionary of query parameters to filter by (optional)
+        :return: Number of records stored
+        """
+        connection_object = self.connection_object
+        uri = f'{connection_object.base_url}/{model.__resourceUrl__}'
+        if queryfilter:
+            uri += '?' + connection_object.create_filter_string(queryfilter)
+        return self.store(model, connection_object.iter_api_call(uri, 'GET'))
+
+    def sync(self, model: Type, overlap: float = 300) -> int:
+        """
+        Bring the records of a model up to date, reading only the records updated since the last sync of the mirror.
+        The first sync of a model loads all of its records.
+        :param model: Model class to sync, e.g. Request
+        :param overlap: Seconds to re-read before the watermark (default: 300)
+        :return: Number of records stored
+        """
+        # The watermark is kept aside until all records have been written, so that it never runs ahead of the data
+        key = model.__resourceUrl__
+        pending = MemoryWatermarkStore()
+        watermark = self.watermarks.get(key)
+        if watermark is not None:
+            pending.set(key, watermark)
+        count = self.store(model, sync_records(self.connection_object, model, pending, overlap=overlap, raw=True))
+        if pending.get(key) != watermark:
+            self.watermarks.set(key, pending.get(key))
+        return count
+
+    def load_request_cis(self, request_ids: Iterable[int] = None) -> int:
+        """
+        Fill the links between requests and configuration items from the API (one call per request).
+        :param request_ids: IDs of the requests to load the links of (default: all mirrored requests)
+        :return: Number of links stored
+        """
+        if request_ids is None:
+            with self._lock:
+                request_ids = [row[0] for row in self._database.execute('SELECT id FROM requests')]
+        count = 0
+        for request_id in request_ids:
+            uri = f'{self.connection_object.base_url}/requests/{request_id}/cis'
+            cis = list(self.connection_object.iter_api_call(uri, 'GET'))
+            with self._lock, self._database:
+                self._database.execute('DELETE FROM request_cis WHERE request_id = ?', (request_id,))
+                self._database.executemany('INSERT OR IGNORE INTO request_cis (request_id, ci_id) VALUES (?, ?)',
+                                           [(request_id, ci['id']) for ci in cis])
+            count += len(cis)
+        return count
+
+    def load_export(self, source, type: str = None, export_format: str = None) -> int:
+        """
+        Fill the mirror from the output of XurrentApiHelper.bulk_export (CSV, XLSX or a ZIP of several types).
+        Exports reference teams and people by name: these references are resolved against the mirrored teams and
+        people, so load those first. Rows without an ID cannot be mirrored and are skipped.
+        :param source: Path of the export file, its raw bytes or a binary file object
+        :param type: Resource type of a CSV/XLSX export, or the only type to read from a ZIP export
+        :param export_format: 'csv', 'xlsx' or 'zip', detected from the content if not given (optional)
+        :return: Number of records stored
+        """
+        from .exports import model_of_type, _iter_tables, _convert_row
+        count = 0
+        for table_type, rows in _iter_tables(source, type, export_format):
+            model = model_of_type(table_type)
+            if model is None:
+                continue
+            records = (self.__resolve_references(_convert_row(row)) for row in rows if row.get('ID') or row.get('id'))
+            count += self.store(model, records)
+        return count
+
+    def load_bulk_export(self, type: str, export_format: str = 'csv', **kwargs) -> int:
+        """
+        Run a bulk export through the connection object and fill the mirror from it.
+        The export is streamed to a temporary file, which is removed once it has been loaded.
+        :param type: Resource type(s) to export, comma-delimited
+        :param export_format: either 'csv' or 'xlsx' (default: csv)
+        :param kwargs: Further arguments of XurrentApiHelper.bulk_export, e.g. timeout
+        :return: Number of records stored
+        """
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'export')
+            self.connection_object.bulk_export(type, export_format, save_as=path, **kwargs)
+            return self.load_export(path, type=type if ',' not in type else None)
+
+    def __resolve_references(self, record: dict) -> dict:
+        for name, table in (('team', 'teams'), ('member', 'people')):
+            value = record.get(name)
+            if isinstance(value, str):
+                with self._lock:
+                    row = self._database.execute(f'SELECT id FROM {table} WHERE name = ?', (value,)).fetchone()
+                record[name] = {'id': row[0], 'name': value} if row else None
+                if row is None:
+                    record[f'{name}_name'] = value
+        record['id'] = int(record['id'])
+        return record
+
+    def get(self, model: Type, id: int):
+        """
+        :param model: Model class, e.g. Request
+        :param id: ID of the record
+        :return: Model instance, None if the record is not mirrored
+        """
+        with self._lock:
+            row = self._database.execute(f'SELECT data FROM {self.__table(model)} WHERE id = ?', (id,)).fetchone()
+        return model.from_data(self.connection_object, json.loads(row[0])) if row else None
+
+    def query(self, model: Type, status=None, team=None, member=None, updated_since=None, ci=None,
+              order_by: str = 'updated_at DESC', limit: int = None) -> List:
+        """
+        Query mirrored records through the indexed columns.
+        :param model: Model class to query, e.g. Request
+        :param status: Status or list of statuses (optional)
+        :param team: Team (ID or instance) the records are assigned to (optional)
+        :param member: Person (ID or instance) the records are assigned to (optional)
+        :param updated_since: Only records updated at or after this datetime or ISO 8601 timestamp (optional)
+        :param ci: Configuration item (ID or instance) linked to the requests (optional, requests only)
+        :param order_by: Ordering of the results by the columns id, status, team_id, member_id, name and updated_at,
+                         each with an optional ASC or DESC (default: 'updated_at DESC')
+        :param limit: Maximum number of records to return (optional)
+        :return: List of model instances
+        """
+        return list(self.iter_query(model, status, team, member, updated_since, ci, order_by, limit))
+
+    def iter_query(self, model: Type, status=None, team=None, member=None, updated_since=None, ci=None,
+                   order_by: str = 'updated_at DESC', limit: int = None) -> Iterator:
+        """
+        Same as query, but yields the model instances one by one.
+        :raises ValueError: If order_by refers to another column
+        """
+        table = self.__table(model)
+        conditions = []
+        parameters = []
+        if status is not None:
+            statuses = [status] if isinstance(status, str) else list(status)
+            conditions.append(f"status IN ({', '.join('?' * len(statuses))})")
+            parameters.extend(str(value) for value in statuses)
+        if team is not None:
+            conditions.append('team_id = ?')
+            parameters.append(_reference_id(team) if not isinstance(team, int) else team)
+        if member is not None:
+            conditions.append('member_id = ?')
+            parameters.append(_reference_id(member) if not isinstance(member, int) else member)
+        if updated_since is not None:
+            conditions.append('updated_at >= ?')
+            parameters.append(to_timestamp(from_timestamp(updated_since)))
+        if ci is not None:
+            if table != 'requests':
+                raise ValueError('Only requests can be queried by configuration item')
+            conditions.append('id IN (SELECT request_id FROM request_cis WHERE ci_id = ?)')
+            parameters.append(_reference_id(ci) if not isinstance(ci, int) else ci)
+        statement = f'SELECT data FROM {table}'
+        if conditions:
+            statement += ' WHERE ' + ' AND '.join(conditions)
+        if order_by:
+            statement += f' ORDER BY {_order_by(order_by)}'
+        if limit is not None:
+            statement += ' LIMIT ?'
+            parameters.append(limit)
+        with self._lock:
+            rows = self._database.execute(statement, parameters).fetchall()
+        for (data,) in rows:
+            yield model.from_data(self.connection_object, json.loads(data))
+
+    def count(self, model: Type) -> int:
+        """
+        :return: Number of mirrored records of a model
+        """
+        with self._lock:
+            return self._database.execute(f'SELECT COUNT(*) FROM {self.__table(model)}').fetchone()[0]
@@ -1,6 +1,9 @@
 from __future__ import annotations  # Needed for forward references
-from .core import XurrentApiHelper, JsonSerializableDict
-from typing import Optional, List, Dict, Type, TypeVar
+from .core import XurrentApiHelper, JsonSerializableDict, with_fields
+from .identity import resolve_instance, resolve_instances
+from .sync import WatermarkStore, sync_records
+from .async_core import AsyncXurrentApiHelper
+from typing import Optional, List, Dict, AsyncIterator, Iterator, Type, TypeVar
 
 from enum import Enum
 
@@ -18,6 +21,9 @@ T = TypeVar('T', bound='Person')
 class Person(JsonSerializableDict):
     #https://developer.xurrent.com/v1/people/
     __resourceUrl__ = 'people'
+    __timestamps__ = ('created_at', 'updated_at')
+    __slots__ = ('id', 'name', 'primary_email', 'account', 'organization', 'disabled', 'created_at',
+                 'updated_at', 'nodeID')
 
     def __init__(self, connection_object: XurrentApiHelper, id, name: str = None, primary_email: str = None,**kwargs):
         self._connection_object = connection_object
@@ -45,11 +51,19 @@ class Person(JsonSerializableDict):
             raise TypeError(f"Expected 'data' to be a dictionary, got {type(data).__name__}")
         if 'id' not in data:
             raise ValueError("Data dictionary must contain an 'id' field.")
-        return cls(connection_object, **data)
+        return resolve_instance(cls, connection_object, data)
 
     @classmethod
-    def get_by_id(cls, connection_object: XurrentApiHelper, id):
+    def from_data_many(cls, connection_object: XurrentApiHelper, data: List[dict]) -> List[T]:
+        """
+        Create the Person objects of a page or list of records, building every referenced record only once.
+        """
+        return resolve_instances(cls, connection_object, data)
+
+    @classmethod
+    def get_by_id(cls, connection_object: XurrentApiHelper, id, fields: List[str] = None):
         uri = f'{connection_object.base_url}/{cls.__resourceUrl__}/{id}'
+        uri = with_fields(uri, fields)
         return cls.from_data(connection_object, connection_object.api_call(uri, 'GET'))
 
     @classmethod
@@ -61,14 +75,38 @@ class Person(JsonSerializableDict):
         return cls.from_data(connection_object, connection_object.api_call(uri, 'GET'))
 
     @classmethod
-    def get_people(cls, connection_object: XurrentApiHelper, predefinedFilter: PeoplePredefinedFilter = None, queryfilter: dict = None) -> List[T]:
+    def get_people(cls, connection_object: XurrentApiHelper, predefinedFilter: PeoplePredefinedFilter = None, queryfilter: dict = None, fields: List[str] = None) -> List[T]:
         uri = f'{connection_object.base_url}/{cls.__resourceUrl__}'
         if predefinedFilter:
             uri = f'{uri}/{predefinedFilter}'
         if queryfilter:
             uri += '?' + connection_object.create_filter_string(queryfilter)
+        uri = with_fields(uri, fields)
         response = connection_object.api_call(uri, 'GET')
-        return [cls.from_data(connection_object, person) for person in response]
+        return cls.from_data_many(connection_object, response)
+
+    @classmethod
+    def iter_people(cls, connection_object: XurrentApiHelper, predefinedFilter: PeoplePredefinedFilter = None, queryfilter: dict = None, fields: List[str] = None) -> Iterator[T]:
+        """
+        Iterate over people page by page, without loading all of them into memory.
+        """
+        uri = f'{connection_object.base_url}/{cls.__resourceUrl__}'
+        if predefinedFilter:
+            uri = f'{uri}/{predefinedFilter}'
+        if queryfilter:
+            uri += '?' + connection_object.create_filter_string(queryfilter)
+        uri = with_fields(uri, fields)
+        for page in connection_object.iter_api_pages(uri, 'GET'):
+            yield from cls.from_data_many(connection_object, page)
+
+    @classmethod
+    def sync(cls, connection_object: XurrentApiHelper, store: WatermarkStore, key: str = None, overlap: float = 300,
+             queryfilter: dict = None, fields: List[str] = None) -> Iterator[T]:
+        """
+        Iterate over the people updated since the last sync, advancing the watermark in the store once all have been read.
+        See xurrent.sync.sync_records for the overlap window and the watermark.
+        """
+        return sync_records(connection_object, cls, store, key, overlap, queryfilter, fields)
     
     def get_teams(self) -> List[Team]:
         """
@@ -77,7 +115,7 @@ class Person(JsonSerializableDict):
         from .teams import Team
         uri = f'{self._connection_object.base_url}/{self.__resourceUrl__}/{self.id}/teams'
         response = self._connection_object.api_call(uri, 'GET')
-        return [Team.from_data(self._connection_object, team) for team in response]
+        return Team.from_data_many(self._connection_object, response)
         
     def update(self, data):
         uri = f'{self._connection_object.base_url}/{self.__resourceUrl__}/{self.id}'
@@ -137,4 +175,69 @@ class Person(JsonSerializableDict):
         uri = f'{self._connection_object.base_url}/{self.__resourceUrl__}/{self.id}/restore'
         return self._connection_object.api_call(uri, 'POST')
 
-    
\ No newline at end of file
+    # the following methods are the asyncio counterparts of the methods above, for use with AsyncXurrentApiHelper
+
+    @classmethod
+    async def async_get_by_id(cls, connection_object: AsyncXurrentApiHelper, id, fields: List[str] = None) -> T:
+        uri = f'{connection_object.base_url}/{cls.__resourceUrl__}/{id}'
+        uri = with_fields(uri, fields)
+        return cls.from_data(connection_object, await connection_object.api_call(uri, 'GET'))
+
+    @classmethod
+    async def async_get_me(cls, connection_object: AsyncXurrentApiHelper) -> T:
+        """
+        Retrieve the person object for the authenticated user.
+        """
+        uri = f'{connection_object.base_url}/{cls.__resourceUrl__}/me'
+        return cls.from_data(connection_object, await connection_object.api_call(uri, 'GET'))
+
+    @classmethod
+    async def async_get_people(cls, connection_object: AsyncXurrentApiHelper, predefinedFilter: PeoplePredefinedFilter = None, queryfilter: dict = None, fields: List[str] = None) -> List[T]:
+        uri = f'{connection_object.base_url}/{cls.__resourceUrl__}'
+        if predefinedFilter:
+            uri = f'{uri}/{predefinedFilter}'
+        if queryfilter:
+            uri += '?' + connection_object.create_filter_string(queryfilter)
+        uri = with_fields(uri, fields)
+        response = await connection_object.api_call(uri, 'GET')
+        return cls.from_data_many(connection_object, response)
+
+    @classmethod
+    async def async_iter_people(cls, connection_object: AsyncXurrentApiHelper, predefinedFilter: PeoplePredefinedFilter = None, queryfilter: dict = None, fields: List[str] = None) -> AsyncIterator[T]:
+        """
+        Iterate over people page by page, without loading all of them into memory.
+        """
+        uri = f'{connection_object.base_url}/{cls.__resourceUrl__}'
+        if predefinedFilter:
+            uri = f'{uri}/{predefinedFilter}'
+        if queryfilter:
+            uri += '?' + connection_object.create_filter_string(queryfilter)
+        uri = with_fields(uri, fields)
+        async for page in connection_object.iter_api_pages(uri, 'GET'):
+            for person in cls.from_data_many(connection_object, page):
+                yield person
+
+    async def async_get_teams(self) -> List[Team]:
+        """
+        Retrieve the teams of the person.
+        """
+        from .teams import Team
+        uri = f'{self._connection_object.base_url}/{self.__resourceUrl__}/{self.id}/teams'
+        response = await self._connection_object.api_call(uri, 'GET')
+        return Team.from_data_many(self._connection_object, response)
+
+    async def async_update(self, data) -> T:
+        uri = f'{self._connection_object.base_url}/{self.__resourceUrl__}/{self.id}'
+        response = await self._connection_object.api_call(uri, 'PATCH', data)
+        return Person.from_data(self._connection_object, response)
+
+    @classmethod
+    async def async_create(cls, connection_object: AsyncXurrentApiHelper, data: dict) -> T:
+        """
+        Create a new person object.
+
+        :param connection_object: Asynchronous Xurrent Connection object
+        :param data: Data dictionary (containing the data for the new person)
+        """
+        uri = f'{connection_object.base_url}/{cls.__resourceUrl__}'
+        return cls.from_data(connection_object, await connection_object.api_call(uri, 'POST', data))
@@ -0,0 +1,272 @@
+from __future__ import annotations  # Needed for forward references
+from typing import Dict, List, Optional, Tuple
+import os
+import sys
+import threading
+
+from .instrumentation import RequestEvent, RequestHook
+from .core import JsonSerializableDict
+
+
+# Name ('Class.method') of the methods of the model classes, by code object
+_model_methods: Dict[object, str] = {}
+_model_classes = set()
+
+# Directory of the standard library, whose frames (e.g. of contextlib or threading) are not call sites
+_STDLIB = os.path.dirname(os.__file__)
+
+
+def _model_method_names() -> Dict[object, str]:
+    """
+    :return: Names of the methods of all model classes by code object, extended when new model classes are found
+    """
+    pending = list(JsonSerializableDict.__subclasses__())
+    while pending:
+        model = pending.pop()
+        pending.extend(model.__subclasses__())
+        if model in _model_classes:
+            continue
+        _model_classes.add(model)
+        for name, member in vars(model).items():
+            function = getattr(member, '__func__', member)
+            code = getattr(function, '__code__', None)
+            if code is not None:
+                _model_methods.setdefault(code, f'{model.__name__}.{name}')
+    return _model_methods
+
+
+def _is_library_frame(frame) -> bool:
+    return frame.f_globals.get('__name__', '').split('.')[0] == 'xurrent'
+
+
+def _capture(frame) -> Tuple[Tuple[str, ...], Optional[str]]:
+    """
+    Walk the stack of a request outwards.
+    :return: Tuple of the model methods on the stack (outermost first) and the call site, the first frame outside
+             of the library ('file:line in function'), None if there is none (e.g. in prefetch threads)
+    """
+    names = _model_method_names()
+    chain = []
+    while frame is not None and _is_library_frame(frame):
+        name = names.get(frame.f_code)
+        if name is not None:
+            chain.append(name)
+        frame = frame.f_back
+    # frames of the standard library between the library and the caller are skipped
+    while frame is not None and frame.f_code.co_filename.startswith(_STDLIB) and 'site-packages' not in frame.f_code.co_filename:
+        frame = frame.f_back
+    call_site = None
+    if frame is not None:
+        call_site = f'{os.path.basename(frame.f_code.co_filename)}:{frame.f_lineno} in {frame.f_code.co_name}'
+    chain.reverse()
+    return tuple(chain), call_site
+
+
+class ProfiledCall:
+    """
+    One API call recorded by a Profiler.
+    """
+    __slots__ = ('method', 'path', 'url', 'page', 'status', 'latency', 'response_bytes', 'retries', 'chain', 'call_site')
+
+    def __init__(self, event: RequestEvent, chain: Tuple[str, ...], call_site: Optional[str]):
+        self.method = event.method
+        self.path = event.path
+        self.url = event.url
+        self.page = event.page
+        self.status = event.status
+        self.latency = event.latency
+        self.response_bytes = event.response_bytes
+        self.retries = event.retries
+        self.chain = chain
+        self.call_site = call_site
+
+    @property
+    def endpoint(self) -> str:
+        return f'{self.method} {self.path}'
+
+    @property
+    def issuer(self) -> Optional[str]:
+        """
+        :return: Model method called by the caller that issued the call, e.g. 'Task.get_workflow_of_task'
+        """
+        return self.chain[0] if self.chain else None
+
+    def to_dict(self) -> dict:
+        return {name: getattr(self, name) for name in self.__slots__}
+
+    def __repr__(self) -> str:
+        return f"ProfiledCall({self.endpoint}, issuer={self.issuer}, call_site={self.call_site})"
+
+
+class CallGroup:
+    """
+    Calls of the same shape: the same endpoint issued through the same model methods from the same call site.
+    """
+
+    def __init__(self, method: str, path: str, chain: Tuple[str, ...], call_site: Optional[str]):
+        self.method = method
+        self.path = path
+        self.chain = chain
+        self.call_site = call_site
+        self.calls: List[ProfiledCall] = []
+
+    @property
+    def count(self) -> int:
+        return len(self.calls)
+
+    @property
+    def total_latency(self) -> float:
+        return sum(call.latency or 0.0 for call in self.calls)
+
+    @property
+    def distinct_urls(self) -> int:
+        return len(set(call.url for call in self.calls))
+
+    @property
+    def paginated(self) -> bool:
+        """
+        :return: True if the calls are the pages of one listing
+        """
+        return self.distinct_urls == self.count and all(call.page is not None and call.page > 1 for call in self.calls[1:])
+
+    def to_dict(self) -> dict:
+        return {
+            'method': self.method,
+            'path': self.path,
+            'chain': list(self.chain),
+            'call_site': self.call_site,
+            'count': self.count,
+            'distinct_urls': self.distinct_urls,
+            'total_latency': self.total_latency,
+        }
+
+
+class Finding:
+    """
+    Likely N+1 pattern (the same endpoint called for one record after the other) or repeated identical call.
+    """
+    __slots__ = ('kind', 'group')
+
+    def __init__(self, kind: str, group: CallGroup):
+        """
+        :param kind: 'n+1' or 'duplicate'
+        :param group: Calls of the pattern
+        """
+        self.kind = kind
+        self.group = group
+
+    def __str__(self) -> str:
+        group = self.group
+        issuer = ' > '.join(group.chain) or 'api_call'
+        if self.kind == 'n+1':
+            text = f'N+1: {group.count} x {group.method} {group.path} ({group.distinct_urls} records)'
+        else:
+            text = f'Duplicate: {group.count} x {group.method} {group.path} ({group.distinct_urls} distinct)'
+        return f'{text} issued by {issuer} at {group.call_site or "unknown call site"}, {group.total_latency:.3f}s'
+
+    def __repr__(self) -> str:
+        return f"Finding({self})"
+
+
+class Profiler(RequestHook):
+    """
+    Records every API call of a helper with the model methods that issued it and the call site in the calling code,
+    see XurrentApiHelper.profile:
+
+        with helper.profile() as profiler:
+            for id in task_ids:
+                Task.get_workflow_of_task(helper, id)
+        print(profiler.report())
+
+    Calls of the same shape are grouped (groups), and groups of calls to the same endpoint from the same call site
+    are reported as likely N+1 patterns (findings). Calls sent by prefetch threads have no call site.
+    """
+
+    def __init__(self, threshold: int = 3):
+        """
+        :param threshold: Number of calls of the same shape from which they are reported as finding (default: 3)
+        """
+        self.threshold = threshold
+        self.calls: List[ProfiledCall] = []
+        self._lock = threading.Lock()
+        self._stacks: Dict[int, Tuple[Tuple[str, ...], Optional[str]]] = {}
+
+    def request_started(self, event: RequestEvent) -> None:
+        stack = _capture(sys._getframe(1))
+        with self._lock:
+            self._stacks[id(event)] = stack
+
+    def request_finished(self, event: RequestEvent) -> None:
+        with self._lock:
+            chain, call_site = self._stacks.pop(id(event), ((), None))
+            self.calls.append(ProfiledCall(event, chain, call_site))
+
+    def groups(self) -> List[CallGroup]:
+        """
+        :return: Calls grouped by endpoint, model methods and call site, the most frequent first
+        """
+        groups: Dict[tuple, CallGroup] = {}
+        with self._lock:
+            calls = list(self.calls)
+        for call in calls:
+            key = (call.method, call.path, call.chain, call.call_site)
+            group = groups.get(key)
+            if group is None:
+                group = groups[key] = CallGroup(*key)
+            group.calls.append(call)
+        return sorted(groups.values(), key=lambda group: group.count, reverse=True)
+
+    def findings(self, threshold: int = None) -> List[Finding]:
+        """
+        :param threshold: Number of calls of the same shape from which they are reported (default: profiler setting)
+        :return: Likely N+1 patterns and repeated identical calls, the most expensive first
+        """
+        threshold = threshold or self.threshold
+        findings = []
+        for group in self.groups():
+            if group.count < threshold or group.paginated:
+                continue
+            findings.append(Finding('n+1' if group.distinct_urls > 1 else 'duplicate', group))
+        findings.sort(key=lambda finding: finding.group.total_latency, reverse=True)
+        return findings
+
+    def call_tree(self) -> dict:
+        """
+        :return: Nested dictionary of the model methods and the endpoints they called, each node holding its number
+                 of calls ('calls'), their latency ('latency') and its children ('children')
+        """
+        tree = {'calls': 0, 'latency': 0.0, 'children': {}}
+        with self._lock:
+            calls = list(self.calls)
+        for call in calls:
+            node = tree
+            for name in call.chain + (call.endpoint,):
+                node['calls'] += 1
+                node['latency'] += call.latency or 0.0
+                node = node['children'].setdefault(name, {'calls': 0, 'latency': 0.0, 'children': {}})
+            node['calls'] += 1
+            node['latency'] += call.latency or 0.0
+        return tree
+
+    def report(self) -> str:
+        """
+        :return: Text report of the call tree and the findings
+        """
+        tree = self.call_tree()
+        lines = [f'{tree["calls"]} API calls, {tree["latency"]:.3f}s']
+
+        def render(children: dict, depth: int):
+            for name, node in sorted(children.items(), key=lambda item: item[1]['latency'], reverse=True):
+                lines.append(f'{"  " * depth}{name}: {node["calls"]} calls, {node["latency"]:.3f}s')
+                render(node['children'], depth + 1)
+
+        render(tree['children'], 1)
+        findings = self.findings()
+        if findings:
+            lines.append('Findings:')
+            lines.extend(f'  {finding}' for finding in findings)
+        return '\n'.join(lines)
+
+    def reset(self) -> None:
+        with self._lock:
+            self.calls.clear()
@@ -0,0 +1,105 @@
+from __future__ import annotations  # Needed for forward references
+import threading
+import time
+
+
+class RateLimiter:
+    """
+    Client-side rate limiter, shared by all threads (and tasks) using the same API helper.
+
+    It combines two limits:
+    - an optional token bucket (rate/burst) to hold a fixed request rate, e.g. a short-term limit;
+    - the request budget reported by the server in the X-RateLimit-Remaining / X-RateLimit-Reset headers.
+      Calls pass freely while the budget is large, once fewer than `pace_below` requests remain the remaining
+      calls are spread evenly until the window resets, and when the budget is used up all callers wait for the reset
+      instead of running into a 429 together.
+
+    Callers take a slot with reserve(), which returns the time to wait before sending. Slots are handed out in order,
+    so concurrent callers are spaced out instead of all waking up at the same moment.
+    """
+
+    def __init__(self, rate: float = None, burst: int = 10, pace_below: int = 100):
+        """
+        :param rate: Maximum number of requests per second, None to only follow the server headers (default: None)
+        :param burst: Number of requests that may be sent at once before the rate applies (default: 10)
+        :param pace_below: Spread the calls evenly over the rest of the server window once fewer requests remain (default: 100)
+        """
+        self.rate = rate
+        self.burst = burst
+        self.pace_below = pace_below
+        self._lock = threading.Lock()
+        self._tokens = float(burst)
+        self._refilled_at = time.monotonic()
+        self._remaining = None  # requests left in the current server window, None if unknown
+        self._reset_at = None  # monotonic time the server window resets
+        self._next_slot = 0.0  # earliest monotonic time of the next paced request
+        self._paused_until = 0.0
+
+    def reserve(self) -> float:
+        """
+        Reserve a slot for one request.
+        :return: Seconds the caller has to wait before sending the request
+        """
+        with self._lock:
+            now = time.monotonic()
+            wait = max(self._paused_until - now, 0.0)
+
+            # Fixed rate token bucket; tokens may go negative to queue up callers
+            if self.rate:
+                self._tokens = min(self._tokens + (now - self._refilled_at) * self.rate, float(self.burst))
+                self._refilled_at = now
+                self._tokens -= 1
+                if self._tokens < 0:
+                    wait = max(wait, -self._tokens / self.rate)
+
+            # Server reported budget
+            if self._remaining is not None:
+                reset_in = self._reset_at - now
+                if reset_in <= 0:
+                    # The window has been reset, wait for the next response to learn the new budget
+                    self._remaining = None
+                else:
+                    self._remaining -= 1
+                    if self._remaining < 0:
+                        wait = max(wait, reset_in)
+                    elif self._remaining < self.pace_below:
+                        slot = max(self._next_slot, now)
+                        self._next_slot = slot + (self._reset_at - slot) / (self._remaining + 1)
+                        wait = max(wait, slot - now)
+            return wait
+
+    def acquire(self) -> float:
+        """
+        Reserve a slot for one request and block the calling thread until it may be sent.
+        :return: Seconds waited
+        """
+        wait = self.reserve()
+        if wait > 0:
+            time.sleep(wait)
+        return wait
+
+    def update(self, headers) -> None:
+        """
+        Update the server budget from the rate limit headers of a response.
+        :param headers: Response headers (X-RateLimit-Remaining and X-RateLimit-Reset, epoch seconds)
+        """
+        remaining = headers.get('X-RateLimit-Remaining')
+        reset = headers.get('X-RateLimit-Reset')
+        if remaining is None or reset is None:
+            return
+        try:
+            remaining = int(remaining)
+            reset_in = float(reset) - time.time()
+        except ValueError:
+            return
+        with self._lock:
+            self._remaining = remaining
+            self._reset_at = time.monotonic() + max(reset_in, 0.0)
+
+    def pause(self, seconds: float) -> None:
+        """
+        Hold back all callers, e.g. after the server answered with a 429 and a Retry-After.
+        :param seconds: Seconds to pause for
+        """
+        with self._lock:
+            self._paused_until = max(self._paused_until, time.monotonic() + seconds)
@@ -0,0 +1,112 @@
+from __future__ import annotations  # Needed for forward references
+from typing import List, Optional, Type
+
+
+class Reference:
+    """
+    Lazy reference to another record, e.g. the member of a request.
+
+    The reference keeps the stub of the record as returned by the API ({'id': ..., 'name': ...}) and only builds
+    the model instance when one of its attributes is first read. expand() retrieves the full record once and
+    memoizes it, so that repeated expansions do not call the API again.
+    A reference passes isinstance checks against its model (isinstance(request.member, Person) is True),
+    and its 'id' is read from the stub without building the instance.
+    """
+    __slots__ = ('_model', '_connection_object', '_data', '_instance', '_expanded')
+
+    def __init__(self, model: Type, connection_object, data: dict):
+        """
+        :param model: Model class of the referenced record, e.g. Person
+        :param connection_object: Connection object to build and retrieve the record with
+        :param data: Stub of the record, with an 'id'
+        """
+        object.__setattr__(self, '_model', model)
+        object.__setattr__(self, '_connection_object', connection_object)
+        object.__setattr__(self, '_data', data)
+        object.__setattr__(self, '_instance', None)
+        object.__setattr__(self, '_expanded', None)
+
+    @property
+    def __class__(self):
+        return self._model
+
+    @property
+    def id(self):
+        return self._data.get('id')
+
+    @property
+    def data(self) -> dict:
+        """
+        :return: Stub of the record as returned by the API
+        """
+        return self._data
+
+    @property
+    def resolved(self) -> bool:
+        """
+        :return: True if the model instance has been built
+        """
+        return self._instance is not None
+
+    def resolve(self):
+        """
+        :return: Model instance of the record, the full record if it has been expanded
+        """
+        if self._expanded is not None:
+            return self._expanded
+        if self._instance is None:
+            object.__setattr__(self, '_instance', self._model.from_data(self._connection_object, self._data))
+        return self._instance
+
+    def expand(self, fields: List[str] = None):
+        """
+        Retrieve the full record from the API. The result is memoized, only the first call reaches the API.
+        :param fields: Fields to retrieve (optional)
+        :return: Model instance of the full record
+        """
+        if self._expanded is None:
+            object.__setattr__(self, '_expanded', self._model.get_by_id(self._connection_object, self.id, fields=fields))
+        return self._expanded
+
+    async def async_expand(self, fields: List[str] = None):
+        """
+        Same as expand, for references created through AsyncXurrentApiHelper.
+        """
+        if self._expanded is None:
+            object.__setattr__(self, '_expanded', await self._model.async_get_by_id(self._connection_object, self.id, fields=fields))
+        return self._expanded
+
+    def to_dict(self) -> dict:
+        if self._expanded is None and self._instance is None:
+            return dict(self._data)
+        return self.resolve().to_dict()
+
+    def __getattr__(self, name):
+        return getattr(self.resolve(), name)
+
+    def __setattr__(self, name, value):
+        setattr(self.resolve(), name, value)
+
+    def __str__(self) -> str:
+        return str(self.resolve())
+
+    def __repr__(self) -> str:
+        return f"Reference({self._model.__name__}, id={self.id})"
+
+
+def reference(model: Type, connection_object, value) -> Optional[object]:
+    """
+    Build the value of a reference attribute from the value passed to a model constructor: a lazy Reference if the
+    connection object has lazy_references enabled, a model instance otherwise.
+    :param model: Model class of the referenced record, e.g. Person
+    :param connection_object: Connection object of the record holding the reference
+    :param value: Stub dictionary, model instance, Reference or None
+    """
+    # Model instances are empty dictionaries, so they are checked before the truth value
+    if isinstance(value, model):
+        return value
+    if not value:
+        return None
+    if getattr(connection_object, 'lazy_references', False):
+        return Reference(model, connection_object, value)
+    return model.from_data(connection_object, value)
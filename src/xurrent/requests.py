@@ -1,10 +1,16 @@
 from __future__ import annotations  # Needed for forward references
-from .core import XurrentApiHelper, JsonSerializableDict
+from .core import XurrentApiHelper, JsonSerializableDict, with_fields
+from .identity import resolve_instance, resolve_instances
+from .references import reference
+from .sync import WatermarkStore, sync_records
+from .async_core import AsyncXurrentApiHelper
 from .people import Person
 from .teams import Team
+from .workflows import Workflow
+from .bulk import BulkResult, run_bulk
 from enum import Enum
 from datetime import datetime
-from typing import Optional, List, Dict, Type, TypeVar
+from typing import Optional, List, Dict, AsyncIterator, Callable, Iterable, Iterator, Tuple, Type, TypeVar
 
 class RequestCategory(str, Enum):
     incident = "incident"  # Incident - Request for Incident Resolution
@@ -77,6 +83,10 @@ class Request(JsonSerializableDict):
     #https://developer.xurrent.com/v1/requests/
     __resourceUrl__ = 'requests'
     __references__ = ['workflow', 'requested_by', 'requested_for', 'created_by', 'member', 'team']
+    __timestamps__ = ('created_at', 'updated_at', 'next_target_at', 'completed_at')
+    __slots__ = ('id', 'source', 'sourceID', 'subject', 'category', 'impact', 'status', 'next_target_at', 'completed_at',
+                 'team', 'member', 'grouped_into', 'service_instance', 'created_at', 'updated_at', 'workflow',
+                 'requested_by', 'requested_for', 'created_by', 'custom_fields', 'urgent', 'desired_completion_at', 'nodeID')
     workflow: Optional[Workflow]
     requested_by: Optional[Person]
     requested_for: Optional[Person]
@@ -122,14 +132,12 @@ class Request(JsonSerializableDict):
         self.service_instance = service_instance
         self.created_at = created_at
         self.updated_at = updated_at
-        from .workflows import Workflow
-        self.workflow = workflow if isinstance(workflow, Workflow) else Workflow.from_data(connection_object, workflow) if workflow else None
-        from .people import Person
-        self.member = member if isinstance(member, Person) else Person.from_data(connection_object, member) if member else None
-        self.requested_by = requested_by if isinstance(requested_by, Person) else Person.from_data(connection_object, requested_by) if requested_by else None
-        self.requested_for = requested_for if isinstance(requested_for, Person) else Person.from_data(connection_object, requested_for) if requested_for else None
-        self.created_by = created_by if isinstance(created_by, Person) else Person.from_data(connection_object, created_by) if created_by else None
-        self.team = team if isinstance(team, Team) else Team.from_data(connection_object, team) if team else None
+        self.workflow = reference(Workflow, connection_object, workflow)
+        self.member = reference(Person, connection_object, member)
+        self.requested_by = reference(Person, connection_object, requested_by)
+        self.requested_for = reference(Person, connection_object, requested_for)
+        self.created_by = reference(Person, connection_object, created_by)
+        self.team = reference(Team, connection_object, team)
 
 
         # Initialize any additional attributes
@@ -158,28 +166,38 @@ class Request(JsonSerializableDict):
             raise TypeError(f"Expected 'data' to be a dictionary, got {type(data).__name__}")
         if 'id' not in data:
             raise ValueError("Data dictionary must contain an 'id' field.")
-        return cls(connection_object, **data)
+        return resolve_instance(cls, connection_object, data)
+
+    @classmethod
+    def from_data_many(cls, connection_object: XurrentApiHelper, data: List[dict]) -> List[T]:
+        """
+        Create the Request objects of a page or list of records, building every referenced record only once.
+        """
+        return resolve_instances(cls, connection_object, data)
 
 
 
     @classmethod
-    def get_by_id(cls, connection_object: XurrentApiHelper, id: int) -> T:
+    def get_by_id(cls, connection_object: XurrentApiHelper, id: int, fields: List[str] = None) -> T:
         """
         Retrieve a request by its ID and return it as an instance of Request.
         :param connection_object: Instance of XurrentApiHelper
         :param id: ID of the request to retrieve
+        :param fields: Fields to retrieve, e.g. ['subject', 'status', 'team'], to download partial records (optional)
         :return: Instance of Request
         """
         uri = f'{connection_object.base_url}/{cls.__resourceUrl__}/{id}'
+        uri = with_fields(uri, fields)
         response = connection_object.api_call(uri, 'GET')
         return cls.from_data(connection_object=connection_object, data=response)
 
     @classmethod
-    def get_requests(cls, connection_object: XurrentApiHelper, predefinedFiler: PredefinedFilter = None,queryfilter: dict = None) -> List[T]:
+    def get_requests(cls, connection_object: XurrentApiHelper, predefinedFiler: PredefinedFilter = None,queryfilter: dict = None, fields: List[str] = None) -> List[T]:
         """
         Retrieve a request by its ID.
         :param connection_object: Instance of XurrentApiHelper
         :param id: ID of the request to retrieve
+        :param fields: Fields to retrieve, e.g. ['subject', 'status', 'team'], to download partial records (optional)
         :return: Request data
         """
         uri = f'{connection_object.base_url}/{cls.__resourceUrl__}'
@@ -187,8 +205,44 @@ class Request(JsonSerializableDict):
             uri += f'/{predefinedFiler}'
         if queryfilter:
             uri += '?' + connection_object.create_filter_string(queryfilter)
+        uri = with_fields(uri, fields)
         response = connection_object.api_call(uri, 'GET')
-        return [cls.from_data(connection_object, item) for item in response]
+        return cls.from_data_many(connection_object, response)
+
+    @classmethod
+    def iter_requests(cls, connection_object: XurrentApiHelper, predefinedFilter: PredefinedFilter = None, queryfilter: dict = None, fields: List[str] = None) -> Iterator[T]:
+        """
+        Iterate over requests page by page, without loading all of them into memory.
+        :param connection_object: Instance of XurrentApiHelper
+        :param predefinedFilter: Predefined filter to apply (optional)
+        :param queryfilter: Dictionary of query parameters to filter by (optional)
+        :param fields: Fields to retrieve, e.g. ['subject', 'status', 'team'], to download partial records (optional)
+        :return: Generator of Request instances
+        """
+        uri = f'{connection_object.base_url}/{cls.__resourceUrl__}'
+        if predefinedFilter:
+            uri += f'/{predefinedFilter}'
+        if queryfilter:
+            uri += '?' + connection_object.create_filter_string(queryfilter)
+        uri = with_fields(uri, fields)
+        for page in connection_object.iter_api_pages(uri, 'GET'):
+            yield from cls.from_data_many(connection_object, page)
+
+    @classmethod
+    def sync(cls, connection_object: XurrentApiHelper, store: WatermarkStore, key: str = None, overlap: float = 300,
+             queryfilter: dict = None, fields: List[str] = None) -> Iterator[T]:
+        """
+        Iterate over the requests updated since the last sync, e.g. to apply the changes of a nightly job.
+        The watermark in the store is only advanced once all requests have been read, see xurrent.sync.sync_records.
+        :param connection_object: Instance of XurrentApiHelper
+        :param store: WatermarkStore keeping the 'updated_at' up to which requests have been seen
+        :param key: Key of the watermark in the store (default: 'requests')
+        :param overlap: Seconds to re-read before the watermark, requests may be yielded again (default: 300)
+        :param queryfilter: Dictionary of query parameters to filter by (optional)
+        :param fields: Fields to retrieve, to download partial records (optional)
+        :return: Generator of Request instances
+        """
+        return sync_records(connection_object, cls, store, key, overlap, queryfilter, fields)
 
     def add_note(self, note: dict) -> dict:
         """
@@ -259,6 +313,21 @@ class Request(JsonSerializableDict):
         request = Request(connection_object, id)
         return request.update(data)
 
+    @classmethod
+    def update_many(cls, connection_object: XurrentApiHelper, updates: Iterable[Tuple[int, dict]], workers: int = 4,
+                    progress: Callable[[int, int, BulkResult], None] = None) -> List[BulkResult]:
+        """
+        Update many requests concurrently, e.g. to close or re-route them in bulk.
+        Failed updates do not stop the others; check the 'ok', 'status_code' and 'error' of every result.
+        :param connection_object: Instance of XurrentApiHelper
+        :param updates: Iterable of (request ID, data) pairs
+        :param workers: Number of concurrent updates, all of them share the rate limiter of the helper (default: 4)
+        :param progress: Callable invoked with (done, total, result) after every update (optional)
+        :return: List of BulkResult in the order of the updates, with the updated Request as 'result'
+        """
+        return run_bulk(connection_object, updates, lambda connection, id, data: cls.update_by_id(connection, id, dict(data)),
+                        workers=workers, progress=progress)
+
     def close(self, note: str = "Request closed over API.", completion_reason: CompletionReason = CompletionReason.solved, member_id: int = None, team_id: int = None):
         """
         Close the current request instance.
@@ -347,7 +416,7 @@ class Request(JsonSerializableDict):
         from .configuration_items import ConfigurationItem 
         uri = f'{connection_object.base_url}/requests/{request_id}/cis'
         response = connection_object.api_call(uri, 'GET')
-        return [ConfigurationItem.from_data(connection_object, ci) for ci in response]
+        return ConfigurationItem.from_data_many(connection_object, response)
 
     @classmethod
     def add_ci_to_request_by_id(cls, connection_object: XurrentApiHelper, request_id: int, ci_id: int) -> bool:
@@ -392,7 +461,7 @@ class Request(JsonSerializableDict):
         from .configuration_items import ConfigurationItem
         uri = f'{self._connection_object.base_url}/requests/{self.id}/cis'
         response = self._connection_object.api_call(uri, 'GET')
-        return [ConfigurationItem.from_data(self._connection_object, ci) for ci in response]
+        return ConfigurationItem.from_data_many(self._connection_object, response)
 
     def add_ci(self, ci_id: int) -> bool:
         """
@@ -424,3 +493,85 @@ class Request(JsonSerializableDict):
         except Exception as e:
             return False
 
+    # the following methods are the asyncio counterparts of the methods above, for use with AsyncXurrentApiHelper
+
+    @classmethod
+    async def async_get_by_id(cls, connection_object: AsyncXurrentApiHelper, id: int, fields: List[str] = None) -> T:
+        """
+        Retrieve a request by its ID and return it as an instance of Request.
+        :param connection_object: Instance of AsyncXurrentApiHelper
+        :param id: ID of the request to retrieve
+        :param fields: Fields to retrieve, e.g. ['subject', 'status', 'team'], to download partial records (optional)
+        :return: Instance of Request
+        """
+        uri = f'{connection_object.base_url}/{cls.__resourceUrl__}/{id}'
+        uri = with_fields(uri, fields)
+        response = await connection_object.api_call(uri, 'GET')
+        return cls.from_data(connection_object=connection_object, data=response)
+
+    @classmethod
+    async def async_get_requests(cls, connection_object: AsyncXurrentApiHelper, predefinedFilter: PredefinedFilter = None, queryfilter: dict = None, fields: List[str] = None) -> List[T]:
+        """
+        Retrieve all requests matching the filters.
+        :param connection_object: Instance of AsyncXurrentApiHelper
+        :param predefinedFilter: Predefined filter to apply (optional)
+        :param queryfilter: Dictionary of query parameters to filter by (optional)
+        :param fields: Fields to retrieve, e.g. ['subject', 'status', 'team'], to download partial records (optional)
+        :return: List of Request instances
+        """
+        uri = f'{connection_object.base_url}/{cls.__resourceUrl__}'
+        if predefinedFilter:
+            uri += f'/{predefinedFilter}'
+        if queryfilter:
+            uri += '?' + connection_object.create_filter_string(queryfilter)
+        uri = with_fields(uri, fields)
+        response = await connection_object.api_call(uri, 'GET')
+        return cls.from_data_many(connection_object, response)
+
+    @classmethod
+    async def async_iter_requests(cls, connection_object: AsyncXurrentApiHelper, predefinedFilter: PredefinedFilter = None, queryfilter: dict = None, fields: List[str] = None) -> AsyncIterator[T]:
+        """
+        Iterate over requests page by page, without loading all of them into memory.
+        :param connection_object: Instance of AsyncXurrentApiHelper
+        :param predefinedFilter: Predefined filter to apply (optional)
+        :param queryfilter: Dictionary of query parameters to filter by (optional)
+        :param fields: Fields to retrieve, e.g. ['subject', 'status', 'team'], to download partial records (optional)
+        :return: Async generator of Request instances
+        """
+        uri = f'{connection_object.base_url}/{cls.__resourceUrl__}'
+        if predefinedFilter:
+            uri += f'/{predefinedFilter}'
+        if queryfilter:
+            uri += '?' + connection_object.create_filter_string(queryfilter)
+        uri = with_fields(uri, fields)
+        async for page in connection_object.iter_api_pages(uri, 'GET'):
+            for item in cls.from_data_many(connection_object, page):
+                yield item
+
+    @classmethod
+    async def async_create(cls, connection_object: AsyncXurrentApiHelper, data: dict) -> T:
+        """
+        Create a new request and return it as an instance of Request.
+        :param connection_object: Instance of AsyncXurrentApiHelper
+        :param data: Dictionary containing request data
+        :return: Instance of Request
+        """
+        uri = f'{connection_object.base_url}/{cls.__resourceUrl__}'
+        response = await connection_object.api_call(uri, 'POST', data)
+        return cls.from_data(connection_object, response)
+
+    async def async_update(self, data: dict) -> T:
+        """
+        Update the current request instance with new data.
+        :param data: Dictionary containing updated data
+        :return: Updated instance of Request
+        """
+        if not self.id:
+            raise ValueError("Request instance must have an ID to update.")
+        if data.get('category') and not isinstance(data.get('category'), RequestCategory):
+            data['category'] = RequestCategory(data.get('category'))
+        if data.get('status') and not isinstance(data.get('status'), RequestStatus):
+            data['status'] = RequestStatus(data.get('status'))
+        uri = f'{self._connection_object.base_url}/{self.__resourceUrl__}/{self.id}'
+        response = await self._connection_object.api_call(uri, 'PATCH', data)
+        return Request.from_data(self._connection_object, response)
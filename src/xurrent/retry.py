@@ -0,0 +1,193 @@
+from __future__ import annotations  # Needed for forward references
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+import random
+import threading
+import time
+import requests
+
+try:
+    import httpx
+except ImportError:  # pragma: no cover - optional dependency
+    httpx = None
+
+
+def parse_retry_after(value) -> float:
+    """
+    Parse the value of a 'Retry-After' header, which is either a number of seconds or an HTTP-date.
+    :param value: Header value (may be None)
+    :return: Seconds to wait (never negative), None if the value is missing or invalid
+    >>> parse_retry_after('120')
+    120.0
+    >>> parse_retry_after('1.5')
+    1.5
+    >>> parse_retry_after('Wed, 21 Oct 2015 07:28:00 GMT')
+    0.0
+    >>> parse_retry_after('soon') is None
+    True
+    """
+    if value is None:
+        return None
+    value = str(value).strip()
+    try:
+        return max(float(value), 0.0)
+    except ValueError:
+        pass
+    try:
+        retry_at = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if retry_at is None:
+        return None
+    if retry_at.tzinfo is None:
+        retry_at = retry_at.replace(tzinfo=timezone.utc)
+    return max((retry_at - datetime.now(timezone.utc)).total_seconds(), 0.0)
+
+
+def _default_exceptions() -> tuple:
+    exceptions = (requests.exceptions.ConnectionError, requests.exceptions.Timeout, requests.exceptions.ChunkedEncodingError)
+    if httpx is not None:
+        exceptions += (httpx.TransportError,)
+    return exceptions
+
+
+class RetryPolicy:
+    """
+    Decides whether and when a failed API call is retried.
+
+    Rate limited calls (429) are always retried, since the server did not process them.
+    Other retryable status codes and transport errors (connection resets, timeouts) are only retried
+    for the HTTP methods in `methods`, which by default excludes the non-idempotent POST.
+    The delay grows exponentially with every attempt (with random jitter), unless the server sent a Retry-After.
+    """
+
+    def __init__(self,
+                 max_attempts: int = 10,
+                 backoff_factor: float = 0.5,
+                 max_backoff: float = 60,
+                 jitter: bool = True,
+                 total_timeout: float = None,
+                 status_codes=(429, 502, 503, 504),
+                 exceptions: tuple = None,
+                 methods=('GET', 'HEAD', 'OPTIONS', 'PUT', 'PATCH', 'DELETE')):
+        """
+        :param max_attempts: Maximum number of attempts per call, including the first one (default: 10)
+        :param backoff_factor: Delay before the first retry in seconds, doubled for every further attempt (default: 0.5)
+        :param max_backoff: Upper bound of the exponential backoff in seconds (default: 60)
+        :param jitter: Randomize the backoff between 0 and its value to spread out retries of concurrent callers (default: True)
+        :param total_timeout: Maximum seconds to spend on a call including all retries, None for no limit (default: None)
+        :param status_codes: HTTP status codes to retry (default: 429, 502, 503, 504)
+        :param exceptions: Exception types to retry (default: connection errors and timeouts)
+        :param methods: HTTP methods for which status codes other than 429 and exceptions are retried (default: all but POST)
+        """
+        self.max_attempts = max_attempts
+        self.backoff_factor = backoff_factor
+        self.max_backoff = max_backoff
+        self.jitter = jitter
+        self.total_timeout = total_timeout
+        self.status_codes = frozenset(status_codes)
+        self.exceptions = exceptions if exceptions is not None else _default_exceptions()
+        self.methods = frozenset(method.upper() for method in methods)
+
+    def backoff(self, attempt: int) -> float:
+        """
+        Exponential backoff delay after a failed attempt.
+        :param attempt: Number of the failed attempt (starting at 1)
+        :return: Seconds to wait
+        >>> RetryPolicy(backoff_factor=1, max_backoff=10, jitter=False).backoff(3)
+        4
+        >>> RetryPolicy(backoff_factor=1, max_backoff=10, jitter=False).backoff(8)
+        10
+        """
+        delay = min(self.backoff_factor * (2 ** (attempt - 1)), self.max_backoff)
+        if self.jitter:
+            delay = random.uniform(0, delay)
+        return delay
+
+    def next_delay(self, method: str, attempt: int, started: float, status_code: int = None, headers=None, exception: Exception = None) -> float:
+        """
+        Decide whether a failed attempt is retried.
+        :param method: HTTP method of the call
+        :param attempt: Number of the failed attempt (starting at 1)
+        :param started: time.monotonic() of the first attempt
+        :param status_code: Status code of the failed response (if a response was received)
+        :param headers: Headers of the failed response (if a response was received)
+        :param exception: Exception raised by the attempt (if no response was received)
+        :return: Seconds to wait before the next attempt, None if the call shall not be retried
+        """
+        if attempt >= self.max_attempts:
+            return None
+        if exception is not None:
+            if not isinstance(exception, self.exceptions) or method.upper() not in self.methods:
+                return None
+        elif status_code not in self.status_codes:
+            return None
+        elif status_code != 429 and method.upper() not in self.methods:
+            return None
+
+        delay = parse_retry_after(headers.get('Retry-After')) if headers is not None else None
+        if delay is None:
+            delay = self.backoff(attempt)
+        if self.total_timeout is not None and time.monotonic() - started + delay > self.total_timeout:
+            return None
+        return delay
+
+
+class RetryStats:
+    """
+    Thread-safe counters of the retries of an API helper, to tune the retry policy.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self.reset()
+
+    def reset(self):
+        """
+        Reset all counters.
+        """
+        with self._lock:
+            self.calls = 0
+            self.retries = 0
+            self.failures = 0
+            self.wait_time = 0.0
+            self.retries_by_reason = {}
+
+    def record_call(self):
+        with self._lock:
+            self.calls += 1
+
+    def record_retry(self, reason, delay: float):
+        """
+        :param reason: Status code or exception name that caused the retry
+        :param delay: Seconds waited before the retry
+        """
+        with self._lock:
+            self.retries += 1
+            self.wait_time += delay
+            self.retries_by_reason[reason] = self.retries_by_reason.get(reason, 0) + 1
+        self._local.retries = getattr(self._local, 'retries', 0) + 1
+
+    def thread_retries(self) -> int:
+        """
+        :return: Number of retries made by the current thread, to attribute retries to the calls of a thread
+        """
+        return getattr(self._local, 'retries', 0)
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+
+    def to_dict(self) -> dict:
+        """
+        :return: Snapshot of all counters
+        """
+        with self._lock:
+            return {
+                'calls': self.calls,
+                'retries': self.retries,
+                'failures': self.failures,
+                'wait_time': self.wait_time,
+                'retries_by_reason': dict(self.retries_by_reason),
+            }
@@ -0,0 +1,208 @@
+from __future__ import annotations  # Needed for forward references
+from datetime import date, datetime, time
+from enum import Enum
+from typing import Callable, Dict, Iterable, Optional, Type
+import io
+import json
+from .timestamps import TimestampField
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional dependency
+    orjson = None
+
+try:
+    import ujson
+except ImportError:  # pragma: no cover - optional dependency
+    ujson = None
+
+
+# Types that are serialized as they are
+_PLAIN_TYPES = frozenset((str, int, float, bool, type(None)))
+
+# Marker of a declared field that is not set
+_UNSET = object()
+
+# Converter per type of value, resolved once for every type that is encountered
+_converters: Dict[type, Optional[Callable]] = {}
+
+# Serializer per model class
+_serializers: Dict[type, 'ModelSerializer'] = {}
+
+
+def to_plain(value):
+    """
+    Convert a value to plain JSON types: models and dictionaries to dict, lists, tuples and sets to list,
+    enumerations to their value and dates, times and datetimes to ISO 8601 strings.
+    >>> to_plain({'at': datetime(2024, 3, 1, 12, 30), 'tags': ('a', 1)})
+    {'at': '2024-03-01T12:30:00', 'tags': ['a', 1]}
+    """
+    value_type = type(value)
+    if value_type in _PLAIN_TYPES:
+        return value
+    try:
+        converter = _converters[value_type]
+    except KeyError:
+        converter = _converters[value_type] = _converter_of(value_type)
+    return converter(value) if converter is not None else value
+
+
+def _convert_list(value) -> list:
+    return [item if type(item) in _PLAIN_TYPES else to_plain(item) for item in value]
+
+
+def _convert_dict(value) -> dict:
+    return {key: item if type(item) in _PLAIN_TYPES else to_plain(item) for key, item in value.items()}
+
+
+def _convert_enum(value):
+    return to_plain(value.value)
+
+
+def _isoformat(value) -> str:
+    return value.isoformat()
+
+
+def _to_dict(value) -> dict:
+    return value.to_dict()
+
+
+def _converter_of(value_type: type) -> Optional[Callable]:
+    """
+    :return: Converter of the values of a type, None if its values are kept as they are
+    """
+    if hasattr(value_type, '_fields') and issubclass(value_type, dict):
+        return serializer_of(value_type).to_dict
+    if issubclass(value_type, Enum):
+        return _convert_enum
+    if issubclass(value_type, (datetime, date, time)):
+        return _isoformat
+    if hasattr(value_type, 'to_dict'):
+        # e.g. lazy references
+        return _to_dict
+    if issubclass(value_type, dict):
+        return _convert_dict
+    if issubclass(value_type, (list, tuple, set, frozenset)):
+        return _convert_list
+    return None
+
+
+class ModelSerializer:
+    """
+    Serializer of the instances of a model class, compiled once per class and cached (see serializer_of).
+    The declared fields are read in declaration order by generated code with direct attribute access,
+    followed by the overflow fields of the instance; private fields (starting with '_') are skipped.
+    """
+    __slots__ = ('model', 'fields', 'to_dict')
+
+    def __init__(self, model: Type):
+        self.model = model
+        self.fields = tuple(name for name in model._fields if not name.startswith('_'))
+        self.to_dict = self.__compile()
+
+    def __compile(self) -> Callable[[object], dict]:
+        lines = ['def to_dict(instance):', '    result = {}']
+        namespace = {'plain_types': _PLAIN_TYPES, 'to_plain': to_plain}
+        for index, name in enumerate(self.fields):
+            field = getattr(self.model, name, None)
+            if isinstance(field, TimestampField):
+                # The stored value is read as it is, without parsing it
+                namespace[f'slot_{index}'] = field.slot
+                read = f'slot_{index}.__get__(instance)'
+            else:
+                read = f'instance.{name}'
+            lines += [
+                '    try:',
+                f'        value = {read}',
+                '    except AttributeError:',
+                '        pass',
+                '    else:',
+                f'        result[{name!r}] = value if type(value) in plain_types else to_plain(value)',
+            ]
+        lines += [
+            "    overflow = getattr(instance, '__dict__', None)",
+            '    if overflow:',
+            '        for name, value in overflow.items():',
+            "            if name[0] != '_':",
+            '                result[name] = value if type(value) in plain_types else to_plain(value)',
+            '    return result',
+        ]
+        exec(compile('\n'.join(lines), f'<serializer of {self.model.__qualname__}>', 'exec'), namespace)
+        return namespace['to_dict']
+
+
+def serializer_of(model: Type) -> ModelSerializer:
+    """
+    :param model: Model class, e.g. Request
+    :return: Cached serializer of the model
+    """
+    try:
+        return _serializers[model]
+    except KeyError:
+        serializer = _serializers[model] = ModelSerializer(model)
+        return serializer
+
+
+def dumps(value) -> str:
+    """
+    Encode a value as JSON, through orjson if it is installed.
+    >>> dumps({'id': 1, 'at': datetime(2024, 3, 1)})
+    '{"id":1,"at":"2024-03-01T00:00:00"}'
+    """
+    if orjson is not None:
+        return orjson.dumps(to_plain(value), default=str).decode()
+    return json.dumps(to_plain(value), default=str, separators=(',', ':'))
+
+
+def _encode_lines(records: Iterable) -> Iterable[bytes]:
+    for record in records:
+        if orjson is not None:
+            yield orjson.dumps(to_plain(record), default=str, option=orjson.OPT_APPEND_NEWLINE)
+        else:
+            yield (json.dumps(to_plain(record), default=str, separators=(',', ':')) + '\n').encode()
+
+
+def to_json_lines(records: Iterable, file=None):
+    """
+    Encode records (model instances or dictionaries) as JSON Lines, one record per line.
+    :param records: Iterable of records, e.g. the result of Request.iter_requests
+    :param file: Text or binary file object to write the lines to, records are then encoded one by one (optional)
+    :return: The JSON Lines as string, or the number of records written to the file
+    >>> print(to_json_lines([{'id': 1}, {'id': 2}]), end='')
+    {"id":1}
+    {"id":2}
+    """
+    if file is None:
+        return b''.join(_encode_lines(records)).decode()
+    text = isinstance(file, io.TextIOBase)
+    count = 0
+    for line in _encode_lines(records):
+        file.write(line.decode() if text else line)
+        count += 1
+    return count
+
+
+def get_json_decoder(decoder='auto') -> Callable[[bytes], object]:
+    """
+    Select the function decoding JSON response bodies. All decoders read the raw bytes of a body directly.
+    :param decoder: 'orjson', 'ujson', 'json' (standard library), 'auto' for the fastest one installed,
+                    or a callable taking the raw bytes (default: auto)
+    :return: Callable decoding raw bytes
+    >>> get_json_decoder('json')(b'{"id": 1}')
+    {'id': 1}
+    """
+    if callable(decoder):
+        return decoder
+    if decoder == 'auto':
+        decoder = 'orjson' if orjson is not None else 'ujson' if ujson is not None else 'json'
+    if decoder == 'orjson':
+        if orjson is None:
+            raise ImportError("The 'orjson' decoder requires the 'orjson' package: pip install xurrent[orjson]")
+        return orjson.loads
+    if decoder == 'ujson':
+        if ujson is None:
+            raise ImportError("The 'ujson' decoder requires the 'ujson' package: pip install ujson")
+        return ujson.loads
+    if decoder == 'json':
+        return json.loads
+    raise ValueError(f"Unknown JSON decoder: {decoder}")
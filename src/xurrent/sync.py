@@ -0,0 +1,201 @@
+from __future__ import annotations  # Needed for forward references
+from datetime import datetime, timedelta, timezone
+from typing import Iterator, List, Optional, Type
+import json
+import os
+import sqlite3
+import tempfile
+import threading
+from .core import with_fields
+
+
+class WatermarkStore:
+    """
+    Persistent storage of sync watermarks, the 'updated_at' up to which the records of a sync have been seen.
+    Subclass and implement get() and set() to keep watermarks elsewhere, e.g. in a database of the application.
+    """
+
+    def get(self, key: str) -> Optional[str]:
+        """
+        :param key: Key of the sync, e.g. 'requests'
+        :return: Stored watermark as ISO 8601 timestamp, None if the sync has not run yet
+        """
+        raise NotImplementedError
+
+    def set(self, key: str, value: str) -> None:
+        """
+        Store a watermark. Must replace the previous value atomically: either completely or not at all.
+        :param key: Key of the sync, e.g. 'requests'
+        :param value: Watermark as ISO 8601 timestamp
+        """
+        raise NotImplementedError
+
+
+class MemoryWatermarkStore(WatermarkStore):
+    """
+    Watermark store that only lives as long as the process, e.g. for tests.
+    """
+
+    def __init__(self):
+        self._watermarks = {}
+
+    def get(self, key: str) -> Optional[str]:
+        return self._watermarks.get(key)
+
+    def set(self, key: str, value: str) -> None:
+        self._watermarks[key] = value
+
+
+class FileWatermarkStore(WatermarkStore):
+    """
+    Watermark store in a JSON file. The file is replaced atomically on every update.
+    """
+
+    def __init__(self, path):
+        """
+        :param path: Path of the JSON file, created on the first update
+        """
+        self.path = path
+        self._lock = threading.Lock()
+
+    def __read(self) -> dict:
+        try:
+            with open(self.path, 'r', encoding='utf-8') as file:
+                return json.load(file)
+        except FileNotFoundError:
+            return {}
+
+    def get(self, key: str) -> Optional[str]:
+        with self._lock:
+            return self.__read().get(key)
+
+    def set(self, key: str, value: str) -> None:
+        with self._lock:
+            watermarks = self.__read()
+            watermarks[key] = value
+            directory = os.path.dirname(os.path.abspath(self.path))
+            descriptor, partial_path = tempfile.mkstemp(dir=directory, prefix='.xurrent-watermarks-')
+            try:
+                with os.fdopen(descriptor, 'w', encoding='utf-8') as file:
+                    json.dump(watermarks, file, indent=2, sort_keys=True)
+                os.replace(partial_path, self.path)
+            except BaseException:
+                os.remove(partial_path)
+                raise
+
+
+class SQLiteWatermarkStore(WatermarkStore):
+    """
+    Watermark store in a table of an SQLite database, which may be shared with other data of the application.
+    """
+
+    def __init__(self, path, table: str = 'xurrent_watermarks'):
+        """
+        :param path: Path of the SQLite database, or an open sqlite3.Connection
+        :param table: Name of the table to keep the watermarks in (default: xurrent_watermarks)
+        """
+        if isinstance(path, sqlite3.Connection):
+            self._connection = path
+        else:
+            self._connection = sqlite3.connect(path, check_same_thread=False)
+        self.table = table
+        self._lock = threading.Lock()
+        with self._lock, self._connection:
+            self._connection.execute(f'CREATE TABLE IF NOT EXISTS {table} (key TEXT PRIMARY KEY, value TEXT NOT NULL)')
+
+    def get(self, key: str) -> Optional[str]:
+        with self._lock:
+            row = self._connection.execute(f'SELECT value FROM {self.table} WHERE key = ?', (key,)).fetchone()
+        return row[0] if row else None
+
+    def set(self, key: str, value: str) -> None:
+        with self._lock, self._connection:
+            self._connection.execute(f'INSERT OR REPLACE INTO {self.table} (key, value) VALUES (?, ?)', (key, value))
+
+    def close(self) -> None:
+        """
+        Close the database connection.
+        """
+        self._connection.close()
+
+
+def to_timestamp(value: datetime) -> str:
+    """
+    Format a datetime as it is used in API filters and watermarks.
+    >>> to_timestamp(datetime(2024, 3, 1, 12, 30, tzinfo=timezone.utc))
+    '2024-03-01T12:30:00Z'
+    >>> to_timestamp(datetime(2024, 3, 1, 13, 30, tzinfo=timezone(timedelta(hours=1))))
+    '2024-03-01T12:30:00Z'
+    """
+    return value.astimezone(timezone.utc).strftime('%Y-%m-%dT%H:%M:%SZ')
+
+
+def from_timestamp(value) -> Optional[datetime]:
+    """
+    Parse the 'updated_at' of a record or a stored watermark.
+    >>> from_timestamp('2024-03-01T12:30:00Z')
+    datetime.datetime(2024, 3, 1, 12, 30, tzinfo=datetime.timezone.utc)
+    >>> from_timestamp(None) is None
+    True
+    """
+    if value is None:
+        return None
+    if isinstance(value, datetime):
+        return value if value.tzinfo else value.replace(tzinfo=timezone.utc)
+    text = str(value).strip()
+    if text.endswith('Z'):
+        text = text[:-1] + '+00:00'
+    parsed = datetime.fromisoformat(text)
+    return parsed if parsed.tzinfo else parsed.replace(tzinfo=timezone.utc)
+
+
+def sync_records(connection_object: XurrentApiHelper, model: Type, store: WatermarkStore, key: str = None,
+                 overlap: float = 300, queryfilter: dict = None, fields: List[str] = None, raw: bool = False) -> Iterator:
+    """
+    Yield the records of a model that changed since the last sync, and advance the watermark once all of them were read.
+
+    Only records with an 'updated_at' after the stored watermark minus `overlap` seconds are requested.
+    The overlap re-reads a window of records, so that records updated while the previous scan was paging, or
+    stamped by a server clock that lags behind, are not missed; records may therefore be yielded more than once
+    across syncs and should be applied idempotently (e.g. as upserts).
+    The new watermark is the latest 'updated_at' seen, but not later than the start of the scan. It is only stored
+    when the generator is exhausted; if the consumer stops early or an error occurs, the next sync starts over.
+    :param connection_object: Instance of XurrentApiHelper
+    :param model: Model class to sync, e.g. Request
+    :param store: WatermarkStore to keep the watermark in
+    :param key: Key of the watermark in the store (default: the resource URL of the model, e.g. 'requests')
+    :param overlap: Seconds to re-read before the watermark (default: 300)
+    :param queryfilter: Additional query parameters to filter by (optional), use a distinct key per filter
+    :param fields: Fields to retrieve (optional), 'updated_at' is always requested
+    :param raw: Yield the records as returned by the API instead of model instances (default: False)
+    :return: Generator of model instances
+    """
+    key = key or model.__resourceUrl__
+    started = datetime.now(timezone.utc)
+    watermark = from_timestamp(store.get(key))
+
+    filters = dict(queryfilter or {})
+    if watermark is not None:
+        filters['updated_at'] = f'>{to_timestamp(watermark - timedelta(seconds=overlap))}'
+    uri = f'{connection_object.base_url}/{model.__resourceUrl__}'
+    if filters:
+        uri += '?' + connection_object.create_filter_string(filters)
+    if fields:
+        fields = [field.strip() for field in fields.split(',')] if isinstance(fields, str) else list(fields)
+        if 'updated_at' not in fields:
+            fields.append('updated_at')
+    uri = with_fields(uri, fields)
+
+    latest = None
+    for page in connection_object.iter_api_pages(uri, 'GET'):
+        for item in page:
+            updated_at = from_timestamp(item.get('updated_at'))
+            if updated_at is not None and (latest is None or updated_at > latest):
+                latest = updated_at
+        yield from page if raw else model.from_data_many(connection_object, page)
+
+    if latest is not None:
+        new_watermark = min(latest, started)
+        if watermark is None or new_watermark > watermark:
+            store.set(key, to_timestamp(new_watermark))
+            connection_object.logger.debug(f'Sync of {key} advanced to {to_timestamp(new_watermark)}')
@@ -1,7 +1,12 @@
-from .core import XurrentApiHelper, JsonSerializableDict
+from .core import XurrentApiHelper, JsonSerializableDict, with_fields
+from .identity import resolve_instance, resolve_instances
+from .references import Reference
+from .sync import WatermarkStore, sync_records
+from .async_core import AsyncXurrentApiHelper
 from .workflows import Workflow
+from .bulk import BulkResult, run_bulk
 from enum import Enum
-from typing import Optional, List, Dict, Type, TypeVar
+from typing import Optional, List, Dict, AsyncIterator, Callable, Iterable, Iterator, Tuple, Type, TypeVar
 
 
 T = TypeVar('T', bound='Task')
@@ -33,12 +38,16 @@ class TaskStatus(str, Enum):
 class Task(JsonSerializableDict):
     #https://developer.xurrent.com/v1/tasks/
     __resourceUrl__ = 'tasks'
+    __timestamps__ = ('created_at', 'updated_at')
+    __slots__ = ('id', 'subject', 'workflow', 'status', 'created_at', 'updated_at', 'nodeID', '_workflow_reference')
 
     def __init__(self, connection_object: XurrentApiHelper, id, subject: str = None, workflow: dict = None,description: str = None, **kwargs):
         self._connection_object = connection_object
         self.id = id
         self.subject = subject
-        self.workflow = workflow
+        # The workflow is kept as returned by the API, unless references are lazy
+        lazy = workflow and not isinstance(workflow, Workflow) and getattr(connection_object, 'lazy_references', False)
+        self.workflow = Reference(Workflow, connection_object, workflow) if lazy else workflow
         for key, value in kwargs.items():
             setattr(self, key, value)
 
@@ -60,36 +69,78 @@ class Task(JsonSerializableDict):
             raise TypeError(f"Expected 'data' to be a dictionary, got {type(data).__name__}")
         if 'id' not in data:
             raise ValueError("Data dictionary must contain an 'id' field.")
-        return cls(connection_object, **data)
+        return resolve_instance(cls, connection_object, data)
 
     @classmethod
-    def get_by_id(cls, connection_object: XurrentApiHelper, id) -> T:
+    def from_data_many(cls, connection_object: XurrentApiHelper, data: List[dict]) -> List[T]:
+        """
+        Create the Task objects of a page or list of records, building every referenced record only once.
+        """
+        return resolve_instances(cls, connection_object, data)
+
+    @classmethod
+    def get_by_id(cls, connection_object: XurrentApiHelper, id, fields: List[str] = None) -> T:
         uri = f'{connection_object.base_url}/{Task.__resourceUrl__}/{id}'
+        uri = with_fields(uri, fields)
         return cls.from_data(connection_object, connection_object.api_call(uri, 'GET'))
 
     @classmethod
-    def get_tasks(cls, connection_object: XurrentApiHelper, predefinedFilter: TaskPredefinedFilter = None, queryfilter: dict = None) -> List[T]:
+    def get_tasks(cls, connection_object: XurrentApiHelper, predefinedFilter: TaskPredefinedFilter = None, queryfilter: dict = None, fields: List[str] = None) -> List[T]:
+        uri = f'{connection_object.base_url}/{cls.__resourceUrl__}'
+        if predefinedFilter:
+            uri = f'{uri}/{predefinedFilter}'
+        if queryfilter:
+            uri += '?' + connection_object.create_filter_string(queryfilter)
+        uri = with_fields(uri, fields)
+        return cls.from_data_many(connection_object, connection_object.api_call(uri, 'GET'))
+
+    @classmethod
+    def iter_tasks(cls, connection_object: XurrentApiHelper, predefinedFilter: TaskPredefinedFilter = None, queryfilter: dict = None, fields: List[str] = None) -> Iterator[T]:
+        """
+        Iterate over tasks page by page, without loading all of them into memory.
+        """
         uri = f'{connection_object.base_url}/{cls.__resourceUrl__}'
         if predefinedFilter:
             uri = f'{uri}/{predefinedFilter}'
         if queryfilter:
-            uri += '?' + self._connection_object.create_filter_string(queryfilter)
-        return connection_object.api_call(uri, 'GET')
+            uri += '?' + connection_object.create_filter_string(queryfilter)
+        uri = with_fields(uri, fields)
+        for page in connection_object.iter_api_pages(uri, 'GET'):
+            yield from cls.from_data_many(connection_object, page)
+
+    @classmethod
+    def sync(cls, connection_object: XurrentApiHelper, store: WatermarkStore, key: str = None, overlap: float = 300,
+             queryfilter: dict = None, fields: List[str] = None) -> Iterator[T]:
+        """
+        Iterate over the tasks updated since the last sync, advancing the watermark in the store once all have been read.
+        See xurrent.sync.sync_records for the overlap window and the watermark.
+        """
+        return sync_records(connection_object, cls, store, key, overlap, queryfilter, fields)
 
     @staticmethod
     def get_workflow_of_task(connection_object: XurrentApiHelper, id, expand: bool = False) -> Workflow:
-        task = Task.get_by_id(connection_object, id)
-        if expand:
-            return Workflow.get_by_id(connection_object, task.workflow.id)
-        return Workflow.from_data(connection_object, task.workflow)
+        return Task.get_by_id(connection_object, id).get_workflow(expand)
 
     def get_workflow(self, expand: bool = False) -> Workflow:
-        if task.workflow and not expand:
-            return Workflow.from_data(self._connection_object, self.workflow)
-        elif task.workflow and expand:
-            return Workflow.get_by_id(self._connection_object, self.workflow.id)
-        elif not task.workflow:
-            return Task.get_workflow_of_task(self._connection_object, self.id, expand)
+        """
+        :param expand: Retrieve the full workflow instead of the reference held by the task (default: False).
+                       The full workflow is retrieved once per task, further calls return the same instance.
+        :return: Workflow of the task, None if the task is not part of a workflow
+        """
+        if not self.workflow:
+            self.workflow = Task.get_by_id(self._connection_object, self.id, fields=['workflow']).workflow
+            if not self.workflow:
+                return None
+        workflow = self.workflow
+        if isinstance(workflow, Workflow) and not isinstance(workflow, Reference):
+            return Workflow.get_by_id(self._connection_object, workflow.id) if expand else workflow
+        if not isinstance(workflow, Reference):
+            cached = getattr(self, '_workflow_reference', None)
+            if cached is None or cached.data is not workflow:
+                cached = Reference(Workflow, self._connection_object, workflow)
+                self._workflow_reference = cached
+            workflow = cached
+        return workflow.expand() if expand else workflow.resolve()
 
 
     @staticmethod
@@ -97,6 +148,19 @@ class Task(JsonSerializableDict):
         task = Task(connection_object=connection_object, id=id)
         return task.update(data)
 
+    @classmethod
+    def update_many(cls, connection_object: XurrentApiHelper, updates: Iterable[Tuple[int, dict]], workers: int = 4,
+                    progress: Callable[[int, int, BulkResult], None] = None) -> List[BulkResult]:
+        """
+        Update many tasks concurrently. Failed updates do not stop the others.
+
+        :param updates: Iterable of (task ID, data) pairs
+        :param workers: Number of concurrent updates, all of them share the rate limiter of the helper (default: 4)
+        :param progress: Callable invoked with (done, total, result) after every update (optional)
+        :return: List of BulkResult in the order of the updates, with the updated Task as 'result'
+        """
+        return run_bulk(connection_object, updates, cls.update_by_id, workers=workers, progress=progress)
+
     def update(self, data) -> T:
         uri = f'{self._connection_object.base_url}/{Task.__resourceUrl__}/{self.id}'
         response = self._connection_object.api_call(uri, 'PATCH', data)
@@ -172,3 +236,54 @@ class Task(JsonSerializableDict):
         uri = f'{connection_object.base_url}/workflows/{workflowID}/{cls.__resourceUrl__}'
         response = connection_object.api_call(uri, 'POST', data)
         return cls.from_data(connection_object, response)
+
+    # the following methods are the asyncio counterparts of the methods above, for use with AsyncXurrentApiHelper
+
+    @classmethod
+    async def async_get_by_id(cls, connection_object: AsyncXurrentApiHelper, id, fields: List[str] = None) -> T:
+        uri = f'{connection_object.base_url}/{Task.__resourceUrl__}/{id}'
+        uri = with_fields(uri, fields)
+        return cls.from_data(connection_object, await connection_object.api_call(uri, 'GET'))
+
+    @classmethod
+    async def async_get_tasks(cls, connection_object: AsyncXurrentApiHelper, predefinedFilter: TaskPredefinedFilter = None, queryfilter: dict = None, fields: List[str] = None) -> List[T]:
+        uri = f'{connection_object.base_url}/{cls.__resourceUrl__}'
+        if predefinedFilter:
+            uri = f'{uri}/{predefinedFilter}'
+        if queryfilter:
+            uri += '?' + connection_object.create_filter_string(queryfilter)
+        uri = with_fields(uri, fields)
+        response = await connection_object.api_call(uri, 'GET')
+        return cls.from_data_many(connection_object, response)
+
+    @classmethod
+    async def async_iter_tasks(cls, connection_object: AsyncXurrentApiHelper, predefinedFilter: TaskPredefinedFilter = None, queryfilter: dict = None, fields: List[str] = None) -> AsyncIterator[T]:
+        """
+        Iterate over tasks page by page, without loading all of them into memory.
+        """
+        uri = f'{connection_object.base_url}/{cls.__resourceUrl__}'
+        if predefinedFilter:
+            uri = f'{uri}/{predefinedFilter}'
+        if queryfilter:
+            uri += '?' + connection_object.create_filter_string(queryfilter)
+        uri = with_fields(uri, fields)
+        async for page in connection_object.iter_api_pages(uri, 'GET'):
+            for task in cls.from_data_many(connection_object, page):
+                yield task
+
+    async def async_update(self, data) -> T:
+        uri = f'{self._connection_object.base_url}/{Task.__resourceUrl__}/{self.id}'
+        response = await self._connection_object.api_call(uri, 'PATCH', data)
+        return Task.from_data(self._connection_object, response)
+
+    @classmethod
+    async def async_create(cls, connection_object: AsyncXurrentApiHelper, workflowID: int, data: dict) -> T:
+        """
+        Create a new task.
+
+        :param workflowID: ID of the workflow to create the task in
+        :param data: Data to create the task with
+        """
+        uri = f'{connection_object.base_url}/workflows/{workflowID}/{cls.__resourceUrl__}'
+        response = await connection_object.api_call(uri, 'POST', data)
+        return cls.from_data(connection_object, response)
@@ -1,5 +1,8 @@
-from .core import XurrentApiHelper, JsonSerializableDict
-from typing import Optional, List, Dict, Type, TypeVar
+from .core import XurrentApiHelper, JsonSerializableDict, with_fields
+from .identity import resolve_instance, resolve_instances
+from .sync import WatermarkStore, sync_records
+from .async_core import AsyncXurrentApiHelper
+from typing import Optional, List, Dict, AsyncIterator, Iterator, Type, TypeVar
 from .people import Person
 
 from enum import Enum
@@ -13,6 +16,8 @@ T = TypeVar('T', bound='Team')
 class Team(JsonSerializableDict):
     #https://developer.xurrent.com/v1/teams/
     __resourceUrl__ = 'teams'
+    __timestamps__ = ('created_at', 'updated_at')
+    __slots__ = ('id', 'name', 'description', 'account', 'disabled', 'created_at', 'updated_at', 'nodeID')
 
     def __init__(self, connection_object: XurrentApiHelper, id, name: str = None, description: str = None, **kwargs):
         self._connection_object = connection_object
@@ -40,22 +45,54 @@ class Team(JsonSerializableDict):
             raise TypeError(f"Expected 'data' to be a dictionary, got {type(data).__name__}")
         if 'id' not in data:
             raise ValueError("Data dictionary must contain an 'id' field.")
-        return cls(connection_object, **data)
+        return resolve_instance(cls, connection_object, data)
 
     @classmethod
-    def get_by_id(cls, connection_object: XurrentApiHelper, id) -> T:
+    def from_data_many(cls, connection_object: XurrentApiHelper, data: List[dict]) -> List[T]:
+        """
+        Create the Team objects of a page or list of records, building every referenced record only once.
+        """
+        return resolve_instances(cls, connection_object, data)
+
+    @classmethod
+    def get_by_id(cls, connection_object: XurrentApiHelper, id, fields: List[str] = None) -> T:
         uri = f'{connection_object.base_url}/{cls.__resourceUrl__}/{id}'
+        uri = with_fields(uri, fields)
         return cls.from_data(connection_object, connection_object.api_call(uri, 'GET'))
 
     @classmethod
-    def get_teams(cls, connection_object: XurrentApiHelper, predefinedFilter: TeamPredefinedFilter = None, queryfilter: dict = None) -> List[T]:
+    def get_teams(cls, connection_object: XurrentApiHelper, predefinedFilter: TeamPredefinedFilter = None, queryfilter: dict = None, fields: List[str] = None) -> List[T]:
         uri = f'{connection_object.base_url}/{cls.__resourceUrl__}'
         if predefinedFilter:
             uri = f'{uri}/{predefinedFilter}'
         if queryfilter:
             uri += '?' + connection_object.create_filter_string(queryfilter)
+        uri = with_fields(uri, fields)
         response = connection_object.api_call(uri, 'GET')
-        return [cls.from_data(connection_object, team) for team in response]
+        return cls.from_data_many(connection_object, response)
+
+    @classmethod
+    def iter_teams(cls, connection_object: XurrentApiHelper, predefinedFilter: TeamPredefinedFilter = None, queryfilter: dict = None, fields: List[str] = None) -> Iterator[T]:
+        """
+        Iterate over teams page by page, without loading all of them into memory.
+        """
+        uri = f'{connection_object.base_url}/{cls.__resourceUrl__}'
+        if predefinedFilter:
+            uri = f'{uri}/{predefinedFilter}'
+        if queryfilter:
+            uri += '?' + connection_object.create_filter_string(queryfilter)
+        uri = with_fields(uri, fields)
+        for page in connection_object.iter_api_pages(uri, 'GET'):
+            yield from cls.from_data_many(connection_object, page)
+
+    @classmethod
+    def sync(cls, connection_object: XurrentApiHelper, store: WatermarkStore, key: str = None, overlap: float = 300,
+             queryfilter: dict = None, fields: List[str] = None) -> Iterator[T]:
+        """
+        Iterate over the teams updated since the last sync, advancing the watermark in the store once all have been read.
+        See xurrent.sync.sync_records for the overlap window and the watermark.
+        """
+        return sync_records(connection_object, cls, store, key, overlap, queryfilter, fields)
     
     def get_members(self) -> List[Person]:
         """
@@ -63,7 +100,7 @@ class Team(JsonSerializableDict):
         """
         uri = f'{self._connection_object.base_url}/{self.__resourceUrl__}/{self.id}/members'
         response = self._connection_object.api_call(uri, 'GET')
-        return [Person.from_data(self._connection_object, person) for person in response]
+        return Person.from_data_many(self._connection_object, response)
 
     def update(self, data) -> T:
         uri = f'{self._connection_object.base_url}/{self.__resourceUrl__}/{self.id}'
@@ -113,3 +150,61 @@ class Team(JsonSerializableDict):
         """
         uri = f'{self._connection_object.base_url}/{self.__resourceUrl__}/{self.id}/trash'
         return self._connection_object.api_call(uri, 'POST')
+
+    # the following methods are the asyncio counterparts of the methods above, for use with AsyncXurrentApiHelper
+
+    @classmethod
+    async def async_get_by_id(cls, connection_object: AsyncXurrentApiHelper, id, fields: List[str] = None) -> T:
+        uri = f'{connection_object.base_url}/{cls.__resourceUrl__}/{id}'
+        uri = with_fields(uri, fields)
+        return cls.from_data(connection_object, await connection_object.api_call(uri, 'GET'))
+
+    @classmethod
+    async def async_get_teams(cls, connection_object: AsyncXurrentApiHelper, predefinedFilter: TeamPredefinedFilter = None, queryfilter: dict = None, fields: List[str] = None) -> List[T]:
+        uri = f'{connection_object.base_url}/{cls.__resourceUrl__}'
+        if predefinedFilter:
+            uri = f'{uri}/{predefinedFilter}'
+        if queryfilter:
+            uri += '?' + connection_object.create_filter_string(queryfilter)
+        uri = with_fields(uri, fields)
+        response = await connection_object.api_call(uri, 'GET')
+        return cls.from_data_many(connection_object, response)
+
+    @classmethod
+    async def async_iter_teams(cls, connection_object: AsyncXurrentApiHelper, predefinedFilter: TeamPredefinedFilter = None, queryfilter: dict = None, fields: List[str] = None) -> AsyncIterator[T]:
+        """
+        Iterate over teams page by page, without loading all of them into memory.
+        """
+        uri = f'{connection_object.base_url}/{cls.__resourceUrl__}'
+        if predefinedFilter:
+            uri = f'{uri}/{predefinedFilter}'
+        if queryfilter:
+            uri += '?' + connection_object.create_filter_string(queryfilter)
+        uri = with_fields(uri, fields)
+        async for page in connection_object.iter_api_pages(uri, 'GET'):
+            for team in cls.from_data_many(connection_object, page):
+                yield team
+
+    async def async_get_members(self) -> List[Person]:
+        """
+        Retrieve the members of the team.
+        """
+        uri = f'{self._connection_object.base_url}/{self.__resourceUrl__}/{self.id}/members'
+        response = await self._connection_object.api_call(uri, 'GET')
+        return Person.from_data_many(self._connection_object, response)
+
+    async def async_update(self, data) -> T:
+        uri = f'{self._connection_object.base_url}/{self.__resourceUrl__}/{self.id}'
+        response = await self._connection_object.api_call(uri, 'PATCH', data)
+        return Team.from_data(self._connection_object, response)
+
+    @classmethod
+    async def async_create(cls, connection_object: AsyncXurrentApiHelper, data: dict) -> T:
+        """
+        Create a new team object.
+
+        :param connection_object: Asynchronous Xurrent Connection object
+        :param data: Data dictionary (containing the data for the new team)
+        """
+        uri = f'{connection_object.base_url}/{cls.__resourceUrl__}'
+        return cls.from_data(connection_object, await connection_object.api_call(uri, 'POST', data))
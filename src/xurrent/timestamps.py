@@ -0,0 +1,131 @@
+from __future__ import annotations  # Needed for forward references
+from datetime import datetime
+from functools import lru_cache
+from typing import Iterable, List
+
+# Marker of a timestamp field that is not set
+_UNSET = object()
+
+
+@lru_cache(maxsize=65536)
+def parse_timestamp(value: str):
+    """
+    Parse an ISO 8601 timestamp of the API or of an export. Results are cached, as the same timestamps tend
+    to be parsed many times.
+    :param value: ISO 8601 timestamp
+    :return: datetime, or the value itself if it is not a timestamp
+    >>> parse_timestamp('2024-03-01T12:30:00Z')
+    datetime.datetime(2024, 3, 1, 12, 30, tzinfo=datetime.timezone.utc)
+    >>> parse_timestamp('2024-03-01')
+    datetime.datetime(2024, 3, 1, 0, 0)
+    >>> parse_timestamp('soon')
+    'soon'
+    """
+    text = value.strip()
+    if text.endswith('Z'):
+        text = text[:-1] + '+00:00'
+    try:
+        return datetime.fromisoformat(text)
+    except ValueError:
+        return value
+
+
+def parse_timestamps(values: Iterable) -> List:
+    """
+    Parse a whole list of timestamps, parsing every distinct value only once.
+    Values that are not strings (e.g. None or datetimes) are returned as they are.
+    :param values: Iterable of ISO 8601 timestamps
+    :return: List of datetimes, in the order of the values
+    >>> parse_timestamps(['2024-03-01T12:30:00Z', None, '2024-03-01T12:30:00Z'])[1:]
+    [None, datetime.datetime(2024, 3, 1, 12, 30, tzinfo=datetime.timezone.utc)]
+    """
+    values = list(values)
+    parsed = {value: parse_timestamp(value) for value in set(value for value in values if isinstance(value, str))}
+    return [parsed[value] if isinstance(value, str) else value for value in values]
+
+
+def parse_record_timestamps(records: Iterable, fields: Iterable[str] = None) -> List:
+    """
+    Parse the timestamp fields of a whole list of model instances at once, instead of on their first access.
+    :param records: Iterable of model instances, e.g. the result of Request.get_requests
+    :param fields: Names of the timestamp fields to parse (default: all timestamp fields of the models)
+    :return: List of the records
+    """
+    records = list(records)
+    by_field = {}
+    for record in records:
+        for name in fields or getattr(type(record), '__timestamps__', ()):
+            field = getattr(type(record), name, None)
+            if isinstance(field, TimestampField):
+                by_field.setdefault(field, []).append(record)
+    for field, instances in by_field.items():
+        values = parse_timestamps(field.raw(instance) for instance in instances)
+        for instance, value in zip(instances, values):
+            if value is not _UNSET:
+                field.slot.__set__(instance, value)
+    return records
+
+
+class TimestampField:
+    """
+    Descriptor of a timestamp field of a model, wrapping the slot of the field.
+    The value is stored as received (usually an ISO 8601 string), parsed into a datetime on its first access
+    and the datetime is kept in the slot, so that it is only parsed once. Values that cannot be parsed are
+    returned as they are.
+    """
+    __slots__ = ('name', 'slot')
+
+    def __init__(self, name: str, slot):
+        """
+        :param name: Name of the field
+        :param slot: Member descriptor of the slot holding the value
+        """
+        self.name = name
+        self.slot = slot
+
+    def __get__(self, instance, owner=None):
+        if instance is None:
+            return self
+        value = self.slot.__get__(instance, owner)
+        if isinstance(value, str):
+            value = parse_timestamp(value)
+            self.slot.__set__(instance, value)
+        return value
+
+    def __set__(self, instance, value):
+        self.slot.__set__(instance, value)
+
+    def __delete__(self, instance):
+        self.slot.__delete__(instance)
+
+    def raw(self, instance):
+        """
+        :return: Value of the field as stored, without parsing it (_UNSET if the field is not set)
+        """
+        try:
+            return self.slot.__get__(instance, type(instance))
+        except AttributeError:
+            return _UNSET
+
+
+def raw_attribute(instance, name: str, default=None):
+    """
+    Read an attribute of a model instance like getattr, but without parsing timestamp fields.
+    """
+    field = getattr(type(instance), name, None)
+    if isinstance(field, TimestampField):
+        value = field.raw(instance)
+        return default if value is _UNSET else value
+    return getattr(instance, name, default)
+
+
+def install_timestamp_fields(model: type) -> None:
+    """
+    Replace the slots of the timestamp fields listed in the __timestamps__ of a model class by TimestampField
+    descriptors.
+    """
+    for name in model.__dict__.get('__timestamps__', ()):
+        slot = model.__dict__.get(name)
+        if slot is None or isinstance(slot, TimestampField):
+            continue
+        setattr(model, name, TimestampField(name, slot))
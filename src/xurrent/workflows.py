@@ -1,7 +1,12 @@
 from __future__ import annotations  # Needed for forward references
 from datetime import datetime
-from typing import Optional, List, Dict
-from .core import XurrentApiHelper, JsonSerializableDict
+from typing import Optional, List, Dict, AsyncIterator, Iterator
+from .core import XurrentApiHelper, JsonSerializableDict, with_fields
+from .identity import resolve_instance, resolve_instances
+from .references import reference
+from .sync import WatermarkStore, sync_records
+from .async_core import AsyncXurrentApiHelper
+from .people import Person
 from enum import Enum
 
 class WorkflowCompletionReason(str, Enum):
@@ -51,6 +56,9 @@ class WorkflowPredefinedFilter(str, Enum):
 class Workflow(JsonSerializableDict):
     # https://developer.xurrent.com/v1/workflows/
     __resourceUrl__ = 'workflows'
+    __references__ = ['manager']
+    __timestamps__ = ('created_at', 'updated_at')
+    __slots__ = ('id', 'subject', 'status', 'manager', 'category', 'created_at', 'updated_at', 'nodeID')
 
     def __init__(self,
                  connection_object: XurrentApiHelper,
@@ -65,8 +73,7 @@ class Workflow(JsonSerializableDict):
         self.subject = subject
         self.status = WorkflowStatus(status) if status else None
         self.category = WorkflowCategory(category) if category else None
-        from .people import Person
-        self.manager =  manager if isinstance(manager, Person) else Person.from_data(connection_object, manager) if manager else None
+        self.manager = reference(Person, connection_object, manager)
         for key, value in kwargs.items():
             setattr(self, key, value)
 
@@ -84,18 +91,26 @@ class Workflow(JsonSerializableDict):
             raise TypeError(f"Expected 'data' to be a dictionary, got {type(data).__name__}")
         if 'id' not in data:
             raise ValueError("Data dictionary must contain an 'id' field.")
-        return cls(connection_object, **data)
+        return resolve_instance(cls, connection_object, data)
 
     @classmethod
-    def get_by_id(cls, connection_object: XurrentApiHelper, id: int) -> dict:
+    def from_data_many(cls, connection_object: XurrentApiHelper, data: List[dict]) -> List[Workflow]:
+        """
+        Create the Workflow objects of a page or list of records, building every referenced record only once.
+        """
+        return resolve_instances(cls, connection_object, data)
+
+    @classmethod
+    def get_by_id(cls, connection_object: XurrentApiHelper, id: int, fields: List[str] = None) -> dict:
         """
         Retrieve a workflow by its ID.
         """
         uri = f'{connection_object.base_url}/{cls.__resourceUrl__}/{id}'
+        uri = with_fields(uri, fields)
         return cls.from_data(connection_object, connection_object.api_call(uri, 'GET'))
 
     @classmethod
-    def get_workflows(cls, connection_object: XurrentApiHelper, predefinedFilter: WorkflowPredefinedFilter = None, queryfilter: dict = None) -> List[Workflow]:
+    def get_workflows(cls, connection_object: XurrentApiHelper, predefinedFilter: WorkflowPredefinedFilter = None, queryfilter: dict = None, fields: List[str] = None) -> List[Workflow]:
         """
         Retrieve all workflows.
         """
@@ -104,8 +119,32 @@ class Workflow(JsonSerializableDict):
             uri = f'{uri}/{predefinedFilter}'
         if queryfilter:
             uri += '?' + connection_object.create_filter_string(queryfilter)
+        uri = with_fields(uri, fields)
         response = connection_object.api_call(uri, 'GET')
-        return [cls.from_data(connection_object, workflow) for workflow in response]
+        return cls.from_data_many(connection_object, response)
+
+    @classmethod
+    def iter_workflows(cls, connection_object: XurrentApiHelper, predefinedFilter: WorkflowPredefinedFilter = None, queryfilter: dict = None, fields: List[str] = None) -> Iterator[Workflow]:
+        """
+        Iterate over workflows page by page, without loading all of them into memory.
+        """
+        uri = f'{connection_object.base_url}/{cls.__resourceUrl__}'
+        if predefinedFilter:
+            uri = f'{uri}/{predefinedFilter}'
+        if queryfilter:
+            uri += '?' + connection_object.create_filter_string(queryfilter)
+        uri = with_fields(uri, fields)
+        for page in connection_object.iter_api_pages(uri, 'GET'):
+            yield from cls.from_data_many(connection_object, page)
+
+    @classmethod
+    def sync(cls, connection_object: XurrentApiHelper, store: WatermarkStore, key: str = None, overlap: float = 300,
+             queryfilter: dict = None, fields: List[str] = None) -> Iterator[Workflow]:
+        """
+        Iterate over the workflows updated since the last sync, advancing the watermark in the store once all have been read.
+        See xurrent.sync.sync_records for the overlap window and the watermark.
+        """
+        return sync_records(connection_object, cls, store, key, overlap, queryfilter, fields)
 
     @classmethod
     def get_workflow_tasks_by_workflow_id(cls, connection_object: XurrentApiHelper, id: int, queryfilter: dict = None) -> List[Task]:
@@ -124,7 +163,7 @@ class Workflow(JsonSerializableDict):
             uri += '?' + self._connection_object.create_filter_string(queryfilter)
         response = self._connection_object.api_call(uri, 'GET')
         from .tasks import Task
-        return [Task.from_data(self._connection_object, task) for task in response]
+        return Task.from_data_many(self._connection_object, response)
 
     @classmethod
     def get_workflow_task_by_template_id(cls, connection_object: XurrentApiHelper, workflowID: int, templateID: int) -> List[Task]:
@@ -224,3 +263,74 @@ class Workflow(JsonSerializableDict):
         response = self._connection_object.api_call(uri, 'POST')
         return Workflow.from_data(self._connection_object,response)
 
+    # the following methods are the asyncio counterparts of the methods above, for use with AsyncXurrentApiHelper
+
+    @classmethod
+    async def async_get_by_id(cls, connection_object: AsyncXurrentApiHelper, id: int, fields: List[str] = None) -> Workflow:
+        """
+        Retrieve a workflow by its ID.
+        """
+        uri = f'{connection_object.base_url}/{cls.__resourceUrl__}/{id}'
+        uri = with_fields(uri, fields)
+        return cls.from_data(connection_object, await connection_object.api_call(uri, 'GET'))
+
+    @classmethod
+    async def async_get_workflows(cls, connection_object: AsyncXurrentApiHelper, predefinedFilter: WorkflowPredefinedFilter = None, queryfilter: dict = None, fields: List[str] = None) -> List[Workflow]:
+        """
+        Retrieve all workflows.
+        """
+        uri = f'{connection_object.base_url}/{cls.__resourceUrl__}'
+        if predefinedFilter:
+            uri = f'{uri}/{predefinedFilter}'
+        if queryfilter:
+            uri += '?' + connection_object.create_filter_string(queryfilter)
+        uri = with_fields(uri, fields)
+        response = await connection_object.api_call(uri, 'GET')
+        return cls.from_data_many(connection_object, response)
+
+    @classmethod
+    async def async_iter_workflows(cls, connection_object: AsyncXurrentApiHelper, predefinedFilter: WorkflowPredefinedFilter = None, queryfilter: dict = None, fields: List[str] = None) -> AsyncIterator[Workflow]:
+        """
+        Iterate over workflows page by page, without loading all of them into memory.
+        """
+        uri = f'{connection_object.base_url}/{cls.__resourceUrl__}'
+        if predefinedFilter:
+            uri = f'{uri}/{predefinedFilter}'
+        if queryfilter:
+            uri += '?' + connection_object.create_filter_string(queryfilter)
+        uri = with_fields(uri, fields)
+        async for page in connection_object.iter_api_pages(uri, 'GET'):
+            for workflow in cls.from_data_many(connection_object, page):
+                yield workflow
+
+    async def async_get_tasks(self, queryfilter: dict = None) -> List[Task]:
+        """
+        Retrieve all tasks associated with the current workflow instance.
+        """
+        uri = f'{self._connection_object.base_url}/{self.__resourceUrl__}/{self.id}/tasks'
+        if queryfilter:
+            uri += '?' + self._connection_object.create_filter_string(queryfilter)
+        response = await self._connection_object.api_call(uri, 'GET')
+        from .tasks import Task
+        return Task.from_data_many(self._connection_object, response)
+
+    async def async_update(self, data: dict) -> Workflow:
+        """
+        Update the current workflow instance with new data.
+        """
+        if not self.id:
+            raise ValueError("Workflow instance must have an ID to update.")
+        uri = f'{self._connection_object.base_url}/{self.__resourceUrl__}/{self.id}'
+        if not WorkflowStatus.is_valid_workflow_status(data.get('status')):
+            raise ValueError(f"Invalid status: {data.get('status')}")
+        response = await self._connection_object.api_call(uri, 'PATCH', data)
+        return Workflow.from_data(self._connection_object, response)
+
+    @classmethod
+    async def async_create(cls, connection_object: AsyncXurrentApiHelper, data: dict) -> Workflow:
+        """
+        Create a new workflow.
+        """
+        uri = f'{connection_object.base_url}/{cls.__resourceUrl__}'
+        response = await connection_object.api_call(uri, 'POST', data)
+        return cls.from_data(connection_object, response)
@@ -0,0 +1,27 @@
+import importlib.util
+import os
+import sys
+
+import pytest
+
+# Add the `../src` directory to sys.path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "../../src")))
+
+# The benchmarks need pytest-benchmark, they are skipped without it (e.g. in the regular test run)
+if importlib.util.find_spec("pytest_benchmark") is None:
+    collect_ignore_glob = ["*_benchmark_test.py"]
+
+from xurrent.core import XurrentApiHelper
+
+from payloads import request_records
+
+
+@pytest.fixture
+def helper():
+    return XurrentApiHelper("https://api.example.com/v1", "api_key", "account", resolve_user=False)
+
+
+@pytest.fixture(scope="session")
+def records():
+    """10,000 synthetic request records."""
+    return request_records(10000)
@@ -0,0 +1,43 @@
+from unittest.mock import patch
+
+from payloads import paged_responses
+
+# FILE: src/xurrent/core.py
+
+
+def serve(helper, responses):
+    return patch.object(helper._XurrentApiHelper__session, "request",
+                        side_effect=lambda method, url, **kwargs: responses[url])
+
+
+def test_api_call_aggregates_pages(benchmark, helper, records):
+    responses = paged_responses("https://api.example.com/v1/requests", records, per_page=100)
+    with serve(helper, responses):
+        result = benchmark(helper.api_call, "/requests", per_page=100)
+    assert len(result) == len(records)
+
+
+def test_iter_api_call(benchmark, helper, records):
+    responses = paged_responses("https://api.example.com/v1/requests", records, per_page=100)
+    with serve(helper, responses):
+        count = benchmark(lambda: sum(1 for _ in helper.iter_api_call("/requests", per_page=100)))
+    assert count == len(records)
+
+
+def test_create_filter_string(benchmark, helper):
+    filters = [{"status": "in_progress", "team": 2000 + i, "updated_at": f">2024-03-{i % 28 + 1:02d}", "category": "incident"}
+               for i in range(1000)]
+    result = benchmark(lambda: [helper.create_filter_string(filter) for filter in filters])
+    assert result[0] == "status=in_progress&team=2000&updated_at=>2024-03-01&category=incident"
+
+
+def test_encode_api_id(benchmark, helper):
+    ids = [f"gid://4me-demo/Request/{100000 + i}" for i in range(1000)]
+    result = benchmark(lambda: [helper.encode_api_id(id) for id in ids])
+    assert helper.decode_api_id(result[0]) == ids[0]
+
+
+def test_decode_api_id(benchmark, helper):
+    node_ids = [helper.encode_api_id(f"gid://4me-demo/Request/{100000 + i}") for i in range(1000)]
+    result = benchmark(lambda: [helper.decode_api_id(node_id) for node_id in node_ids])
+    assert result[-1] == "gid://4me-demo/Request/100999"
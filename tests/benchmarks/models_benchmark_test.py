@@ -0,0 +1,40 @@
+import io
+
+import pytest
+
+from xurrent.core import XurrentApiHelper
+from xurrent.requests import Request
+from xurrent.serialize import to_json_lines
+
+# FILE: src/xurrent/requests.py
+
+
+@pytest.fixture(scope="module")
+def requests_list(records):
+    helper = XurrentApiHelper("https://api.example.com/v1", "api_key", "account", resolve_user=False)
+    return Request.from_data_many(helper, records)
+
+
+def test_from_data(benchmark, helper, records):
+    result = benchmark(lambda: [Request.from_data(helper, record) for record in records])
+    assert len(result) == len(records)
+
+
+def test_from_data_many(benchmark, helper, records):
+    result = benchmark(Request.from_data_many, helper, records)
+    assert result[0].requested_by is result[0].created_by
+
+
+def test_to_dict(benchmark, requests_list):
+    result = benchmark(lambda: [request.to_dict() for request in requests_list])
+    assert result[0]["id"] == requests_list[0].id
+
+
+def test_to_json(benchmark, requests_list):
+    result = benchmark(lambda: [request.to_json() for request in requests_list])
+    assert result[0].startswith('{"id":')
+
+
+def test_to_json_lines(benchmark, requests_list):
+    count = benchmark(lambda: to_json_lines(requests_list, io.BytesIO()))
+    assert count == len(requests_list)
@@ -0,0 +1,74 @@
+"""Synthetic API payloads shaped like the records of a Xurrent account, generated deterministically."""
+import json
+import random
+
+import requests
+
+PEOPLE = [{"id": 1000 + i, "name": f"Person {i}", "account": {"id": "wdc", "name": "Widget Data Center"}} for i in range(200)]
+TEAMS = [{"id": 2000 + i, "name": f"Team {i}", "account": {"id": "wdc", "name": "Widget Data Center"}} for i in range(20)]
+CATEGORIES = ["incident", "rfc", "rfi", "reservation", "order", "fulfillment", "complaint", "compliment", "other"]
+STATUSES = ["assigned", "accepted", "in_progress", "waiting_for", "waiting_for_customer", "completed"]
+
+
+def timestamp(random_generator: random.Random) -> str:
+    return (f"2024-{random_generator.randint(1, 12):02d}-{random_generator.randint(1, 28):02d}"
+            f"T{random_generator.randint(0, 23):02d}:{random_generator.randint(0, 59):02d}:00Z")
+
+
+def request_records(count: int, seed: int = 42) -> list:
+    """
+    :return: Request records as returned by GET /requests, with nested people, teams and workflows
+    """
+    random_generator = random.Random(seed)
+    records = []
+    for i in range(count):
+        person = random_generator.choice(PEOPLE)
+        records.append({
+            "id": 100000 + i,
+            "nodeID": f"NG1lLnFhL1JlcXVlc3QvMTAw{i}",
+            "subject": f"Printer on floor {i % 12} is out of toner",
+            "category": random_generator.choice(CATEGORIES),
+            "impact": random_generator.choice(["low", "medium", "high", None]),
+            "status": random_generator.choice(STATUSES),
+            "source": "api",
+            "sourceID": None,
+            "created_at": timestamp(random_generator),
+            "updated_at": timestamp(random_generator),
+            "next_target_at": timestamp(random_generator),
+            "completed_at": None,
+            "team": random_generator.choice(TEAMS),
+            "member": random_generator.choice(PEOPLE),
+            "requested_by": person,
+            "requested_for": person,
+            "created_by": person,
+            "workflow": {"id": 5000 + i % 50, "subject": f"Change {i % 50}", "status": "progress_halted"} if i % 3 == 0 else None,
+            "grouped_into": None,
+            "service_instance": {"id": 300 + i % 10, "name": "Printing"},
+            "custom_fields": [{"id": "location", "value": f"Building {i % 4}"}],
+        })
+    return records
+
+
+def make_response(payload, headers: dict = None) -> requests.Response:
+    response = requests.Response()
+    response.status_code = 200
+    response._content = json.dumps(payload).encode()
+    response.headers.update(headers or {})
+    return response
+
+
+def paged_responses(base_url: str, records: list, per_page: int = 100) -> dict:
+    """
+    :return: Responses of a paginated listing by request URL, with 'Link' headers to the next and last page
+    """
+    pages = max(1, -(-len(records) // per_page))
+    responses = {}
+    for page in range(1, pages + 1):
+        links = []
+        if page < pages:
+            links.append(f'<{base_url}?page={page + 1}&per_page={per_page}>; rel="next"')
+        links.append(f'<{base_url}?page={pages}&per_page={per_page}>; rel="last"')
+        url = f"{base_url}?per_page={per_page}" if page == 1 else f"{base_url}?page={page}&per_page={per_page}"
+        responses[url] = make_response(records[(page - 1) * per_page:page * per_page],
+                                       {"Link": ", ".join(links), "X-Pagination-Total-Pages": str(pages)})
+    return responses
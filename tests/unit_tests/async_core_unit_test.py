@@ -0,0 +1,166 @@
+import pytest
+import asyncio
+import os
+import sys
+
+# Add the `../src` directory to sys.path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "../../src")))
+
+httpx = pytest.importorskip("httpx")
+
+from xurrent.async_core import AsyncXurrentApiHelper
+from xurrent.bulk import BulkExportError
+from xurrent.cache import ResponseCache
+from xurrent.requests import Request
+from xurrent.people import Person
+from xurrent.teams import Team
+
+# FILE: src/xurrent/async_core.py
+
+
+def page_link(base, page, last):
+    links = []
+    if page < last:
+        links.append(f'<{base}?page={page + 1}&per_page=2>; rel="next"')
+    links.append(f'<{base}?page={last}&per_page=2>; rel="last"')
+    return ', '.join(links)
+
+
+def make_helper(handler, **kwargs):
+    helper = AsyncXurrentApiHelper("https://api.example.com", "api_key", "account", **kwargs)
+    helper._AsyncXurrentApiHelper__client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    return helper
+
+
+def paged_handler(last_page, calls, rate_limited_page=None):
+    throttled = set()
+
+    def handler(request):
+        calls.append(str(request.url))
+        page = int(request.url.params.get("page", 1))
+        if page == rate_limited_page and page not in throttled:
+            throttled.add(page)
+            return httpx.Response(429, headers={"Retry-After": "0"})
+        records = [{"id": (page - 1) * 2 + i + 1, "subject": f"request {page}"} for i in range(2)]
+        headers = {"Link": page_link("https://api.example.com/requests", page, last_page), "X-Pagination-Total-Pages": str(last_page)}
+        return httpx.Response(200, json=records, headers=headers)
+
+    return handler
+
+
+def test_async_api_call_aggregates_pages():
+    calls = []
+
+    async def run():
+        async with make_helper(paged_handler(3, calls, rate_limited_page=2)) as helper:
+            return await helper.api_call("/requests", per_page=2)
+
+    result = asyncio.run(run())
+
+    assert [item["id"] for item in result] == [1, 2, 3, 4, 5, 6]
+    assert calls[0] == "https://api.example.com/requests?per_page=2"
+    # three pages plus one retry of the rate limited page
+    assert len(calls) == 4
+
+
+def test_async_api_call_prefetch_keeps_order():
+    calls = []
+
+    async def run():
+        async with make_helper(paged_handler(8, calls)) as helper:
+            return [record["id"] async for record in helper.iter_api_call("/requests", per_page=2, prefetch_workers=3)]
+
+    assert asyncio.run(run()) == list(range(1, 17))
+    assert len(calls) == 8
+
+
+def test_async_model_methods():
+    def handler(request):
+        if request.url.path == "/people/me":
+            return httpx.Response(200, json={"id": 1, "name": "api user"})
+        if request.url.path == "/people/1/teams":
+            return httpx.Response(200, json=[{"id": 5, "name": "team"}])
+        if request.url.path == "/requests/7" and request.method == "PATCH":
+            return httpx.Response(200, json={"id": 7, "status": "assigned"})
+        if request.url.path == "/requests/7":
+            return httpx.Response(200, json={"id": 7, "subject": "subject", "member": {"id": 1, "name": "api user"}})
+        return httpx.Response(404)
+
+    async def run():
+        async with make_helper(handler) as helper:
+            user = await helper.resolve_user()
+            request = await Request.async_get_by_id(helper, 7)
+            updated = await request.async_update({"status": "assigned"})
+            return helper, user, request, updated
+
+    helper, user, request, updated = asyncio.run(run())
+
+    assert isinstance(user, Person) and user.name == "api user"
+    assert isinstance(helper.api_user_teams[0], Team)
+    assert isinstance(request, Request) and request.member.name == "api user"
+    assert updated.status == "assigned"
+
+
+def test_async_api_call_raises_on_error():
+    async def run():
+        async with make_helper(lambda request: httpx.Response(404, text="not found")) as helper:
+            await helper.api_call("/requests/1")
+
+    with pytest.raises(httpx.HTTPStatusError):
+        asyncio.run(run())
+
+
+def test_async_helper_serves_not_modified_from_cache():
+    cache = ResponseCache()
+    sent = []
+
+    def handler(request):
+        sent.append(request.headers.get("If-None-Match"))
+        if request.headers.get("If-None-Match") == 'W/"abc"':
+            return httpx.Response(304, headers={"ETag": 'W/"abc"'})
+        return httpx.Response(200, json={"id": 1, "subject": "cached"}, headers={"ETag": 'W/"abc"'})
+
+    async def run():
+        async with make_helper(handler, response_cache=cache) as helper:
+            first = await helper.api_call("/requests/1")
+            second = await helper.api_call("/requests/1")
+            return first, second, helper.retry_stats.to_dict()
+
+    first, second, retry_stats = asyncio.run(run())
+
+    assert sent == [None, 'W/"abc"']
+    assert first == second == {"id": 1, "subject": "cached"}
+    assert (cache.hits, cache.misses) == (1, 1)
+    assert retry_stats["retries"] == 0 and retry_stats["failures"] == 0
+
+
+def test_async_bulk_export_streams_to_disk(tmp_path):
+    polls = iter([{"state": "processing"}, {"state": "done", "url": "https://download.example.com/export.csv"}])
+
+    def handler(request):
+        if request.method == "POST":
+            return httpx.Response(200, json={"token": "abc"})
+        if request.url.host == "download.example.com":
+            return httpx.Response(200, content=b"id,name\n1,Ann\n")
+        return httpx.Response(200, json=next(polls))
+
+    async def run():
+        async with make_helper(handler) as helper:
+            return await helper.bulk_export("people", save_as=tmp_path / "people.csv", poll_timeout=0)
+
+    assert asyncio.run(run()) is True
+    assert (tmp_path / "people.csv").read_bytes() == b"id,name\n1,Ann\n"
+
+
+def test_async_bulk_export_raises_typed_error():
+    def handler(request):
+        if request.method == "POST":
+            return httpx.Response(200, json={"token": "abc"})
+        return httpx.Response(200, json={"state": "failed"})
+
+    async def run():
+        async with make_helper(handler) as helper:
+            await helper.bulk_export("people", poll_timeout=0)
+
+    with pytest.raises(BulkExportError):
+        asyncio.run(run())
@@ -0,0 +1,197 @@
+import pytest
+from unittest.mock import patch
+import io
+import itertools
+import os
+import sys
+import requests
+
+# Add the `../src` directory to sys.path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "../../src")))
+
+from xurrent.bulk import BulkExportError, BulkImportError, run_bulk
+from xurrent.core import XurrentApiHelper
+from xurrent.requests import Request
+from xurrent.retry import RetryPolicy
+from xurrent.tasks import Task
+
+from core_unit_test import make_response
+
+# FILE: src/xurrent/bulk.py
+
+
+@pytest.fixture
+def helper():
+    policy = RetryPolicy(max_attempts=3, backoff_factor=0, jitter=False)
+    return XurrentApiHelper("https://api.example.com", "api_key", "account", resolve_user=False, retry_policy=policy)
+
+
+def serve_updates(failing=(), flaky=()):
+    attempts = {}
+
+    def request(method, url, json=None, **kwargs):
+        id = int(url.rsplit("/", 1)[1])
+        attempts[id] = attempts.get(id, 0) + 1
+        if id in failing:
+            return make_response({"message": "not found"}, status_code=404)
+        if id in flaky and attempts[id] == 1:
+            return make_response(status_code=503)
+        return make_response({"id": id, **json})
+    return request
+
+
+def test_update_many_reports_every_item(helper):
+    progress = []
+    updates = [(id, {"status": "completed"}) for id in range(1, 7)]
+
+    with patch.object(helper._XurrentApiHelper__session, "request", side_effect=serve_updates(failing={3}, flaky={5})), \
+            patch("xurrent.core.time.sleep"):
+        results = Request.update_many(helper, updates, workers=3, progress=lambda done, total, result: progress.append((done, total)))
+
+    assert [result.id for result in results] == [1, 2, 3, 4, 5, 6]
+    assert [result.ok for result in results] == [True, True, False, True, True, True]
+    assert isinstance(results[0].result, Request)
+    assert results[0].result.status == "completed"
+    assert results[2].status_code == 404
+    assert results[4].retries == 1
+    assert sum(result.retries for result in results) == 1
+    assert progress == [(done, 6) for done in range(1, 7)]
+    # the data passed in is not modified
+    assert updates[0][1] == {"status": "completed"}
+
+
+def test_run_bulk_records_any_exception_of_an_item(helper):
+    def operation(connection_object, id, data):
+        return data["subject"].upper()
+
+    results = run_bulk(helper, [(1, {"subject": "a"}), (2, {}), (3, {"subject": "c"})], operation, workers=2)
+
+    assert [result.result for result in results] == ["A", None, "C"]
+    assert [result.ok for result in results] == [True, False, True]
+    assert isinstance(results[1].error, KeyError)
+    assert results[1].status_code is None
+
+
+def test_task_update_many_accepts_generators(helper):
+    updates = ((id, {"subject": f"task {id}"}) for id in range(1, 4))
+
+    with patch.object(helper._XurrentApiHelper__session, "request", side_effect=serve_updates()):
+        results = Task.update_many(helper, updates, workers=2, progress=lambda done, total, result: None)
+
+    assert all(result.ok for result in results)
+    assert [result.result.subject for result in results] == ["task 1", "task 2", "task 3"]
+
+
+def serve_import(states, uploads):
+    polls = iter(states)
+
+    def request(method, url, json=None, data=None, headers=None, **kwargs):
+        if method == "POST":
+            uploads.append((headers["Content-Type"], data.read()))
+            return make_response({"token": "abc"})
+        return make_response(next(polls))
+    return request
+
+
+def test_bulk_import_streams_dicts_and_backs_off(helper):
+    uploads = []
+    states = [
+        {"state": "queued"},
+        {"state": "processing"},
+        {"state": "done", "results": {"created": 1, "updated": 1, "failures": 0}, "logfile": "https://download.example.com/log.txt"},
+    ]
+    rows = ({"Name": name, "Primary Email": f"{name.lower()}@example.com"} for name in ("Ann", "Bob"))
+
+    with patch.object(helper._XurrentApiHelper__session, "request", side_effect=serve_import(states, uploads)), \
+            patch("xurrent.core.time.sleep") as sleep:
+        result = helper.bulk_import("people", rows, poll_interval=1, max_poll_interval=3)
+
+    content_type, body = uploads[0]
+    boundary = content_type.split("boundary=")[1]
+    assert b'name="type"\r\n\r\npeople\r\n' in body
+    assert b"Name,Primary Email\r\nAnn,ann@example.com\r\nBob,bob@example.com\r\n" in body
+    assert body.endswith(f"--{boundary}--\r\n".encode())
+    assert [call.args[0] for call in sleep.call_args_list] == [1, 2, 3]
+    assert (result.created, result.updated, result.failures, result.ok) == (1, 1, 0, True)
+    assert result.logfile == "https://download.example.com/log.txt"
+
+
+def test_bulk_import_uploads_file_and_raises_on_failure(helper, tmp_path):
+    path = tmp_path / "cis.csv"
+    path.write_bytes(b"Label,Name\nwdc-01,Server\n")
+    uploads = []
+
+    with patch.object(helper._XurrentApiHelper__session, "request", side_effect=serve_import([{"state": "error", "message": "Invalid file"}], uploads)), \
+            patch("xurrent.core.time.sleep"):
+        with pytest.raises(BulkImportError, match="Invalid file") as error:
+            helper.bulk_import("cis", path)
+
+    assert b"Label,Name\nwdc-01,Server\n" in uploads[0][1]
+    assert error.value.result["state"] == "error"
+
+
+def test_bulk_import_timeout(helper):
+    with patch.object(helper._XurrentApiHelper__session, "request", side_effect=serve_import([{"state": "processing"}] * 10, [])), \
+            patch("xurrent.core.time.monotonic", side_effect=itertools.count()), \
+            patch("xurrent.core.time.sleep"):
+        with pytest.raises(BulkImportError, match="did not finish"):
+            helper.bulk_import("people", [{"Name": "Ann"}], timeout=3)
+
+
+class FailingStream(io.BytesIO):
+    def read(self, *args, **kwargs):
+        raise requests.exceptions.ChunkedEncodingError("connection reset")
+
+
+def serve_export(states, downloads):
+    polls = iter(states)
+    contents = iter(downloads)
+
+    def request(method, url, json=None, **kwargs):
+        if method == "POST":
+            return make_response({"token": "abc"})
+        if url.startswith("https://download.example.com"):
+            content, headers = next(contents)
+            response = make_response(headers=headers)
+            response.raw = FailingStream() if content is None else io.BytesIO(content)
+            response._content = False
+            assert kwargs.get("stream") is True
+            return response
+        return make_response(next(polls))
+    return request
+
+
+DONE = {"state": "done", "url": "https://download.example.com/export.zip"}
+
+
+def test_bulk_export_streams_to_disk(helper, tmp_path):
+    path = tmp_path / "export.zip"
+    downloads = [(None, {}), (b"x" * 2500, {"Content-Length": "2500"})]
+
+    with patch.object(helper._XurrentApiHelper__session, "request", side_effect=serve_export([{"state": "queued"}, DONE], downloads)), \
+            patch("xurrent.core.time.sleep") as sleep:
+        assert helper.bulk_export("people,teams", save_as=path, poll_timeout=2, chunk_size=1000) is True
+
+    assert path.read_bytes() == b"x" * 2500
+    # polls back off, then the interrupted download is restarted
+    assert [call.args[0] for call in sleep.call_args_list][:2] == [2, 4]
+    assert helper.retry_stats.retries_by_reason == {"ChunkedEncodingError": 1}
+    assert [file.name for file in tmp_path.iterdir()] == ["export.zip"]
+
+
+def test_bulk_export_verifies_size(helper, tmp_path):
+    path = tmp_path / "export.csv"
+    with patch.object(helper._XurrentApiHelper__session, "request", side_effect=serve_export([DONE], [(b"abc", {"Content-Length": "10"})])), \
+            patch("xurrent.core.time.sleep"):
+        with pytest.raises(BulkExportError, match="incomplete"):
+            helper.bulk_export("people", save_as=path)
+
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_bulk_export_raises_typed_error(helper):
+    with patch.object(helper._XurrentApiHelper__session, "request", side_effect=serve_export([{"state": "failed"}], [])), \
+            patch("xurrent.core.time.sleep"):
+        with pytest.raises(BulkExportError, match="failed") as error:
+            helper.bulk_export("people")
+    assert error.value.result == {"state": "failed"}
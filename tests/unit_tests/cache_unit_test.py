@@ -0,0 +1,93 @@
+import pytest
+from unittest.mock import patch
+import os
+import sys
+
+# Add the `../src` directory to sys.path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "../../src")))
+
+from xurrent.cache import ResponseCache
+from xurrent.core import XurrentApiHelper
+from xurrent.requests import Request
+
+from core_unit_test import make_response
+
+# FILE: src/xurrent/cache.py
+
+
+def test_cache_requires_validator():
+    cache = ResponseCache()
+    assert cache.put("https://api.example.com/teams", {}, [], 10) is None
+    assert cache.put("https://api.example.com/teams", {"ETag": '"1"'}, [], 10) is not None
+    assert cache.get("https://api.example.com/teams").validators() == {"If-None-Match": '"1"'}
+
+
+def test_cache_evicts_least_recently_used():
+    cache = ResponseCache(max_entries=2)
+    cache.put("a", {"ETag": "a"}, 1, 10)
+    cache.put("b", {"ETag": "b"}, 2, 10)
+    cache.get("a")
+    cache.put("c", {"ETag": "c"}, 3, 10)
+
+    assert cache.get("b") is None
+    assert cache.get("a").data == 1
+    assert cache.get("c").data == 3
+
+
+def test_cache_memory_cap():
+    cache = ResponseCache(max_bytes=100)
+    cache.put("a", {"ETag": "a"}, 1, 60)
+    cache.put("b", {"ETag": "b"}, 2, 60)
+
+    assert len(cache) == 1
+    assert cache.size == 60
+    assert cache.get("a") is None
+    # bodies larger than the cap are not cached at all
+    assert cache.put("c", {"ETag": "c"}, 3, 101) is None
+
+
+def test_cache_ttl():
+    cache = ResponseCache(ttl=10)
+    with patch("xurrent.cache.time.monotonic", return_value=0):
+        cache.put("a", {"Last-Modified": "Wed, 21 Oct 2015 07:28:00 GMT"}, 1, 10)
+    with patch("xurrent.cache.time.monotonic", return_value=5):
+        assert cache.get("a").validators() == {"If-Modified-Since": "Wed, 21 Oct 2015 07:28:00 GMT"}
+    with patch("xurrent.cache.time.monotonic", return_value=11):
+        assert cache.get("a") is None
+    assert len(cache) == 0
+
+
+def test_helper_serves_not_modified_from_cache():
+    cache = ResponseCache()
+    helper = XurrentApiHelper("https://api.example.com", "api_key", "account", resolve_user=False, response_cache=cache)
+    responses = [
+        make_response({"id": 1, "subject": "cached"}, headers={"ETag": 'W/"abc"'}),
+        make_response(status_code=304, headers={"ETag": 'W/"abc"'}),
+    ]
+
+    with patch.object(helper._XurrentApiHelper__session, "request", side_effect=responses) as request:
+        first = Request.get_by_id(helper, 1)
+        second = Request.get_by_id(helper, 1)
+
+    assert request.call_args_list[0].kwargs["headers"] is None
+    assert request.call_args_list[1].kwargs["headers"] == {"If-None-Match": 'W/"abc"'}
+    assert first.subject == second.subject == "cached"
+    assert (cache.hits, cache.misses) == (1, 1)
+
+
+def test_helper_cache_keeps_pagination_headers():
+    cache = ResponseCache()
+    helper = XurrentApiHelper("https://api.example.com", "api_key", "account", resolve_user=False, response_cache=cache)
+    link = '<https://api.example.com/teams?page=2&per_page=100>; rel="next"'
+    responses = [
+        make_response([{"id": 1}], headers={"ETag": '"p1"', "Link": link}),
+        make_response([{"id": 2}], headers={"ETag": '"p2"'}),
+        make_response(status_code=304),
+        make_response(status_code=304),
+    ]
+
+    with patch.object(helper._XurrentApiHelper__session, "request", side_effect=responses):
+        assert helper.api_call("/teams") == [{"id": 1}, {"id": 2}]
+        assert helper.api_call("/teams") == [{"id": 1}, {"id": 2}]
+
+    assert cache.hits == 2
@@ -0,0 +1,251 @@
+import pytest
+from unittest.mock import patch, MagicMock
+import json
+import os
+import sys
+import requests
+
+# Add the `../src` directory to sys.path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "../../src")))
+
+from xurrent.core import XurrentApiHelper
+from xurrent.requests import Request
+from xurrent.people import Person
+from xurrent.teams import Team
+
+# FILE: src/xurrent/core.py
+
+
+def make_response(payload=None, status_code=200, headers=None, url=None):
+    """Build a requests.Response as the session would return it."""
+    response = requests.Response()
+    response.status_code = status_code
+    response._content = json.dumps(payload).encode() if payload is not None else b''
+    response.headers.update(headers or {})
+    response.url = url
+    return response
+
+
+def page_link(base, page, last):
+    links = []
+    if page < last:
+        links.append(f'<{base}?page={page + 1}&per_page=2>; rel="next"')
+    links.append(f'<{base}?page={last}&per_page=2>; rel="last"')
+    return ', '.join(links)
+
+
+@pytest.fixture
+def helper():
+    return XurrentApiHelper("https://api.example.com", "api_key", "account", resolve_user=False)
+
+
+@pytest.fixture
+def paged_session(helper):
+    """Serve three pages of two requests each for /requests."""
+    base = "https://api.example.com/requests"
+    pages = [
+        make_response([{"id": 1}, {"id": 2}], headers={"Link": page_link(base, 1, 3)}),
+        make_response([{"id": 3}, {"id": 4}], headers={"Link": page_link(base, 2, 3)}),
+        make_response([{"id": 5}, {"id": 6}], headers={"Link": page_link(base, 3, 3)}),
+    ]
+    with patch.object(helper._XurrentApiHelper__session, "request", side_effect=pages) as request:
+        yield request
+
+
+def test_api_call_aggregates_pages(helper, paged_session):
+    result = helper.api_call("/requests", per_page=2)
+
+    assert [item["id"] for item in result] == [1, 2, 3, 4, 5, 6]
+    assert paged_session.call_count == 3
+    assert paged_session.call_args_list[0].args == ("GET", "https://api.example.com/requests?per_page=2")
+    assert paged_session.call_args_list[2].args == ("GET", "https://api.example.com/requests?page=3&per_page=2")
+
+
+def test_iter_api_call_is_lazy(helper, paged_session):
+    records = helper.iter_api_call("/requests", per_page=2)
+    assert paged_session.call_count == 0
+
+    assert next(records) == {"id": 1}
+    assert next(records) == {"id": 2}
+    assert paged_session.call_count == 1
+
+    assert [item["id"] for item in records] == [3, 4, 5, 6]
+    assert paged_session.call_count == 3
+
+
+def test_iter_api_call_single_record(helper):
+    with patch.object(helper._XurrentApiHelper__session, "request", return_value=make_response({"id": 7})):
+        assert list(helper.iter_api_call("/people/me")) == [{"id": 7}]
+
+
+def test_api_call_retries_after_rate_limit(helper):
+    responses = [make_response(status_code=429, headers={"Retry-After": "0"}), make_response({"id": 1})]
+    with patch.object(helper._XurrentApiHelper__session, "request", side_effect=responses) as request:
+        assert helper.api_call("/requests/1") == {"id": 1}
+    assert request.call_count == 2
+
+
+def test_api_call_no_content(helper):
+    with patch.object(helper._XurrentApiHelper__session, "request", return_value=make_response(status_code=204)):
+        assert helper.api_call("/requests/1/cis/2", "DELETE") is None
+
+
+def test_iter_requests_yields_models(helper, paged_session):
+    requests_iter = Request.iter_requests(helper, queryfilter={"status": "assigned"})
+    first = next(requests_iter)
+
+    assert isinstance(first, Request)
+    assert first.id == 1
+    assert paged_session.call_args_list[0].args == ("GET", "https://api.example.com/requests?status=assigned&per_page=100")
+    assert [request.id for request in requests_iter] == [2, 3, 4, 5, 6]
+
+
+def test_iter_requests_shares_references_within_a_page(helper):
+    bob = {"id": 8, "name": "Bob"}
+    page = [{"id": 1, "requested_by": bob, "created_by": bob}, {"id": 2, "requested_by": bob}]
+    with patch.object(helper._XurrentApiHelper__session, "request", return_value=make_response(page)):
+        streamed = list(Request.iter_requests(helper))
+    with patch.object(helper._XurrentApiHelper__session, "request", return_value=make_response(page)):
+        listed = Request.get_requests(helper)
+
+    assert streamed[0].requested_by is streamed[0].created_by is streamed[1].requested_by
+    assert [request.to_dict() for request in streamed] == [request.to_dict() for request in listed]
+
+
+def test_iter_api_pages_yields_lists(helper, paged_session):
+    assert [[item["id"] for item in page] for page in helper.iter_api_pages("/requests", per_page=2)] == [[1, 2], [3, 4], [5, 6]]
+
+
+def test_iter_people_with_mock_connection():
+    connection = MagicMock(spec=XurrentApiHelper)
+    connection.base_url = "https://api.example.com"
+    connection.iter_api_pages.return_value = iter([[{"id": 1, "name": "a"}, {"id": 2, "name": "b"}]])
+
+    people = list(Person.iter_people(connection, predefinedFilter="enabled"))
+
+    connection.iter_api_pages.assert_called_once_with("https://api.example.com/people/enabled", "GET")
+    assert [person.name for person in people] == ["a", "b"]
+
+
+def serve_pages(base, last_page, per_page=2, rate_limited_page=None):
+    """Return a session.request side effect serving `last_page` pages keyed by the 'page' parameter."""
+    throttled = set()
+
+    def request(method, url, json=None, **kwargs):
+        page = int(url.split("page=")[1].split("&")[0]) if "?page=" in url or "&page=" in url else 1
+        if page == rate_limited_page and page not in throttled:
+            throttled.add(page)
+            return make_response(status_code=429, headers={"Retry-After": "0"})
+        records = [{"id": (page - 1) * per_page + i + 1} for i in range(per_page)]
+        return make_response(records, headers={"Link": page_link(base, page, last_page), "X-Pagination-Total-Pages": str(last_page)})
+
+    return request
+
+
+def test_api_call_prefetches_pages_in_order(helper):
+    side_effect = serve_pages("https://api.example.com/requests", 10, rate_limited_page=4)
+    with patch.object(helper._XurrentApiHelper__session, "request", side_effect=side_effect) as request:
+        result = helper.api_call("/requests", per_page=2, prefetch_workers=4)
+
+    assert [item["id"] for item in result] == list(range(1, 21))
+    # ten pages plus one retry of the rate limited page
+    assert request.call_count == 11
+
+
+def test_iter_api_call_prefetch_uses_helper_default(helper):
+    helper.prefetch_workers = 3
+    side_effect = serve_pages("https://api.example.com/requests", 5)
+    with patch.object(helper._XurrentApiHelper__session, "request", side_effect=side_effect):
+        assert [item["id"] for item in helper.iter_api_call("/requests", per_page=2)] == list(range(1, 11))
+
+
+def test_session_pool_and_timeout_settings():
+    helper = XurrentApiHelper("https://api.example.com", "api_key", "account", resolve_user=False,
+                              pool_maxsize=32, keep_alive=False, timeout=(3, 30))
+    session = helper._XurrentApiHelper__session
+    adapter = session.get_adapter("https://api.example.com")
+
+    assert adapter._pool_maxsize == 32
+    assert adapter.max_retries.total == 0
+    assert session.headers["Connection"] == "close"
+
+    with patch.object(session, "request", return_value=make_response({"id": 1})) as request:
+        helper.api_call("/requests/1")
+    assert request.call_args.kwargs["timeout"] == (3, 30)
+
+
+def test_thread_local_sessions():
+    import threading
+
+    helper = XurrentApiHelper("https://api.example.com", "api_key", "account", resolve_user=False, thread_local_sessions=True)
+    sessions = []
+
+    def worker():
+        sessions.append(helper._XurrentApiHelper__get_session())
+        sessions.append(helper._XurrentApiHelper__get_session())
+
+    threads = [threading.Thread(target=worker) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    # one session per thread, reused within the thread
+    assert len({id(session) for session in sessions}) == 4
+    assert all(sessions[i] is sessions[i + 1] for i in range(0, 8, 2))
+    assert sessions[0].headers["x-xurrent-account"] == "account"
+
+    with helper:
+        pass
+    assert len(helper._XurrentApiHelper__sessions) == 5
+
+
+def test_models_store_declared_fields_in_slots():
+    person = Person(None, 7, name="Ann", account={"id": "acme"})
+    assert person.name == "Ann"
+    assert "name" in Person._fields and "account" in Person._fields
+
+    # undeclared fields go to the overflow mapping and keep working as attributes
+    person.job_title = "Engineer"
+    assert person.job_title == "Engineer"
+    assert person.__dict__ == {"job_title": "Engineer"}
+    assert person.to_dict() == {"id": 7, "name": "Ann", "primary_email": None, "account": {"id": "acme"}, "job_title": "Engineer"}
+    with pytest.raises(AttributeError):
+        person.site
+
+
+def test_slotted_models_halve_memory():
+    import tracemalloc
+
+    class DictModel(dict):
+        def __init__(self, **kwargs):
+            for key, value in kwargs.items():
+                setattr(self, key, value)
+
+    def stub(id, name):
+        return {"id": id, "name": name, "account": {"id": "acme", "name": "Acme"}, "nodeID": f"node-{id}"}
+
+    record = {"id": 1, "subject": "Printer", "category": "incident", "impact": "low", "status": "assigned",
+              "team": stub(3, "Ops"), "member": stub(7, "Ann"), "requested_by": stub(8, "Bob"), "requested_for": stub(8, "Bob"),
+              "created_by": stub(8, "Bob"), "created_at": "2024-03-01T12:00:00Z", "updated_at": "2024-03-01T12:00:00Z", "nodeID": "abc"}
+
+    def as_dict_model(instance):
+        # the same fields as attributes of a dict subclass, as models were stored before
+        fields = instance._attributes()
+        return DictModel(**{key: as_dict_model(value) if isinstance(value, (Person, Team)) else value for key, value in fields.items()})
+
+    def allocated(build):
+        tracemalloc.start()
+        instances = [build() for _ in range(1000)]
+        size = tracemalloc.get_traced_memory()[0]
+        tracemalloc.stop()
+        return size / len(instances)
+
+    helper = MagicMock(spec=XurrentApiHelper)
+    assert allocated(lambda: as_dict_model(Request(helper, **record))) >= 2 * allocated(lambda: Request(helper, **record))
+
+    # the fields API records usually carry are declared, so that realistic records do not need the overflow mapping
+    record.update(sourceID="ext-1", source="api", grouped_into=None, service_instance={"id": 300, "name": "Printing"},
+                  custom_fields=[{"id": "location", "value": "Building 1"}], urgent=False)
+    assert not Request(helper, **record).__dict__
+    assert allocated(lambda: as_dict_model(Request(helper, **record))) >= 2 * allocated(lambda: Request(helper, **record))
@@ -0,0 +1,105 @@
+import pytest
+from unittest.mock import MagicMock
+from datetime import datetime, timezone
+import io
+import os
+import sys
+import zipfile
+
+# Add the `../src` directory to sys.path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "../../src")))
+
+from xurrent.core import XurrentApiHelper
+from xurrent.exports import iter_export, iter_export_rows
+from xurrent.people import Person
+from xurrent.requests import Request, RequestCategory
+from xurrent.workflows import Workflow
+
+# FILE: src/xurrent/exports.py
+
+PEOPLE_CSV = "﻿Name,Primary Email,Created At\r\nAnn,ann@example.com,2024-03-01T12:30:00Z\r\nBob,,\r\n".encode()
+REQUESTS_CSV = b"ID,Subject,Category,Team,Updated At\n1,Printer broken,Incident,Service Desk,2024-03-02T08:00:00Z\n"
+
+
+@pytest.fixture
+def mock_connection():
+    connection = MagicMock(spec=XurrentApiHelper)
+    connection.base_url = "https://api.example.com"
+    return connection
+
+
+def make_zip(members):
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, "w") as archive:
+        for name, content in members.items():
+            archive.writestr(name, content)
+    return buffer.getvalue()
+
+
+def test_iter_export_rows_decodes_csv():
+    rows = list(iter_export_rows(PEOPLE_CSV))
+
+    assert rows[0] == {"name": "Ann", "primary_email": "ann@example.com", "created_at": datetime(2024, 3, 1, 12, 30, tzinfo=timezone.utc)}
+    assert rows[1] == {"name": "Bob", "primary_email": None, "created_at": None}
+    assert next(iter_export_rows(PEOPLE_CSV, raw_columns=True))["Primary Email"] == "ann@example.com"
+
+
+def test_iter_export_rows_is_lazy(tmp_path):
+    path = tmp_path / "people.csv"
+    path.write_bytes(PEOPLE_CSV)
+    rows = iter_export_rows(path)
+
+    assert next(rows)["name"] == "Ann"
+    rows.close()
+
+
+def test_iter_export_zip_yields_models_per_type(mock_connection):
+    export = make_zip({"people.csv": PEOPLE_CSV, "requests.csv": REQUESTS_CSV})
+
+    records = list(iter_export(mock_connection, export))
+
+    assert [type(record) for record in records] == [Person, Person, Request]
+    assert records[0].primary_email == "ann@example.com"
+    request = records[2]
+    assert request.id == "1"
+    assert request.category == RequestCategory.incident
+    assert request.team is None and request.team_name == "Service Desk"
+    assert request.updated_at == datetime(2024, 3, 2, 8, tzinfo=timezone.utc)
+    # a single type can be selected from a ZIP export
+    assert [record.id for record in iter_export(mock_connection, export, type="requests")] == ["1"]
+
+
+def test_iter_export_maps_display_labels_to_codes(mock_connection):
+    export = ("ID,Subject,Category,Impact,Status,Completion Reason\n"
+              "1,Printer,Request for Information,Low - Service Degraded for One User,Waiting for…,\n"
+              "2,VPN,RFC - Request for Change,High,Waiting for Customer,Workaround - Root Cause Not Removed\n"
+              "3,Badge,Something New,,Escalated,\n").encode()
+
+    requests = list(iter_export(mock_connection, export, type="requests"))
+
+    assert [request.category for request in requests[:2]] == [RequestCategory.rfi, RequestCategory.rfc]
+    assert [request.impact for request in requests[:2]] == ["low", "high"]
+    assert [request.status for request in requests] == ["waiting_for", "waiting_for_customer", None]
+    assert requests[1].completion_reason == "workaround"
+    # unknown values do not stop the stream, they are kept as labels
+    assert requests[2].category is None and requests[2].category_label == "Something New"
+    assert requests[2].status_label == "Escalated"
+    workflow = next(iter_export(mock_connection, b"ID,Subject,Category\n9,Upgrade,Non-Standard - Approved Workflow Template Not Available\n",
+                                type="workflows"))
+    assert isinstance(workflow, Workflow) and workflow.category == "non_standard"
+
+
+def test_iter_export_xlsx(mock_connection):
+    openpyxl = pytest.importorskip("openpyxl")
+    workbook = openpyxl.Workbook()
+    sheet = workbook.active
+    sheet.append(["Name", "Primary Email", "Created At"])
+    sheet.append(["Ann", "ann@example.com", datetime(2024, 3, 1, 12, 30)])
+    buffer = io.BytesIO()
+    workbook.save(buffer)
+
+    people = list(iter_export(mock_connection, buffer.getvalue(), type="people"))
+
+    assert isinstance(people[0], Person)
+    assert people[0].name == "Ann"
+    assert people[0].created_at == datetime(2024, 3, 1, 12, 30)
@@ -0,0 +1,126 @@
+import pytest
+import io
+import os
+import sys
+import zipfile
+
+# Add the `../src` directory to sys.path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "../../src")))
+
+from xurrent.core import XurrentApiHelper
+from xurrent.fake_server import FakeDataset, FakeXurrentServer
+from xurrent.retry import RetryPolicy
+from xurrent.requests import Request
+from xurrent.configuration_items import ConfigurationItem
+
+# FILE: src/xurrent/fake_server.py
+
+
+@pytest.fixture(scope="module")
+def dataset():
+    return FakeDataset(requests=250, people=20, teams=4, workflows=5, cis=30, seed=7)
+
+
+@pytest.fixture
+def server(dataset):
+    with FakeXurrentServer(dataset) as server:
+        yield server
+
+
+@pytest.fixture
+def helper(server):
+    retry_policy = RetryPolicy(backoff_factor=0.01, max_backoff=0.05, jitter=False)
+    with XurrentApiHelper(server.base_url, "api_key", "account", resolve_user=False, retry_policy=retry_policy) as helper:
+        yield helper
+
+
+def test_dataset_is_deterministic():
+    first, second = FakeDataset(requests=10, seed=3), FakeDataset(requests=10, seed=3)
+
+    assert first.list("requests") == second.list("requests")
+    assert len(first.list("tasks")) == 50 * 3
+
+
+def test_listing_is_paginated_with_link_headers(server):
+    status, headers, _ = server.handle("GET", "/v1/requests?per_page=100&page=2", {"Authorization": "Bearer x", "Host": "h"}, b"")
+
+    assert status == 200
+    assert headers["X-Pagination-Total-Pages"] == "3"
+    assert '<http://h/v1/requests?per_page=100&page=3>; rel="next"' in headers["Link"]
+
+
+def test_helper_reads_all_pages(helper, server):
+    requests = Request.get_requests(helper)
+
+    assert len(requests) == 250
+    assert server.stats[("GET", 200)] == 3
+
+
+def test_filters_and_fields(helper, dataset):
+    result = helper.api_call("/requests/completed?fields=subject,status")
+
+    assert result and all(record["status"] == "completed" for record in result)
+    assert set(result[0]) == {"id", "nodeID", "subject", "status"}
+    assert len(result) == sum(record["status"] == "completed" for record in dataset.list("requests"))
+
+
+def test_rate_limit_is_retried_after_retry_after(helper, server):
+    server.fail_next(2, 429, retry_after=0)
+
+    assert helper.api_call("/people/me")["id"] == 1
+    assert server.stats[("GET", 429)] == 2
+    assert helper.retry_stats.to_dict()["retries"] == 2
+
+
+def test_rate_limit_window_answers_429():
+    with FakeXurrentServer(FakeDataset(requests=1), rate_limit=1, rate_limit_window=60) as server:
+        headers = {"Authorization": "Bearer x"}
+        assert server.handle("GET", "/v1/requests", headers, b"")[0] == 200
+        status, response_headers, _ = server.handle("GET", "/v1/requests", headers, b"")
+
+    assert status == 429
+    assert response_headers["X-RateLimit-Remaining"] == "0"
+    assert 1 <= int(response_headers["Retry-After"]) <= 60
+
+
+def test_server_errors_are_injected(helper, server):
+    server.error_rate = 1.0
+
+    with pytest.raises(Exception):
+        helper.api_call("/teams", per_page=10)
+    assert server.stats[("GET", 503)] == helper.retry_policy.max_attempts
+
+
+def test_missing_authorization_is_rejected(server):
+    assert server.handle("GET", "/v1/requests", {}, b"")[0] == 401
+
+
+def test_request_notes_and_ci_links(helper):
+    request = Request.get_by_id(helper, 5)
+    request.add_note("Restarted the service")
+    request.add_ci(ConfigurationItem.get_by_id(helper, 12).id)
+
+    assert helper.api_call("/requests/5/notes")[-1]["text"] == "Restarted the service"
+    assert 12 in [linked.id for linked in request.get_cis()]
+    request.remove_ci(12)
+    assert 12 not in [linked.id for linked in request.get_cis()]
+
+
+def test_bulk_export_is_polled_until_done(helper, server):
+    content = helper.bulk_export("people", poll_timeout=0.01)
+
+    assert content.decode().splitlines()[0].startswith("ID,Name,Primary Email")
+    assert len(content.decode().splitlines()) == 21
+    assert server.stats[("GET", 200)] == 3 + 1  # queued, processing, done and the download
+
+
+def test_bulk_export_of_several_types_is_zipped(helper):
+    content = helper.bulk_export("people,teams", poll_timeout=0.01)
+
+    assert sorted(zipfile.ZipFile(io.BytesIO(content)).namelist()) == ["people.csv", "teams.csv"]
+
+
+def test_bulk_import_counts_rows(helper):
+    result = helper.bulk_import("people", [{"name": "Ann"}, {"name": "Bob"}], poll_interval=0.01)
+
+    assert result.created == 2
@@ -0,0 +1,126 @@
+import pytest
+from unittest.mock import patch
+import gc
+import os
+import sys
+
+# Add the `../src` directory to sys.path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "../../src")))
+
+from xurrent.core import XurrentApiHelper
+from xurrent.identity import IdentityMap
+from xurrent.people import Person
+from xurrent.requests import Request
+from xurrent.tasks import Task
+from xurrent.teams import Team
+
+from core_unit_test import make_response
+
+# FILE: src/xurrent/identity.py
+
+
+@pytest.fixture
+def helper():
+    return XurrentApiHelper("https://api.example.com", "api_key", "account", resolve_user=False, identity_map=True)
+
+
+ANN = {"id": 7, "name": "Ann"}
+
+
+def test_references_resolve_to_one_instance(helper):
+    records = [
+        {"id": 1, "member": ANN, "requested_by": ANN, "created_by": ANN, "team": {"id": 3, "name": "Ops"}},
+        {"id": 2, "member": ANN, "requested_for": {"id": 8, "name": "Bob"}, "team": {"id": 3, "name": "Ops"}},
+    ]
+    with patch.object(helper._XurrentApiHelper__session, "request", return_value=make_response(records)):
+        first, second = Request.get_requests(helper)
+
+    assert first.member is first.requested_by is first.created_by is second.member
+    assert first.team is second.team
+    assert first.requested_by is not second.requested_for
+    assert helper.identity_map.get(Person, 7) is first.member
+
+
+def test_fuller_record_is_merged(helper):
+    stub = Person.from_data(helper, ANN)
+    with patch.object(helper._XurrentApiHelper__session, "request",
+                      return_value=make_response({"id": 7, "name": "Ann Smith", "primary_email": "ann@example.com", "disabled": False})):
+        person = Person.get_by_id(helper, 7)
+
+    assert person is stub
+    assert (stub.name, stub.primary_email, stub.disabled) == ("Ann Smith", "ann@example.com", False)
+    # a later stub does not drop the fields of the fuller record
+    Person.from_data(helper, ANN)
+    assert stub.primary_email == "ann@example.com"
+    assert stub.name == "Ann"
+
+
+def test_merge_converts_nested_references(helper):
+    request = Request.from_data(helper, {"id": 1, "subject": "Printer"})
+    Request.from_data(helper, {"id": 1, "member": ANN, "category": "incident"})
+
+    assert request.subject == "Printer"
+    assert isinstance(request.member, Person)
+    assert request.member is Person.from_data(helper, ANN)
+    assert request.category == "incident"
+
+
+def test_models_of_different_types_do_not_collide(helper):
+    assert Person.from_data(helper, {"id": 3}) is not Team.from_data(helper, {"id": 3})
+
+
+def test_unreferenced_instances_are_released():
+    identity_map = IdentityMap()
+    helper = XurrentApiHelper("https://api.example.com", "api_key", "account", resolve_user=False, identity_map=identity_map)
+    assert helper.identity_map is identity_map
+    Person.from_data(helper, ANN)
+    gc.collect()
+    assert len(identity_map) == 0
+
+
+def test_disabled_by_default():
+    helper = XurrentApiHelper("https://api.example.com", "api_key", "account", resolve_user=False)
+    assert helper.identity_map is None
+    assert Person.from_data(helper, ANN) is not Person.from_data(helper, ANN)
+
+
+def test_from_data_many_shares_references_within_a_batch():
+    helper = XurrentApiHelper("https://api.example.com", "api_key", "account", resolve_user=False)
+    records = [{"id": id, "member": ANN, "created_by": ANN} for id in range(1, 4)]
+
+    first = Request.from_data_many(helper, records)
+    second = Request.from_data_many(helper, records)
+
+    assert [request.id for request in first] == [1, 2, 3]
+    assert first[0].member is first[0].created_by is first[2].member
+    # without an identity map, batches do not share instances
+    assert first[0].member is not second[0].member
+    assert Person.from_data(helper, ANN) is not first[0].member
+
+
+def test_from_data_many_merges_fuller_references():
+    helper = XurrentApiHelper("https://api.example.com", "api_key", "account", resolve_user=False)
+    first, second = Request.from_data_many(helper, [
+        {"id": 1, "member": ANN},
+        {"id": 2, "member": {"id": 7, "name": "Ann", "primary_email": "ann@example.com"}},
+    ])
+    assert first.member is second.member
+    assert first.member.primary_email == "ann@example.com"
+
+
+def test_from_data_many_validates_records():
+    helper = XurrentApiHelper("https://api.example.com", "api_key", "account", resolve_user=False)
+    with pytest.raises(TypeError):
+        Team.from_data_many(helper, [{"id": 1}, "team"])
+    with pytest.raises(ValueError):
+        Team.from_data_many(helper, [{"id": 1}, {"name": "Ops"}])
+    with pytest.raises(TypeError):
+        Team.from_data_many(helper, {"id": 1})
+
+
+def test_get_tasks_returns_tasks(helper):
+    with patch.object(helper._XurrentApiHelper__session, "request",
+                      return_value=make_response([{"id": 1, "subject": "a"}, {"id": 2, "subject": "b"}])):
+        tasks = Task.get_tasks(helper)
+    assert [type(task) for task in tasks] == [Task, Task]
+    assert tasks[1].subject == "b"
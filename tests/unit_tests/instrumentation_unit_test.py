@@ -0,0 +1,156 @@
+import pytest
+from unittest.mock import patch
+import asyncio
+import os
+import sys
+
+import requests
+
+# Add the `../src` directory to sys.path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "../../src")))
+
+from xurrent import instrumentation
+from xurrent.core import XurrentApiHelper
+from xurrent.instrumentation import MetricsAggregator, RequestEvent, RequestHook, templated_path
+from xurrent.retry import RetryPolicy
+
+from core_unit_test import make_response, page_link
+
+# FILE: src/xurrent/instrumentation.py
+
+
+class RecordingHook(RequestHook):
+    def __init__(self):
+        self.calls = []
+
+    def request_started(self, event):
+        self.calls.append(("started", event.method, event.path, event.status))
+
+    def request_finished(self, event):
+        self.calls.append(("finished", event.method, event.path, event.status))
+
+
+def make_helper(*hooks, **kwargs):
+    return XurrentApiHelper("https://api.example.com/v1", "api_key", "account", resolve_user=False, hooks=list(hooks), **kwargs)
+
+
+def test_templated_path():
+    base = "https://api.example.com/v1"
+    assert templated_path(f"{base}/requests/12345/notes?page=2", base) == "/requests/{id}/notes"
+    assert templated_path(f"{base}/export/a3f9c0e1b2d4e5f60718293a", base) == "/export/{id}"
+    assert templated_path(f"{base}/configuration_items", base) == "/configuration_items"
+    assert templated_path("https://download.example.com/files/export.csv", base) == "/files/export.csv"
+
+
+def test_events_of_paginated_call():
+    events = []
+    hook = RecordingHook()
+    helper = make_helper(hook, events.append)
+    base = "https://api.example.com/v1/requests"
+    pages = [
+        make_response([{"id": 1}, {"id": 2}], headers={"Link": page_link(base, 1, 2)}),
+        make_response([{"id": 3}], headers={"Link": page_link(base, 2, 2)}),
+    ]
+    with patch.object(helper._XurrentApiHelper__session, "request", side_effect=pages):
+        helper.api_call("/requests", per_page=2)
+
+    assert hook.calls == [
+        ("started", "GET", "/requests", None), ("finished", "GET", "/requests", 200),
+        ("started", "GET", "/requests", None), ("finished", "GET", "/requests", 200),
+    ]
+    assert [event.page for event in events] == [1, 2]
+    assert events[0].response_bytes == len(b'[{"id": 1}, {"id": 2}]')
+    assert all(event.latency >= 0 and event.retries == 0 and event.error is None for event in events)
+
+
+def test_event_counts_retries_and_rate_limit_sleep():
+    events = []
+    helper = make_helper(events.append)
+    responses = [make_response(status_code=429, headers={"Retry-After": "0"}), make_response({"id": 1})]
+    with patch.object(helper.rate_limiter, "acquire", side_effect=[0.0, 0.25]), \
+            patch.object(helper._XurrentApiHelper__session, "request", side_effect=responses):
+        helper.api_call("/requests/1")
+
+    event, = events
+    assert (event.path, event.page, event.status, event.retries) == ("/requests/{id}", 1, 200, 1)
+    assert event.rate_limit_sleep == 0.25
+
+
+def test_failed_request_is_reported():
+    events = []
+    helper = make_helper(events.append, retry_policy=RetryPolicy(max_attempts=1))
+    with patch.object(helper._XurrentApiHelper__session, "request", return_value=make_response(status_code=404)):
+        with pytest.raises(requests.exceptions.HTTPError):
+            helper.api_call("/people/7")
+
+    event, = events
+    assert event.status == 404
+    assert isinstance(event.error, requests.exceptions.HTTPError)
+
+
+def test_failing_hook_does_not_break_the_call():
+    def broken(event):
+        raise RuntimeError("boom")
+
+    helper = make_helper(broken)
+    with patch.object(helper._XurrentApiHelper__session, "request", return_value=make_response({"id": 7})), \
+            patch.object(helper.logger, "warning") as warning:
+        assert helper.api_call("/people/7") == {"id": 7}
+    assert "boom" in warning.call_args.args[0]
+
+
+def test_metrics_aggregator():
+    metrics = MetricsAggregator(buckets=(0.1, 1.0))
+    for method, path, latency, status, retries in [
+        ("GET", "/requests", 0.05, 200, 0),
+        ("GET", "/requests", 0.5, 200, 2),
+        ("GET", "/requests", 3.0, 429, 4),
+        ("POST", "/requests", 0.2, 201, 0),
+    ]:
+        event = RequestEvent(method, "", path, page=1 if method == "GET" else None)
+        event.latency, event.status, event.retries, event.response_bytes = latency, status, retries, 100
+        event.rate_limit_sleep = 0.5 if status == 429 else 0.0
+        metrics.request_finished(event)
+
+    stats = metrics.get("GET", "/requests")
+    assert (stats.count, stats.retries, stats.pages, stats.response_bytes) == (3, 6, 3, 300)
+    assert stats.bucket_counts == [1, 1, 1]
+    assert stats.statuses == {200: 2, 429: 1}
+    assert stats.percentile(50) == 1.0
+    assert stats.percentile(100) == 3.0
+
+    summary = metrics.summary()
+    assert [(item["method"], item["path"]) for item in summary] == [("GET", "/requests"), ("POST", "/requests")]
+    assert summary[0]["histogram"] == {0.1: 1, 1.0: 1, float("inf"): 1}
+    assert summary[0]["rate_limit_sleep"] == 0.5
+    assert metrics.summary(sort_by="count")[0]["count"] == 3
+    metrics.reset()
+    assert metrics.summary() == []
+
+
+def test_optional_adapters_require_their_packages():
+    with patch.object(instrumentation, "otel_metrics", None):
+        with pytest.raises(ImportError, match="opentelemetry"):
+            instrumentation.OpenTelemetryHook()
+    with patch.object(instrumentation, "prometheus_client", None):
+        with pytest.raises(ImportError, match="prometheus"):
+            instrumentation.PrometheusHook()
+
+
+def test_async_helper_emits_events():
+    httpx = pytest.importorskip("httpx")
+    from xurrent.async_core import AsyncXurrentApiHelper
+
+    events = []
+    helper = AsyncXurrentApiHelper("https://api.example.com", "api_key", "account", hooks=events.append)
+    helper._AsyncXurrentApiHelper__client = httpx.AsyncClient(
+        transport=httpx.MockTransport(lambda request: httpx.Response(200, json=[{"id": 1}])))
+
+    async def run():
+        async with helper:
+            return await helper.api_call("/tasks")
+
+    assert asyncio.run(run()) == [{"id": 1}]
+    event, = events
+    assert (event.method, event.path, event.page, event.status) == ("GET", "/tasks", 1, 200)
+    assert event.response_bytes == len(b'[{"id":1}]')
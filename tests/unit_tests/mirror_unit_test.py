@@ -0,0 +1,101 @@
+import pytest
+from unittest.mock import patch
+import os
+import sys
+
+# Add the `../src` directory to sys.path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "../../src")))
+
+from xurrent.core import XurrentApiHelper
+from xurrent.configuration_items import ConfigurationItem
+from xurrent.mirror import Mirror
+from xurrent.requests import Request
+from xurrent.teams import Team
+
+from core_unit_test import make_response
+
+# FILE: src/xurrent/mirror.py
+
+REQUESTS = [
+    {"id": 1, "subject": "Printer broken", "status": "assigned", "team": {"id": 10, "name": "Service Desk"},
+     "member": {"id": 20, "name": "Ann"}, "updated_at": "2024-03-01T10:00:00Z"},
+    {"id": 2, "subject": "VPN down", "status": "in_progress", "team": {"id": 10, "name": "Service Desk"},
+     "updated_at": "2024-03-02T10:00:00Z"},
+    {"id": 3, "subject": "New laptop", "status": "completed", "team": {"id": 11, "name": "Network"},
+     "updated_at": "2024-03-03T10:00:00Z"},
+]
+
+
+@pytest.fixture
+def helper():
+    return XurrentApiHelper("https://api.example.com", "api_key", "account", resolve_user=False)
+
+
+@pytest.fixture
+def mirror(helper):
+    with Mirror(":memory:", helper) as mirror:
+        yield mirror
+
+
+def serve(routes):
+    def request(method, url, json=None, **kwargs):
+        path = url.split("api.example.com", 1)[1].split("?", 1)[0]
+        return make_response(routes[path])
+    return request
+
+
+def test_load_and_query(mirror, helper):
+    routes = {"/requests": REQUESTS, "/requests/1/cis": [{"id": 100}], "/requests/2/cis": [], "/requests/3/cis": [{"id": 100}, {"id": 101}]}
+    with patch.object(helper._XurrentApiHelper__session, "request", side_effect=serve(routes)) as request:
+        assert mirror.load(Request) == 3
+        assert mirror.load_request_cis() == 3
+        api_calls = request.call_count
+
+        open_requests = mirror.query(Request, status=["assigned", "in_progress"], team=Team(helper, 10))
+        assert [request.id for request in open_requests] == [2, 1]
+        assert isinstance(open_requests[0], Request)
+        assert open_requests[1].member.name == "Ann"
+        assert [request.id for request in mirror.query(Request, ci=100, team=11)] == [3]
+        assert [request.id for request in mirror.query(Request, member=20)] == [1]
+        assert [request.id for request in mirror.query(Request, updated_since="2024-03-02T00:00:00Z", limit=1)] == [3]
+        assert mirror.get(Request, 2).subject == "VPN down"
+        assert mirror.get(Request, 4) is None
+        # queries never touch the API
+        assert request.call_count == api_calls
+
+
+def test_sync_only_advances_after_writing(mirror, helper):
+    with patch.object(helper._XurrentApiHelper__session, "request", side_effect=serve({"/requests": REQUESTS})):
+        assert mirror.sync(Request) == 3
+    assert mirror.watermarks.get("requests") == "2024-03-03T10:00:00Z"
+    assert mirror.count(Request) == 3
+
+    with patch.object(helper._XurrentApiHelper__session, "request", side_effect=serve({"/requests": [{**REQUESTS[0], "status": "completed"}]})):
+        mirror.sync(Request)
+    assert mirror.get(Request, 1).status == "completed"
+    assert mirror.watermarks.get("requests") == "2024-03-03T10:00:00Z"
+
+
+def test_load_export_resolves_names(mirror):
+    mirror.store(Team, [{"id": 10, "name": "Service Desk"}])
+    export = b"ID,Subject,Status,Team,Updated At\n5,Printer broken,Assigned,Service Desk,2024-03-01T10:00:00Z\n,no id,Assigned,,\n"
+
+    assert mirror.load_export(export, type="requests") == 1
+    assert [request.subject for request in mirror.query(Request, team=10, status="assigned")] == ["Printer broken"]
+
+
+def test_query_by_ci_is_only_supported_for_requests(mirror):
+    with pytest.raises(ValueError):
+        mirror.query(ConfigurationItem, ci=1)
+
+
+def test_query_order_by_only_accepts_mirrored_columns(mirror, helper):
+    mirror.store(Request, REQUESTS)
+
+    assert [request.id for request in mirror.query(Request, order_by="id desc")] == [3, 2, 1]
+    assert [request.id for request in mirror.query(Request, order_by="status, id")] == [request.id for request in
+                                                                                      mirror.query(Request, order_by="status ASC, id ASC")]
+    for order_by in ("data", "id; DROP TABLE requests", "updated_at DESC NULLS LAST", "(SELECT 1)"):
+        with pytest.raises(ValueError):
+            mirror.query(Request, order_by=order_by)
+    assert mirror.count(Request) == 3
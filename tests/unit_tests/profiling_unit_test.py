@@ -0,0 +1,92 @@
+import pytest
+from unittest.mock import patch
+import os
+import sys
+
+# Add the `../src` directory to sys.path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "../../src")))
+
+from xurrent.core import XurrentApiHelper
+from xurrent.people import Person
+from xurrent.requests import Request
+from xurrent.tasks import Task
+from xurrent.teams import Team
+
+from core_unit_test import make_response, page_link
+
+# FILE: src/xurrent/profiling.py
+
+
+@pytest.fixture
+def helper():
+    return XurrentApiHelper("https://api.example.com", "api_key", "account", resolve_user=False)
+
+
+def serve():
+    """Answer every call with a record matching its URL."""
+    def handler(method, url, **kwargs):
+        if "/notes" in url:
+            return make_response([{"id": 9, "text": "note"}])
+        if url.startswith("https://api.example.com/tasks/"):
+            return make_response({"id": 1, "subject": "task", "workflow": {"id": 5}})
+        return make_response({"id": 1, "subject": "request"})
+    return handler
+
+
+def test_records_calls_with_issuing_model_methods(helper):
+    helper.api_user = Person.from_data(helper, {"id": 3})
+    helper.api_user_teams = [Team.from_data(helper, {"id": 4})]
+    with patch.object(helper._XurrentApiHelper__session, "request", side_effect=serve()):
+        with helper.profile() as profiler:
+            Request.from_data(helper, {"id": 1}).close_and_trash()
+            Task.get_workflow_of_task(helper, 1)
+        # calls after the block are not recorded
+        helper.api_call("/requests/2")
+
+    assert [(call.endpoint, call.issuer) for call in profiler.calls] == [
+        ("PATCH /requests/{id}", "Request.close_and_trash"),
+        ("POST /requests/{id}/trash", "Request.close_and_trash"),
+        ("GET /tasks/{id}", "Task.get_workflow_of_task"),
+    ]
+    assert profiler.calls[0].chain == ("Request.close_and_trash", "Request.close", "Request.update")
+    assert profiler.calls[0].call_site.startswith("profiling_unit_test.py:")
+    assert profiler.calls[0].call_site.endswith("in test_records_calls_with_issuing_model_methods")
+    assert helper.hooks == []
+
+    tree = profiler.call_tree()
+    assert tree["calls"] == 3
+    assert tree["children"]["Request.close_and_trash"]["calls"] == 2
+    assert profiler.findings() == []
+
+
+def test_reports_n_plus_one_patterns(helper):
+    with patch.object(helper._XurrentApiHelper__session, "request", side_effect=serve()):
+        with helper.profile() as profiler:
+            for id in range(1, 5):
+                Request.from_data(helper, {"id": id}).get_note_by_id(9)
+            for _ in range(3):
+                helper.api_call("/requests/1")
+
+    n_plus_one, duplicate = sorted(profiler.findings(), key=lambda finding: finding.kind, reverse=True)
+    assert n_plus_one.kind == "n+1"
+    assert (n_plus_one.group.count, n_plus_one.group.distinct_urls) == (4, 4)
+    assert n_plus_one.group.path == "/requests/{id}/notes"
+    assert n_plus_one.group.chain == ("Request.get_note_by_id", "Request.get_notes")
+    assert duplicate.kind == "duplicate" and duplicate.group.chain == ()
+
+    report = profiler.report()
+    assert report.startswith("7 API calls")
+    assert "N+1: 4 x GET /requests/{id}/notes (4 records) issued by Request.get_note_by_id > Request.get_notes at profiling_unit_test.py:" in report
+    assert profiler.findings(threshold=5) == []
+
+
+def test_pages_of_one_listing_are_not_reported(helper):
+    base = "https://api.example.com/requests"
+    pages = [make_response([{"id": page}], headers={"Link": page_link(base, page, 4)}) for page in range(1, 5)]
+    with patch.object(helper._XurrentApiHelper__session, "request", side_effect=pages):
+        with helper.profile() as profiler:
+            Request.get_requests(helper)
+
+    assert [call.page for call in profiler.calls] == [1, 2, 3, 4]
+    assert {call.issuer for call in profiler.calls} == {"Request.get_requests"}
+    assert profiler.findings() == []
@@ -0,0 +1,117 @@
+import pytest
+from unittest.mock import patch
+import os
+import sys
+import threading
+
+# Add the `../src` directory to sys.path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "../../src")))
+
+from xurrent.rate_limit import RateLimiter
+from xurrent.core import XurrentApiHelper
+
+from core_unit_test import make_response
+
+# FILE: src/xurrent/rate_limit.py
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def monotonic(self):
+        return self.now
+
+    def time(self):
+        return self.now
+
+
+@pytest.fixture
+def clock():
+    fake = FakeClock()
+    with patch("xurrent.rate_limit.time.monotonic", fake.monotonic), patch("xurrent.rate_limit.time.time", fake.time):
+        yield fake
+
+
+def test_token_bucket_spaces_out_callers(clock):
+    limiter = RateLimiter(rate=2, burst=2)
+
+    waits = [limiter.reserve() for _ in range(5)]
+
+    assert waits == [0.0, 0.0, 0.5, 1.0, 1.5]
+
+    clock.now += 10
+    assert limiter.reserve() == 0.0
+
+
+def test_no_wait_without_limits(clock):
+    limiter = RateLimiter()
+    assert all(limiter.reserve() == 0.0 for _ in range(1000))
+
+
+def test_server_budget_is_spread_until_reset(clock):
+    limiter = RateLimiter(pace_below=100)
+    limiter.update({"X-RateLimit-Remaining": "4", "X-RateLimit-Reset": str(clock.now + 10)})
+
+    waits = [limiter.reserve() for _ in range(4)]
+
+    # four requests left for ten seconds: one slot every 2.5 seconds
+    assert waits == [0.0, 2.5, 5.0, 7.5]
+
+
+def test_exhausted_budget_waits_for_reset(clock):
+    limiter = RateLimiter()
+    limiter.update({"X-RateLimit-Remaining": "0", "X-RateLimit-Reset": str(clock.now + 30)})
+
+    assert limiter.reserve() == 30
+
+    # once the window has been reset, calls pass until the server reports a new budget
+    clock.now += 31
+    assert limiter.reserve() == 0.0
+
+
+def test_large_budget_is_not_paced(clock):
+    limiter = RateLimiter(pace_below=100)
+    limiter.update({"X-RateLimit-Remaining": "3000", "X-RateLimit-Reset": str(clock.now + 3600)})
+
+    assert all(limiter.reserve() == 0.0 for _ in range(50))
+
+
+def test_pause_holds_back_all_callers(clock):
+    limiter = RateLimiter()
+    limiter.pause(5)
+
+    assert limiter.reserve() == 5
+    clock.now += 2
+    assert limiter.reserve() == 3
+
+
+def test_reserve_is_thread_safe():
+    limiter = RateLimiter(rate=1000, burst=0)
+    waits = []
+
+    def worker():
+        for _ in range(100):
+            waits.append(limiter.reserve())
+
+    threads = [threading.Thread(target=worker) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    # every caller got a distinct slot
+    assert len(set(round(wait, 6) for wait in waits)) == 800
+
+
+def test_helper_shares_limiter_and_pauses_on_429():
+    limiter = RateLimiter()
+    helper = XurrentApiHelper("https://api.example.com", "api_key", "account", resolve_user=False, rate_limiter=limiter)
+    responses = [make_response(status_code=429, headers={"Retry-After": "0"}), make_response({"id": 1})]
+
+    with patch.object(helper._XurrentApiHelper__session, "request", side_effect=responses), \
+            patch.object(limiter, "pause", wraps=limiter.pause) as pause:
+        assert helper.api_call("/requests/1") == {"id": 1}
+
+    assert helper.rate_limiter is limiter
+    pause.assert_called_once_with(0)
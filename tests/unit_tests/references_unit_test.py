@@ -0,0 +1,93 @@
+import pytest
+from unittest.mock import patch
+import os
+import sys
+
+# Add the `../src` directory to sys.path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "../../src")))
+
+from xurrent.core import XurrentApiHelper
+from xurrent.people import Person
+from xurrent.references import Reference
+from xurrent.requests import Request
+from xurrent.tasks import Task
+from xurrent.workflows import Workflow
+
+from core_unit_test import make_response
+
+# FILE: src/xurrent/references.py
+
+
+@pytest.fixture
+def helper():
+    return XurrentApiHelper("https://api.example.com", "api_key", "account", resolve_user=False, lazy_references=True)
+
+
+RECORD = {
+    "id": 1,
+    "subject": "Printer",
+    "member": {"id": 7, "name": "Ann"},
+    "team": {"id": 3, "name": "Ops"},
+    "workflow": {"id": 5, "subject": "Replace printer"},
+}
+
+
+def test_references_are_built_on_first_read(helper):
+    request = Request.from_data(helper, RECORD)
+
+    assert type(request.member) is Reference
+    assert isinstance(request.member, Person)
+    assert request.member.id == 7
+    assert not request.member.resolved
+    assert request.to_dict()["member"] == {"id": 7, "name": "Ann"}
+
+    assert request.member.name == "Ann"
+    assert request.member.resolved
+    assert request.member.ref_str() == "Person(id=7, name=Ann)"
+    assert isinstance(request.workflow, Workflow)
+
+
+def test_expand_is_memoized(helper):
+    request = Request.from_data(helper, RECORD)
+    with patch.object(helper._XurrentApiHelper__session, "request",
+                      return_value=make_response({"id": 7, "name": "Ann", "primary_email": "ann@example.com"})) as request_mock:
+        person = request.member.expand()
+        assert request.member.expand() is person
+    assert request_mock.call_count == 1
+    assert request.member.primary_email == "ann@example.com"
+
+
+def test_task_get_workflow_expands_once(helper):
+    task = Task.from_data(helper, {"id": 2, "subject": "Order", "workflow": {"id": 5, "subject": "Replace printer"}})
+    with patch.object(helper._XurrentApiHelper__session, "request",
+                      return_value=make_response({"id": 5, "subject": "Replace printer", "status": "progress_halted"})) as request_mock:
+        workflow = task.get_workflow(expand=True)
+        assert task.get_workflow(expand=True) is workflow
+    assert request_mock.call_count == 1
+    assert workflow.status == "progress_halted"
+    assert task.get_workflow().subject == "Replace printer"
+
+
+def test_task_get_workflow_without_lazy_references():
+    helper = XurrentApiHelper("https://api.example.com", "api_key", "account", resolve_user=False)
+    task = Task.from_data(helper, {"id": 2, "workflow": {"id": 5}})
+    assert task.workflow == {"id": 5}
+    with patch.object(helper._XurrentApiHelper__session, "request", return_value=make_response({"id": 5, "subject": "Full"})) as request_mock:
+        assert task.get_workflow(expand=True) is task.get_workflow(expand=True)
+    assert request_mock.call_count == 1
+    assert task.get_workflow().id == 5
+
+
+def test_references_are_eager_by_default():
+    helper = XurrentApiHelper("https://api.example.com", "api_key", "account", resolve_user=False)
+    request = Request.from_data(helper, RECORD)
+    assert type(request.member) is Person
+    assert type(request.workflow) is Workflow
+
+
+def test_references_share_identity_map_instances():
+    helper = XurrentApiHelper("https://api.example.com", "api_key", "account", resolve_user=False,
+                              identity_map=True, lazy_references=True)
+    first = Request.from_data(helper, RECORD)
+    second = Request.from_data(helper, {"id": 2, "member": {"id": 7, "name": "Ann"}})
+    assert first.member.resolve() is second.member.resolve()
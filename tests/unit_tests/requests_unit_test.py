@@ -265,3 +265,28 @@ def test_request_trash(mock_connection, request_instance):
     assert isinstance(response, Request)
     assert response.trashed == True
 
+
+def test_get_requests_with_fields(mock_connection):
+    mock_connection.api_call.return_value = [
+        {"id": 1, "subject": "Printer broken", "status": "assigned", "team": {"id": 5, "name": "Service Desk"}},
+    ]
+    mock_connection.create_filter_string.return_value = "status=assigned"
+
+    requests = Request.get_requests(mock_connection, queryfilter={"status": "assigned"}, fields=["subject", "status", "team"])
+
+    mock_connection.api_call.assert_called_once_with(
+        f"{mock_connection.base_url}/requests?status=assigned&fields=id,subject,status,team", "GET"
+    )
+    # partial records only carry the requested fields
+    assert requests[0].subject == "Printer broken"
+    assert requests[0].team.name == "Service Desk"
+    assert requests[0].member is None and requests[0].workflow is None
+
+
+def test_get_by_id_with_fields(mock_connection):
+    mock_connection.api_call.return_value = {"id": 1, "subject": "subject"}
+
+    request = Request.get_by_id(mock_connection, 1, fields="subject")
+
+    mock_connection.api_call.assert_called_once_with(f"{mock_connection.base_url}/requests/1?fields=id,subject", "GET")
+    assert request.subject == "subject"
@@ -0,0 +1,98 @@
+import pytest
+from unittest.mock import patch
+from email.utils import format_datetime
+from datetime import datetime, timedelta, timezone
+import os
+import sys
+import requests
+
+# Add the `../src` directory to sys.path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "../../src")))
+
+from xurrent.retry import RetryPolicy, parse_retry_after
+from xurrent.core import XurrentApiHelper
+
+from core_unit_test import make_response
+
+# FILE: src/xurrent/retry.py
+
+
+@pytest.fixture
+def helper():
+    policy = RetryPolicy(max_attempts=3, backoff_factor=0.25, jitter=False)
+    return XurrentApiHelper("https://api.example.com", "api_key", "account", resolve_user=False, retry_policy=policy)
+
+
+def test_parse_retry_after_http_date():
+    retry_at = datetime.now(timezone.utc) + timedelta(seconds=30)
+    assert 25 < parse_retry_after(format_datetime(retry_at, usegmt=True)) <= 30
+
+
+def test_policy_decisions():
+    policy = RetryPolicy(max_attempts=3, backoff_factor=1, jitter=False)
+    started = 0.0
+
+    assert policy.next_delay("GET", 1, started, 503) == 1
+    assert policy.next_delay("GET", 2, started, 503) == 2
+    # attempts exhausted
+    assert policy.next_delay("GET", 3, started, 503) is None
+    # client errors are not retried
+    assert policy.next_delay("GET", 1, started, 404) is None
+    # POST is only retried when rate limited
+    assert policy.next_delay("POST", 1, started, 503) is None
+    assert policy.next_delay("POST", 1, started, 429, {"Retry-After": "7"}) == 7
+    assert policy.next_delay("GET", 1, started, exception=requests.exceptions.ConnectionError()) == 1
+    assert policy.next_delay("POST", 1, started, exception=requests.exceptions.ConnectionError()) is None
+    assert policy.next_delay("GET", 1, started, exception=ValueError()) is None
+
+
+def test_policy_total_timeout():
+    policy = RetryPolicy(backoff_factor=10, jitter=False, total_timeout=5)
+    with patch("xurrent.retry.time.monotonic", return_value=100.0):
+        assert policy.next_delay("GET", 1, 100.0, 503) is None
+        assert policy.next_delay("GET", 1, 100.0, 503, {"Retry-After": "2"}) == 2
+
+
+def test_jitter_stays_within_backoff():
+    policy = RetryPolicy(backoff_factor=1, max_backoff=8)
+    assert all(0 <= policy.backoff(attempt) <= min(2 ** (attempt - 1), 8) for attempt in range(1, 10))
+
+
+def test_helper_retries_server_errors(helper):
+    responses = [make_response(status_code=503), make_response(status_code=502), make_response({"id": 1})]
+    with patch.object(helper._XurrentApiHelper__session, "request", side_effect=responses) as request, \
+            patch("xurrent.core.time.sleep") as sleep:
+        assert helper.api_call("/requests/1") == {"id": 1}
+
+    assert request.call_count == 3
+    assert [call.args[0] for call in sleep.call_args_list] == [0.25, 0.5]
+    stats = helper.retry_stats.to_dict()
+    assert stats["retries"] == 2
+    assert stats["wait_time"] == 0.75
+    assert stats["retries_by_reason"] == {503: 1, 502: 1}
+
+
+def test_helper_retries_connection_errors(helper):
+    responses = [requests.exceptions.ConnectionError("reset"), make_response({"id": 1})]
+    with patch.object(helper._XurrentApiHelper__session, "request", side_effect=responses), \
+            patch("xurrent.core.time.sleep"):
+        assert helper.api_call("/requests/1") == {"id": 1}
+    assert helper.retry_stats.retries_by_reason == {"ConnectionError": 1}
+
+
+def test_helper_gives_up_after_max_attempts(helper):
+    responses = [make_response(status_code=503)] * 3
+    with patch.object(helper._XurrentApiHelper__session, "request", side_effect=responses) as request, \
+            patch("xurrent.core.time.sleep"):
+        with pytest.raises(requests.exceptions.HTTPError):
+            helper.api_call("/requests/1")
+
+    assert request.call_count == 3
+    assert helper.retry_stats.failures == 1
+
+
+def test_helper_does_not_retry_post_on_server_error(helper):
+    with patch.object(helper._XurrentApiHelper__session, "request", return_value=make_response(status_code=503)) as request:
+        with pytest.raises(requests.exceptions.HTTPError):
+            helper.api_call("/requests", "POST", {"subject": "subject"})
+    assert request.call_count == 1
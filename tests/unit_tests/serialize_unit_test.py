@@ -0,0 +1,114 @@
+import pytest
+from unittest.mock import patch
+from datetime import datetime, timezone
+import io
+import json
+import os
+import sys
+
+# Add the `../src` directory to sys.path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "../../src")))
+
+from xurrent import serialize
+from xurrent.core import XurrentApiHelper
+from xurrent.people import Person
+from xurrent.requests import Request, RequestCategory
+from xurrent.serialize import get_json_decoder, serializer_of, to_json_lines
+from xurrent.workflows import Workflow
+
+from core_unit_test import make_response
+
+# FILE: src/xurrent/serialize.py
+
+
+@pytest.fixture
+def helper():
+    return XurrentApiHelper("https://api.example.com", "api_key", "account", resolve_user=False)
+
+
+def make_request(helper):
+    return Request.from_data(helper, {
+        "id": 1,
+        "subject": "Printer",
+        "category": "incident",
+        "created_at": datetime(2024, 3, 1, 12, 30, tzinfo=timezone.utc),
+        "member": {"id": 7, "name": "Ann"},
+        "workflow": {"id": 5, "status": "being_created", "manager": {"id": 8, "name": "Bob"}},
+        "tags": ["urgent", 3],
+        "custom_fields": [{"id": "due", "value": datetime(2024, 3, 2)}],
+    })
+
+
+def test_to_dict_converts_nested_values(helper):
+    result = make_request(helper).to_dict()
+
+    assert result["category"] == "incident" and type(result["category"]) is str
+    assert result["created_at"] == "2024-03-01T12:30:00+00:00"
+    assert result["member"] == {"id": 7, "name": "Ann", "primary_email": None}
+    assert result["workflow"]["status"] == "being_created"
+    assert result["workflow"]["manager"]["name"] == "Bob"
+    # lists of plain values and of dictionaries
+    assert result["tags"] == ["urgent", 3]
+    assert result["custom_fields"] == [{"id": "due", "value": "2024-03-02T00:00:00"}]
+    assert "_connection_object" not in result
+    json.dumps(result)
+
+
+def test_serializer_is_cached_per_class():
+    assert serializer_of(Request) is serializer_of(Request)
+    assert serializer_of(Person) is not serializer_of(Workflow)
+    assert serializer_of(Person).fields[:3] == ("id", "name", "primary_email")
+
+
+@pytest.mark.parametrize("use_orjson", [True, False])
+def test_to_json_with_and_without_orjson(helper, use_orjson):
+    if use_orjson and serialize.orjson is None:
+        pytest.skip("orjson is not installed")
+    request = make_request(helper)
+    with patch.object(serialize, "orjson", serialize.orjson if use_orjson else None):
+        encoded = request.to_json()
+    assert json.loads(encoded) == request.to_dict()
+
+
+def test_to_json_lines(helper, tmp_path):
+    records = [make_request(helper), Person.from_data(helper, {"id": 7, "name": "Ann"}), {"id": 3, "category": RequestCategory.rfc}]
+
+    lines = to_json_lines(records).splitlines()
+    assert [json.loads(line)["id"] for line in lines] == [1, 7, 3]
+    assert json.loads(lines[2])["category"] == "rfc"
+
+    text = io.StringIO()
+    assert Request.to_json_lines(iter(records), text) == 3
+    assert text.getvalue() == to_json_lines(records)
+
+    path = tmp_path / "requests.jsonl"
+    with open(path, "wb") as file:
+        to_json_lines(records, file)
+    assert path.read_text().count("\n") == 3
+
+
+def test_helper_decodes_raw_bytes_with_configured_decoder():
+    bodies = []
+
+    def decoder(body):
+        bodies.append(body)
+        return json.loads(body)
+
+    helper = XurrentApiHelper("https://api.example.com", "api_key", "account", resolve_user=False, json_decoder=decoder)
+    with patch.object(helper._XurrentApiHelper__session, "request", return_value=make_response({"id": 7, "name": "Ann"})):
+        person = Person.get_by_id(helper, 7)
+
+    assert person.name == "Ann"
+    assert bodies == [b'{"id": 7, "name": "Ann"}']
+
+
+def test_json_decoder_selection():
+    assert get_json_decoder("json") is json.loads
+    if serialize.orjson is not None:
+        assert get_json_decoder("auto") is serialize.orjson.loads
+    with patch.object(serialize, "orjson", None), patch.object(serialize, "ujson", None):
+        assert get_json_decoder("auto") is json.loads
+        with pytest.raises(ImportError, match="orjson"):
+            get_json_decoder("orjson")
+    with pytest.raises(ValueError):
+        get_json_decoder("yaml")
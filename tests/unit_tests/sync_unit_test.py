@@ -0,0 +1,107 @@
+import pytest
+from unittest.mock import patch
+from datetime import datetime, timezone
+import os
+import sys
+from urllib.parse import unquote
+
+# Add the `../src` directory to sys.path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "../../src")))
+
+from xurrent.core import XurrentApiHelper
+from xurrent.requests import Request
+from xurrent.people import Person
+from xurrent.sync import FileWatermarkStore, MemoryWatermarkStore, SQLiteWatermarkStore
+
+from core_unit_test import make_response
+
+# FILE: src/xurrent/sync.py
+
+
+@pytest.fixture
+def helper():
+    return XurrentApiHelper("https://api.example.com", "api_key", "account", resolve_user=False)
+
+
+def serve(records, urls):
+    def request(method, url, json=None, **kwargs):
+        urls.append(unquote(url))
+        return make_response(records)
+    return request
+
+
+def test_first_sync_reads_everything_and_stores_watermark(helper):
+    store = MemoryWatermarkStore()
+    urls = []
+    records = [
+        {"id": 1, "subject": "a", "updated_at": "2024-03-01T10:00:00Z"},
+        {"id": 2, "subject": "b", "updated_at": "2024-03-01T12:00:00Z"},
+    ]
+
+    with patch.object(helper._XurrentApiHelper__session, "request", side_effect=serve(records, urls)):
+        synced = list(Request.sync(helper, store))
+
+    assert [request.id for request in synced] == [1, 2]
+    assert urls == ["https://api.example.com/requests?per_page=100"]
+    assert store.get("requests") == "2024-03-01T12:00:00Z"
+
+
+def test_sync_requests_changes_since_watermark_with_overlap(helper):
+    store = MemoryWatermarkStore()
+    store.set("people", "2024-03-01T12:00:00Z")
+    urls = []
+
+    with patch.object(helper._XurrentApiHelper__session, "request",
+                      side_effect=serve([{"id": 7, "name": "Ann", "updated_at": "2024-03-02T08:00:00Z"}], urls)):
+        people = list(Person.sync(helper, store, overlap=60, queryfilter={"disabled": "false"}, fields=["name"]))
+
+    assert isinstance(people[0], Person)
+    assert urls == ["https://api.example.com/people?disabled=false&updated_at=>2024-03-01T11:59:00Z&fields=id,name,updated_at&per_page=100"]
+    assert store.get("people") == "2024-03-02T08:00:00Z"
+
+
+def test_sync_accepts_comma_separated_fields(helper):
+    urls = []
+
+    with patch.object(helper._XurrentApiHelper__session, "request", side_effect=serve([], urls)):
+        list(Person.sync(helper, MemoryWatermarkStore(), fields="name,primary_email"))
+
+    assert urls == ["https://api.example.com/people?fields=id,name,primary_email,updated_at&per_page=100"]
+
+
+def test_watermark_only_advances_when_sync_completes(helper):
+    store = MemoryWatermarkStore()
+    store.set("requests", "2024-03-01T00:00:00Z")
+    records = [{"id": 1, "updated_at": "2024-03-02T00:00:00Z"}, {"id": 2, "updated_at": "2024-03-03T00:00:00Z"}]
+
+    with patch.object(helper._XurrentApiHelper__session, "request", side_effect=serve(records, [])):
+        synced = Request.sync(helper, store)
+        next(synced)
+        synced.close()
+
+    assert store.get("requests") == "2024-03-01T00:00:00Z"
+
+
+def test_watermark_is_capped_at_scan_start(helper):
+    store = MemoryWatermarkStore()
+    with patch.object(helper._XurrentApiHelper__session, "request",
+                      side_effect=serve([{"id": 1, "updated_at": "2999-01-01T00:00:00Z"}], [])):
+        list(Request.sync(helper, store))
+
+    assert datetime.fromisoformat(store.get("requests").replace("Z", "+00:00")) <= datetime.now(timezone.utc)
+
+
+@pytest.mark.parametrize("make_store", [
+    lambda path: FileWatermarkStore(path / "watermarks.json"),
+    lambda path: SQLiteWatermarkStore(str(path / "watermarks.db")),
+])
+def test_persistent_stores(tmp_path, make_store):
+    store = make_store(tmp_path)
+    assert store.get("requests") is None
+    store.set("requests", "2024-03-01T00:00:00Z")
+    store.set("people", "2024-03-02T00:00:00Z")
+    store.set("requests", "2024-03-03T00:00:00Z")
+
+    reopened = make_store(tmp_path)
+    assert reopened.get("requests") == "2024-03-03T00:00:00Z"
+    assert reopened.get("people") == "2024-03-02T00:00:00Z"
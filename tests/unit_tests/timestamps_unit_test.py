@@ -0,0 +1,96 @@
+import pytest
+from unittest.mock import patch
+from datetime import datetime, timezone
+import os
+import sys
+
+# Add the `../src` directory to sys.path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "../../src")))
+
+from xurrent import timestamps
+from xurrent.configuration_items import ConfigurationItem
+from xurrent.core import XurrentApiHelper
+from xurrent.people import Person
+from xurrent.requests import Request
+from xurrent.tasks import Task
+from xurrent.teams import Team
+from xurrent.timestamps import TimestampField, parse_record_timestamps, parse_timestamps
+from xurrent.workflows import Workflow
+
+# FILE: src/xurrent/timestamps.py
+
+CREATED = "2024-03-01T12:30:00Z"
+PARSED = datetime(2024, 3, 1, 12, 30, tzinfo=timezone.utc)
+
+
+@pytest.fixture
+def helper():
+    return XurrentApiHelper("https://api.example.com", "api_key", "account", resolve_user=False)
+
+
+@pytest.mark.parametrize("model", [Request, Task, Workflow, Person, Team, ConfigurationItem])
+def test_timestamps_are_parsed_on_first_access(helper, model):
+    assert isinstance(model.created_at, TimestampField)
+    record = model.from_data(helper, {"id": 1, "created_at": CREATED, "updated_at": None})
+    assert model.created_at.raw(record) == CREATED
+
+    with patch.object(timestamps, "parse_timestamp", wraps=timestamps.parse_timestamp) as parse:
+        assert record.created_at == PARSED
+        assert record.created_at is record.created_at
+    assert parse.call_count == 1
+    assert record.updated_at is None
+
+
+def test_request_timestamp_fields(helper):
+    request = Request.from_data(helper, {"id": 1, "next_target_at": CREATED, "completed_at": "2024-03-02T08:00:00+01:00"})
+    assert request.next_target_at == PARSED
+    assert request.completed_at.utcoffset().total_seconds() == 3600
+    # values that are not timestamps are kept
+    request.next_target_at = "best_effort"
+    assert request.next_target_at == "best_effort"
+
+
+def test_to_dict_round_trip(helper):
+    data = {"id": 1, "subject": "Printer", "created_at": CREATED, "updated_at": "2024-03-02T08:00:00.123+01:00"}
+    request = Request.from_data(helper, data)
+    # unparsed values are serialized exactly as received
+    assert request.to_dict().items() >= data.items()
+    assert request.created_at == PARSED
+    result = request.to_dict()
+    assert result["created_at"] == PARSED.isoformat()
+    assert Request.from_data(helper, result).created_at == PARSED
+
+
+def test_parse_record_timestamps(helper):
+    requests = Request.from_data_many(helper, [
+        {"id": id, "created_at": CREATED, "updated_at": "2024-03-02T08:00:00Z"} for id in range(1, 4)
+    ])
+    requests.append(Person.from_data(helper, {"id": 7, "created_at": CREATED}))
+
+    assert parse_record_timestamps(requests) == requests
+    assert all(Request.created_at.raw(request) == PARSED for request in requests[:3])
+    assert Person.created_at.raw(requests[3]) == PARSED
+    assert Request.completed_at.raw(requests[0]) is None
+
+    person = Person.from_data(helper, {"id": 8, "created_at": CREATED, "updated_at": CREATED})
+    parse_record_timestamps([person], fields=["updated_at"])
+    assert Person.created_at.raw(person) == CREATED
+    assert Person.updated_at.raw(person) == PARSED
+
+
+def test_parse_timestamps_parses_distinct_values_once():
+    values = [CREATED, None, CREATED, PARSED, "soon"]
+    with patch.object(timestamps, "parse_timestamp", wraps=timestamps.parse_timestamp) as parse:
+        assert parse_timestamps(iter(values)) == [PARSED, None, PARSED, PARSED, "soon"]
+    assert parse.call_count == 2
+
+
+def test_identity_map_merge_keeps_timestamps_lazy():
+    helper = XurrentApiHelper("https://api.example.com", "api_key", "account", resolve_user=False, identity_map=True)
+    person = Person.from_data(helper, {"id": 7, "created_at": CREATED})
+    assert person.created_at == PARSED
+    # the same timestamp, as received again, does not count as a change
+    Person.from_data(helper, {"id": 7, "created_at": CREATED, "name": "Ann"})
+    assert Person.created_at.raw(person) == PARSED
+    Person.from_data(helper, {"id": 7, "created_at": "2024-03-05T00:00:00Z"})
+    assert Person.created_at.raw(person) == "2024-03-05T00:00:00Z"